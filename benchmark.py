@@ -0,0 +1,499 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional
+
+from enums import GameMode, ClubType, CourseType
+from models.cell import TERRAINS
+from models.course import Course, GENERATION_METHODS
+from models.course_cache import CourseCache
+from models.game_engine import GameEngine, greedy_policy
+from models.rng import SeededRandom
+
+RESULTS_FORMAT = 1
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.25  # Flag anything more than 25% slower than the baseline
+
+GENERATE_SIZES = ((12, 17), (100, 100), (1000, 1000))
+RENDER_SIZES = ((12, 17), (100, 100))
+
+# A benchmark is a generator function: it sets up, yields the operation to
+# time (a zero-argument callable), and cleans up after the yield.
+Benchmark = Callable[[], Iterator[Callable[[], object]]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+SAVE_DATA = {
+    "player_id": 1,
+    "current_mode": "DICE_GOLF",
+    "strokes": 5,
+    "mulligans_remaining": 3,
+    "ball_pos_x": 4,
+    "ball_pos_y": 2,
+    "course_type": "SHORT_COURSE",
+    "completed": True,
+}
+
+
+def benchmark(name: str):
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class _NullStream:
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def _course(width: int, height: int, seed: int = 0) -> Course:
+    course = Course(width, height, CourseType.LONG_COURSE)
+    course.generate(SeededRandom(seed))
+    return course
+
+
+def _engine(mode: GameMode, headless: bool = True) -> GameEngine:
+    engine = GameEngine(headless=headless, seed=0)
+    engine.renderer.stream = _NullStream()
+    with contextlib.redirect_stdout(_NullStream()):
+        engine.startGame(mode, CourseType.LONG_COURSE)
+    return engine
+
+
+# ----------------------------------------------------
+#   COURSE GENERATION
+# ----------------------------------------------------
+def _generate_benchmark(width: int, height: int, method: str) -> Benchmark:
+    def run():
+        rng = SeededRandom(0)
+        course = Course(width, height, CourseType.LONG_COURSE)
+        yield lambda: course.generate(rng, method=method)
+    return run
+
+
+for _method in GENERATION_METHODS:
+    for _width, _height in GENERATE_SIZES:
+        benchmark(f"generate/{_method}/{_width}x{_height}")(_generate_benchmark(_width, _height, _method))
+
+
+# ----------------------------------------------------
+#   ENGINE
+# ----------------------------------------------------
+def _take_shot_benchmark(mode: GameMode, instrumented: bool = False) -> Benchmark:
+    def run():
+        engine = _engine(mode)
+        if instrumented:
+            from models.events import EngineMetrics
+            EngineMetrics().attach(engine)
+        start = engine.ball.getPosition()
+        shots = [(club, dx, dy) for club in ClubType for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+        index = 0
+
+        def shot():
+            nonlocal index
+            engine.ball.setPosition(*start)
+            engine.takeShot(*shots[index % len(shots)])
+            index += 1
+        yield shot
+    return run
+
+
+for _mode in GameMode:
+    benchmark(f"engine/takeShot/{_mode.name}")(_take_shot_benchmark(_mode))
+benchmark("engine/takeShot/DICE_GOLF/metrics")(_take_shot_benchmark(GameMode.DICE_GOLF, instrumented=True))
+
+
+@benchmark("engine/applyHazardEffects")
+def bench_apply_hazard_effects():
+    engine = _engine(GameMode.DICE_GOLF)
+    course = engine.activeCourse
+    # One position per terrain (away from the bottom edge, so water and
+    # slope can push the ball down), visited in turn
+    positions = []
+    for terrain in TERRAINS:
+        course.setTerrain(len(positions), 1, terrain)
+        positions.append((len(positions), 1))
+    index = 0
+
+    def apply():
+        nonlocal index
+        engine.ball.setPosition(*positions[index % len(positions)])
+        engine.applyHazardEffects()
+        index += 1
+    yield apply
+
+
+@benchmark("engine/playHole/DICE_GOLF")
+def bench_play_hole():
+    engine = GameEngine(headless=True, seed=0)
+
+    def play():
+        engine.startGame(GameMode.DICE_GOLF, CourseType.LONG_COURSE)
+        engine.playHole()
+    yield play
+
+
+@benchmark("engine/simulate/DICE_GOLF/100")
+def bench_simulate():
+    from models.game_engine import simulate
+    yield lambda: simulate(100, GameMode.DICE_GOLF, CourseType.LONG_COURSE, seed=0)
+
+
+def _saved_engine(inline: bool) -> GameEngine:
+    """Engine ten shots into a LONG_COURSE hole, with undo history."""
+    engine = GameEngine(headless=True, seed=0, courseCache=None if inline else CourseCache(), undoDepth=16)
+    engine.startGame(GameMode.DICE_GOLF, CourseType.LONG_COURSE)
+    for _ in range(10):
+        engine.takeShot(*greedy_policy(engine))
+    return engine
+
+
+@benchmark("engine/save")
+def bench_save():
+    yield _saved_engine(inline=False).save
+
+
+def _resume_benchmark(inline: bool) -> Benchmark:
+    def run():
+        engine = _saved_engine(inline)
+        data = engine.save()
+        yield lambda: GameEngine.resume(data, courseCache=engine.courseCache)
+    return run
+
+
+benchmark("engine/resume/inline")(_resume_benchmark(inline=True))
+benchmark("engine/resume/cached")(_resume_benchmark(inline=False))
+
+
+# ----------------------------------------------------
+#   RENDERING AND MOVE HIGHLIGHTING
+# ----------------------------------------------------
+@benchmark("render/renderCourse")
+def bench_render_course():
+    engine = _engine(GameMode.DICE_GOLF, headless=False)
+    yield engine.renderCourse
+
+
+def _render_frame_benchmark(width: int, height: int, cold: bool) -> Benchmark:
+    def run():
+        from models.ball import Ball
+        from models.renderer import CourseRenderer
+        course = _course(width, height)
+        ball = Ball()
+        ball.setPosition(width // 2, height - 1)
+        renderer = CourseRenderer()
+        if cold:
+            # A fresh renderer per frame: rebuilds the terrain rows every time
+            yield lambda: CourseRenderer().renderFrame(course, ball)
+        else:
+            yield lambda: renderer.renderFrame(course, ball)
+    return run
+
+
+for _width, _height in RENDER_SIZES:
+    for _cold in (False, True):
+        _name = f"render/renderFrame/{_width}x{_height}" + ("/cold" if _cold else "")
+        benchmark(_name)(_render_frame_benchmark(_width, _height, _cold))
+
+
+def _highlight_benchmark(cached: bool) -> Benchmark:
+    def run():
+        # The GUI-independent part of DiceGolfApp.highlight_valid_moves:
+        # every cell along the shot lines for a roll, from every square
+        course = _course(12, 17)
+        queries = [(x, y, roll) for y in range(course.height) for x in range(course.width) for roll in range(1, 8)]
+        if cached:
+            def highlight():
+                for x, y, roll in queries:
+                    course.getReachableCells(x, y, roll)
+        else:
+            def highlight():
+                for x, y, roll in queries:
+                    frozenset(course._walkShotLines(x, y, roll))
+        yield highlight
+    return run
+
+
+benchmark("highlight/reachable/all-squares")(_highlight_benchmark(cached=True))
+benchmark("highlight/reachable/all-squares/uncached")(_highlight_benchmark(cached=False))
+
+
+def _risk_heatmap_benchmark(width: int, height: int) -> Benchmark:
+    def run():
+        from models.analysis import risk_heatmap
+        course = _course(width, height)
+        yield lambda: risk_heatmap(course, GameMode.DICE_GOLF)
+    return run
+
+
+for _width, _height in RENDER_SIZES:
+    benchmark(f"analysis/risk_heatmap/{_width}x{_height}")(_risk_heatmap_benchmark(_width, _height))
+
+
+# ----------------------------------------------------
+#   PERSISTENCE
+# ----------------------------------------------------
+@benchmark("db/save_game_state")
+def bench_save_game_state():
+    from db import Database
+    with tempfile.TemporaryDirectory() as scratch:
+        database = Database(os.path.join(scratch, "bench.db"))
+        database.init_schema()
+        try:
+            yield lambda: database.save_game_state(SAVE_DATA)
+        finally:
+            database.close()
+
+
+@benchmark("db/save_many/1000")
+def bench_save_many():
+    from db import Database
+    saves = [dict(SAVE_DATA, player_id=player) for player in range(1000)]
+    with tempfile.TemporaryDirectory() as scratch:
+        database = Database(os.path.join(scratch, "bench.db"))
+        database.init_schema()
+        try:
+            yield lambda: database.save_many(saves)
+        finally:
+            database.close()
+
+
+@benchmark("db/init_db/new")
+def bench_init_db_new():
+    from db import Database
+    with tempfile.TemporaryDirectory() as scratch:
+        count = 0
+
+        def init():
+            nonlocal count
+            count += 1
+            with Database(os.path.join(scratch, f"bench{count}.db")) as database:
+                database.init_schema()
+        yield init
+
+
+@benchmark("db/init_db/existing")
+def bench_init_db_existing():
+    import db
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "bench.db")
+        db.init_db(path)
+        try:
+            yield lambda: db.init_db(path)
+        finally:
+            db.get_database(path).close()
+
+
+# ----------------------------------------------------
+#   TELEMETRY
+# ----------------------------------------------------
+@benchmark("telemetry/write/1000")
+def bench_telemetry_write():
+    from models.telemetry import TelemetryWriter
+    shot = (1, 0, GameMode.DICE_GOLF, ClubType.IRON, (4, 12), (4, 9), 3, None, 1)
+    with tempfile.TemporaryDirectory() as scratch:
+        writer = TelemetryWriter(scratch, segmentBytes=1 << 20)
+
+        def write():
+            for _ in range(1000):
+                writer.write(*shot)
+            writer.flush()
+        try:
+            yield write
+        finally:
+            writer.close()
+
+
+@benchmark("telemetry/scan/100000")
+def bench_telemetry_scan():
+    from models.telemetry import TelemetryWriter, TelemetryReader
+    shot = (1, 0, GameMode.DICE_GOLF, ClubType.IRON, (4, 12), (4, 9), 3, None, 1)
+    with tempfile.TemporaryDirectory() as scratch:
+        with TelemetryWriter(scratch) as writer:
+            for _ in range(100_000):
+                writer.write(*shot)
+        reader = TelemetryReader(scratch)
+        try:
+            yield lambda: reader.total("distance")
+        finally:
+            reader.close()
+
+
+# ----------------------------------------------------
+#   RUNNING, RECORDING AND COMPARING
+# ----------------------------------------------------
+def measure(op: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Time `op`: the loop count is chosen so one repeat takes at least
+    `min_time` seconds, then `repeat` repeats are run. Times are per call.
+    """
+    timer = timeit.Timer(op)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed) + 1) if elapsed > 0 else number * 10
+    times = sorted([elapsed / number] + [t / number for t in timer.repeat(repeat - 1, number)])
+    return {
+        "min": times[0],
+        "median": times[len(times) // 2],
+        "max": times[-1],
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.2,
+                   progress=None) -> Dict[str, dict]:
+    """Run the named benchmarks (default: all) and return name -> timings."""
+    results = {}
+    for name in names if names is not None else BENCHMARKS:
+        bench = BENCHMARKS[name]()
+        try:
+            results[name] = measure(next(bench), repeat, min_time)
+        finally:
+            bench.close()
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def machine_metadata() -> dict:
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "numpy": numpy_version,
+        "commit": commit,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """
+    Compare best (min) times with the baseline's. A benchmark regresses
+    when it is more than `tolerance` (a fraction) slower.
+    """
+    rows = []
+    for name, timing in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append({"name": name, "status": "new", "current": timing["min"]})
+            continue
+        ratio = timing["min"] / base["min"] if base["min"] else float("inf")
+        if ratio > 1 + tolerance:
+            status = "regressed"
+        elif ratio < 1 / (1 + tolerance):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "status": status, "current": timing["min"],
+                     "baseline": base["min"], "ratio": ratio})
+    return rows
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Dice Golf benchmark suite.")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="also write the results as the new baseline (with -k, update just those benchmarks)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--quick", action="store_true", help="fewer, shorter repeats")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or any(part in name for part in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.05
+
+    def progress(name, timing):
+        print(f"{name:45} {_format_time(timing['min']):>10}  (x{timing['number']})", file=sys.stderr)
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "metadata": machine_metadata(),
+        "results": run_benchmarks(names, args.repeat, args.min_time, progress),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        saved = report
+        if args.filter and os.path.exists(args.baseline):
+            # Re-record only the selected benchmarks, keeping the rest
+            with open(args.baseline) as f:
+                saved = json.load(f)
+            saved["metadata"] = report["metadata"]
+            saved.setdefault("results", {}).update(report["results"])
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    base_meta, meta = baseline.get("metadata", {}), report["metadata"]
+    for key in ("machine", "processor", "python", "cpu_count"):
+        if base_meta.get(key) != meta.get(key):
+            print(f"Note: baseline {key} {base_meta.get(key)!r} differs from this run's {meta.get(key)!r}")
+
+    rows = compare(report["results"], baseline.get("results", {}), args.tolerance)
+    for row in rows:
+        if row["status"] == "new":
+            print(f"{row['name']:45} {_format_time(row['current']):>10}  new")
+        else:
+            print(f"{row['name']:45} {_format_time(row['current']):>10}  vs {_format_time(row['baseline']):>10}"
+                  f"  x{row['ratio']:.2f}  {row['status']}")
+    regressed = [row["name"] for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from enums import GameMode, CourseType
+
+# Subcommands import what they need when they run, so that starting the
+# CLI never pays for tkinter, NumPy or sqlite3 unless the command uses them.
+
+POLICIES = ("greedy", "hint", "optimal")
+
+
+def _policy(name: str):
+    if name == "greedy":
+        from models.game_engine import greedy_policy
+        return greedy_policy
+    from models import solver
+    return solver.hint_policy if name == "hint" else solver.optimal_policy
+
+
+def _int_at_least(minimum: int):
+    """argparse type: an int no smaller than `minimum`."""
+    def convert(text: str) -> int:
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, not {value}")
+        return value
+    return convert
+
+
+def _write(text: str, output: Optional[str]):
+    if output is None:
+        sys.stdout.write(text)
+    else:
+        with open(output, "w", newline="") as f:
+            f.write(text)
+
+
+# ----------------------------------------------------
+#   SUBCOMMANDS
+# ----------------------------------------------------
+def cmd_simulate(args) -> int:
+    mode, course_type = GameMode[args.mode], CourseType[args.course_type]
+    mulligan_rule = None
+    if args.mulligan_on_water:
+        from models.game_engine import mulligan_on_water
+        mulligan_rule = mulligan_on_water
+
+    # Always through the tournament runner (inline for one process), so a
+    # seed plays the same holes however many processes share them
+    from models.tournament import StrokeStats, run_tournament
+    stats = StrokeStats()
+    for update in run_tournament({args.policy: _policy(args.policy)}, args.holes, (mode,), (course_type,),
+                                 args.seed, args.processes, max_strokes=args.max_strokes,
+                                 mulligan_rule=mulligan_rule):
+        stats.merge(update.stats)
+
+    summary = {
+        "mode": mode.name,
+        "course_type": course_type.name,
+        "policy": args.policy,
+        "seed": args.seed,
+        "holes": stats.holes,
+        "mean_strokes": stats.meanStrokes(),
+        "stdev_strokes": stats.stdevStrokes(),
+        "min_strokes": stats.minStrokes,
+        "max_strokes": stats.maxStrokes,
+        "completion_rate": stats.completionRate(),
+        "mean_mulligans": stats.meanMulligans(),
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f"{stats.holes} holes of {mode.name} on {course_type.name} ({args.policy} policy, seed {args.seed})")
+        print(f"strokes: mean {summary['mean_strokes']:.3f}, stdev {summary['stdev_strokes']:.3f}, "
+              f"min {stats.minStrokes}, max {stats.maxStrokes}")
+        print(f"completed {summary['completion_rate']:.1%}, mulligans per hole {summary['mean_mulligans']:.3f}")
+    return 0
+
+
+def _course_for(args):
+    """The course named by --db/--course-id, else game --game-index of engine seed --seed."""
+    if args.course_id is not None:
+        from db import Database
+        with Database(args.db) as database:
+            try:
+                return database.load_course(args.course_id)
+            except KeyError:
+                sys.exit(f"no course with id {args.course_id} in {args.db}")
+    from models.game_engine import GameEngine
+    engine = GameEngine(headless=True, seed=args.seed)
+    engine.gameIndex = args.game_index
+    engine.startGame(GameMode[args.mode], CourseType[args.course_type])
+    return engine.activeCourse
+
+
+def cmd_solve(args) -> int:
+    mode = GameMode[args.mode]
+    course = _course_for(args)
+    from models.solver import solve
+    table = solve(course, mode)
+    start = (course.width // 2, course.height - 1)
+    shot = table.bestShot(*start)
+    if args.json:
+        result = {
+            "mode": mode.name,
+            "width": course.width,
+            "height": course.height,
+            "hole": list(course.getHolePosition()),
+            "start": list(start),
+            "expected_strokes": table.expectedStrokes(*start),
+            "best_shot": [shot[0].name, shot[1], shot[2]] if shot else None,
+        }
+        if args.grid:
+            result["values"] = table.values
+        print(json.dumps(result))
+        return 0
+    print(f"Expected strokes from {start} under {mode.name}: {table.expectedStrokes(*start):.4f}")
+    if shot:
+        print(f"Best first shot: {shot[0].name} ({shot[1]}, {shot[2]})")
+    if args.grid:
+        for y in range(course.height):
+            print(" ".join(f"{table.expectedStrokes(x, y):6.2f}" for x in range(course.width)))
+    return 0
+
+
+def cmd_difficulty(args) -> int:
+    mode = GameMode[args.mode]
+    course = _course_for(args)
+    from models.analysis import course_difficulty, risk_heatmap
+    heatmap = risk_heatmap(course, mode)
+    rows = heatmap.tolist() if hasattr(heatmap, "tolist") else heatmap
+    difficulty = course_difficulty(course, mode)
+    if args.json:
+        result = {"mode": mode.name, "width": course.width, "height": course.height, "difficulty": difficulty}
+        if args.heatmap:
+            result["heatmap"] = rows
+        print(json.dumps(result))
+        return 0
+    print(f"Strokes wasted per shot under {mode.name}: {difficulty:.4f}")
+    if args.heatmap:
+        for row in rows:
+            print(" ".join(f"{value:5.2f}" for value in row))
+    return 0
+
+
+def cmd_generate_course(args) -> int:
+    from models.course import Course
+    from models.rng import SeededRandom
+    course_type = CourseType[args.course_type]
+    if args.width is None or args.height is None:
+        from models.game_engine import COURSE_DIMENSIONS
+        width, height = COURSE_DIMENSIONS[course_type]
+        args.width, args.height = args.width or width, args.height or height
+    course = Course(args.width, args.height, course_type)
+    course.generate(SeededRandom(args.seed), method=args.method)
+    if args.db is not None:
+        from db import Database
+        with Database(args.db) as database:
+            database.init_schema()
+            print(database.save_course(course))
+    elif not args.quiet:
+        from models.renderer import CourseRenderer
+        _write(CourseRenderer().renderFrame(course), args.output)
+    return 0
+
+
+def cmd_export_stats(args) -> int:
+    from db import Database
+    with Database(args.db) as database:
+        if args.player is not None:
+            rows = [dict(player_id=args.player, **row) for row in database.player_stats(args.player)]
+        else:
+            modes = [GameMode[args.mode]] if args.mode else list(GameMode)
+            course_types = [CourseType[args.course_type]] if args.course_type else [None, *CourseType]
+            rows = [
+                {"current_mode": mode.name, "course_type": course_type.name if course_type else "*",
+                 "rank": rank, **row}
+                for mode in modes
+                for course_type in course_types
+                for rank, row in enumerate(database.leaderboard(mode, course_type, args.limit), 1)
+            ]
+    if args.format == "json":
+        _write(json.dumps(rows, indent=2) + "\n", args.output)
+        return 0
+    import csv
+    import io
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]) if rows else ["player_id"])
+    writer.writeheader()
+    writer.writerows(rows)
+    _write(buffer.getvalue(), args.output)
+    return 0
+
+
+def cmd_telemetry(args) -> int:
+    from models.telemetry import TelemetryReader
+    from models.cell import TERRAINS
+    with TelemetryReader(args.directory, args.prefix) as reader:
+        shots = len(reader)
+        summary = {
+            "segments": len(reader.segments),
+            "shots": shots,
+            "mean_distance": reader.total("distance") / shots if shots else 0.0,
+            "hazards": {},
+        }
+        for column in reader.columns("hazard"):
+            for code in column:
+                if code >= 0:
+                    name = TERRAINS[code].name
+                    summary["hazards"][name] = summary["hazards"].get(name, 0) + 1
+            column.release()
+    if args.json:
+        print(json.dumps(summary))
+        return 0
+    print(f"{shots} shots in {summary['segments']} segments, mean distance {summary['mean_distance']:.3f}")
+    for name, count in sorted(summary["hazards"].items()):
+        print(f"{name}: {count} ({count / shots:.1%})")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    import server
+    argv = ["--db", args.db, "--host", args.host, "--port", str(args.port)]
+    if args.telemetry is not None:
+        argv += ["--telemetry", args.telemetry]
+    server.main(argv)
+    return 0
+
+
+# ----------------------------------------------------
+#   ARGUMENTS
+# ----------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dicegolf", description="Headless Dice Golf tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    modes = [mode.name for mode in GameMode]
+    course_types = [course_type.name for course_type in CourseType]
+
+    simulate = commands.add_parser("simulate", help="play generated holes with a policy and summarise")
+    simulate.add_argument("--mode", choices=modes, default=GameMode.DICE_GOLF.name)
+    simulate.add_argument("--course-type", choices=course_types, default=CourseType.SHORT_COURSE.name)
+    simulate.add_argument("--holes", type=_int_at_least(1), default=1000)
+    simulate.add_argument("--policy", choices=POLICIES, default="greedy")
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--max-strokes", type=int, default=100)
+    simulate.add_argument("--mulligan-on-water", action="store_true", help="replay shots that end in water")
+    simulate.add_argument("--processes", type=_int_at_least(0), default=1, help="worker processes (0: one per CPU)")
+    simulate.add_argument("--json", action="store_true")
+    simulate.set_defaults(func=cmd_simulate)
+
+    solve = commands.add_parser("solve", help="expected strokes under optimal play")
+    solve.add_argument("--mode", choices=modes, default=GameMode.DICE_GOLF.name)
+    solve.add_argument("--course-type", choices=course_types, default=CourseType.SHORT_COURSE.name)
+    solve.add_argument("--seed", type=int, default=0, help="engine seed of the generated course")
+    solve.add_argument("--game-index", type=int, default=0)
+    solve.add_argument("--db", default="dicegolf.db")
+    solve.add_argument("--course-id", type=int, help="solve a saved course instead")
+    solve.add_argument("--grid", action="store_true", help="also print every cell's value")
+    solve.add_argument("--json", action="store_true")
+    solve.set_defaults(func=cmd_solve)
+
+    difficulty = commands.add_parser("difficulty", help="rate a course by the strokes hazards and edges waste")
+    difficulty.add_argument("--mode", choices=modes, default=GameMode.DICE_GOLF.name)
+    difficulty.add_argument("--course-type", choices=course_types, default=CourseType.SHORT_COURSE.name)
+    difficulty.add_argument("--seed", type=int, default=0, help="engine seed of the generated course")
+    difficulty.add_argument("--game-index", type=int, default=0)
+    difficulty.add_argument("--db", default="dicegolf.db")
+    difficulty.add_argument("--course-id", type=int, help="rate a saved course instead")
+    difficulty.add_argument("--heatmap", action="store_true", help="also print each square's risk")
+    difficulty.add_argument("--json", action="store_true")
+    difficulty.set_defaults(func=cmd_difficulty)
+
+    generate = commands.add_parser("generate-course", help="generate a course and print or save it")
+    generate.add_argument("--course-type", choices=course_types, default=CourseType.SHORT_COURSE.name)
+    generate.add_argument("--width", type=_int_at_least(1))
+    generate.add_argument("--height", type=_int_at_least(1))
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--method", choices=("exact", "bulk"), default="exact")
+    generate.add_argument("--db", help="save to this database and print the course id")
+    generate.add_argument("--output", help="write the rendered course here instead of stdout")
+    generate.add_argument("--quiet", action="store_true")
+    generate.set_defaults(func=cmd_generate_course)
+
+    export = commands.add_parser("export-stats", help="export leaderboards or a player's stats")
+    export.add_argument("--db", default="dicegolf.db")
+    export.add_argument("--mode", choices=modes)
+    export.add_argument("--course-type", choices=course_types)
+    export.add_argument("--player", type=int, help="one player's summary rows instead of leaderboards")
+    export.add_argument("--limit", type=int, default=10)
+    export.add_argument("--format", choices=("csv", "json"), default="csv")
+    export.add_argument("--output")
+    export.set_defaults(func=cmd_export_stats)
+
+    telemetry = commands.add_parser("telemetry", help="summarise a shot telemetry log")
+    telemetry.add_argument("directory")
+    telemetry.add_argument("--prefix", default="shots")
+    telemetry.add_argument("--json", action="store_true")
+    telemetry.set_defaults(func=cmd_telemetry)
+
+    serve = commands.add_parser("serve", help="run the JSON-lines game server")
+    serve.add_argument("--db", default="dicegolf.db")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--telemetry", help="directory to log every shot to")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "processes", 1) == 0:
+        args.processes = None
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
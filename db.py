@@ -1,24 +1,41 @@
 import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-def init_db(db_path: str = "dicegolf.db"):
-    """
-    Initialize the SQLite database with the tables 
-    (players, saves, courses, cells) if they do not exist.
-    """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+from enums import CourseType, GameMode, HazardType
+from models.cell import TERRAIN_CODES
+from models.course import Course, FAIRWAY_CODE
+from models.course_cache import CourseCache, CourseKey
+
+# Version of the packed course grid format stored in courses.grid:
+# one byte per square, row-major, holding models.cell terrain codes.
+COURSE_SCHEMA_VERSION = 1
+# Random terrain barely compresses past level 1, which is ~10x faster than 6.
+GRID_COMPRESSION_LEVEL = 1
+
+# Applied to every connection a Database opens.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",      # readers never block the writer
+    "PRAGMA synchronous = NORMAL",    # fsync at checkpoints, not every commit
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",     # ~16 MB page cache
+    "PRAGMA busy_timeout = 5000",     # wait up to 5s for a competing writer
+)
 
+SCHEMA = (
     # Create players table
-    cursor.execute("""
+    """
     CREATE TABLE IF NOT EXISTS players (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT,
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP
     )
-    """)
-
+    """,
     # Create saves table
-    cursor.execute("""
+    """
     CREATE TABLE IF NOT EXISTS saves (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         player_id INTEGER,
@@ -28,23 +45,30 @@ def init_db(db_path: str = "dicegolf.db"):
         ball_pos_x INTEGER,
         ball_pos_y INTEGER,
         saved_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        course_type TEXT,
+        completed INTEGER DEFAULT 0,
+        state BLOB,
         FOREIGN KEY(player_id) REFERENCES players(id)
     )
-    """)
-
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_saves_player_recent ON saves(player_id, id)",
     # Create courses table
-    cursor.execute("""
+    """
     CREATE TABLE IF NOT EXISTS courses (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         course_type TEXT,
         width INTEGER,
         height INTEGER,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        hole_x INTEGER,
+        hole_y INTEGER,
+        schema_version INTEGER,
+        grid_encoding TEXT,
+        grid BLOB
     )
-    """)
-
+    """,
     # Create cells table
-    cursor.execute("""
+    """
     CREATE TABLE IF NOT EXISTS cells (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         course_id INTEGER,
@@ -53,10 +77,408 @@ def init_db(db_path: str = "dicegolf.db"):
         hazard_type TEXT,
         FOREIGN KEY(course_id) REFERENCES courses(id)
     )
-    """)
+    """,
+    # Legacy per-square rows are only ever read a whole course at a time
+    "CREATE INDEX IF NOT EXISTS idx_cells_course ON cells(course_id)",
+    # Leaderboard summary, one row per player, mode and course type (plus
+    # course_type '*' across all types), kept current by the trigger below
+    """
+    CREATE TABLE IF NOT EXISTS player_stats (
+        player_id INTEGER,
+        current_mode TEXT,
+        course_type TEXT,
+        rounds INTEGER,
+        total_strokes INTEGER,
+        best_strokes INTEGER,
+        last_saved_at DATETIME,
+        PRIMARY KEY(player_id, current_mode, course_type)
+    ) WITHOUT ROWID
+    """,
+    # Covers the leaderboard query: no table lookups
+    """
+    CREATE INDEX IF NOT EXISTS idx_player_stats_board
+    ON player_stats(current_mode, course_type, best_strokes, player_id, rounds)
+    """,
+    # Recreated each time so databases created with an older version of
+    # the trigger pick up changes to it; anonymous saves (no player) are
+    # not ranked
+    "DROP TRIGGER IF EXISTS saves_update_player_stats",
+    """
+    CREATE TRIGGER saves_update_player_stats
+    AFTER INSERT ON saves WHEN NEW.completed AND NEW.player_id IS NOT NULL
+    BEGIN
+        INSERT INTO player_stats
+        SELECT NEW.player_id, NEW.current_mode, course_type, 1, NEW.strokes, NEW.strokes, NEW.saved_at
+        FROM (SELECT '*' AS course_type UNION ALL SELECT NEW.course_type)
+        WHERE course_type IS NOT NULL
+        ON CONFLICT(player_id, current_mode, course_type) DO UPDATE SET
+            rounds = rounds + 1,
+            total_strokes = total_strokes + excluded.total_strokes,
+            best_strokes = MIN(best_strokes, excluded.best_strokes),
+            last_saved_at = excluded.last_saved_at;
+    END
+    """,
+)
+
+# Columns added to existing tables since the first schema; init_schema
+# adds any that an older database file is missing.
+MIGRATIONS = {
+    "saves": (
+        ("course_type", "TEXT"),
+        ("completed", "INTEGER DEFAULT 0"),
+        ("state", "BLOB"),
+    ),
+    "courses": (
+        ("hole_x", "INTEGER"),
+        ("hole_y", "INTEGER"),
+        ("schema_version", "INTEGER"),
+        ("grid_encoding", "TEXT"),
+        ("grid", "BLOB"),
+    ),
+}
+
+INSERT_SAVE = """
+    INSERT INTO saves (
+        player_id,
+        current_mode,
+        strokes,
+        mulligans_remaining,
+        ball_pos_x,
+        ball_pos_y,
+        course_type,
+        completed,
+        state
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SAVE_COLUMNS = (
+    "id", "player_id", "current_mode", "strokes", "mulligans_remaining",
+    "ball_pos_x", "ball_pos_y", "saved_at", "course_type", "completed",
+)
+
+
+def _save_row(save_data: dict) -> tuple:
+    return (
+        save_data["player_id"],
+        _name(save_data["current_mode"]),
+        save_data["strokes"],
+        save_data["mulligans_remaining"],
+        save_data["ball_pos_x"],
+        save_data["ball_pos_y"],
+        _name(save_data.get("course_type")),
+        int(bool(save_data.get("completed", False))),
+        save_data.get("state"),
+    )
+
+
+def _name(value: Union[Enum, str, None]) -> Optional[str]:
+    """Enum members are stored by name."""
+    return value.name if isinstance(value, Enum) else value
+
+
+class Database:
+    """
+    Long-lived access to one SQLite database file.
+    Each thread lazily opens one connection (WAL mode, see PRAGMAS) and
+    keeps reusing it, so callers never pay connect/close per operation.
+    Note that ':memory:' gives every thread its own, separate database.
+    The first connection creates the schema and migrates an older
+    database file (see init_schema), so saves never meet missing columns.
+    """
+    def __init__(self, db_path: str = "dicegolf.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schemaLock = threading.Lock()
+        self._schemaReady = False
+        self._connections = []
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            with self._schemaLock:
+                # Every ':memory:' connection is a database of its own
+                if not self._schemaReady or self.db_path == ":memory:":
+                    with conn:
+                        self._migrate(conn)
+                    self._schemaReady = True
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Commit everything done inside the block at once (rollback on error)."""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """Run `sql` for every row in a single transaction; returns rows changed."""
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
 
-    conn.commit()
-    conn.close()
+    def init_schema(self):
+        """Create missing tables and add columns (MIGRATIONS) an older file lacks."""
+        if getattr(self._local, "conn", None) is None:
+            self.connection()  # Opening a connection migrates the file first
+            return
+        with self.transaction() as conn:
+            self._migrate(conn)
+
+    @classmethod
+    def _migrate(cls, conn: sqlite3.Connection):
+        had_stats = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_stats'"
+        ).fetchone() is not None
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if not existing:
+                continue  # Created below with every column
+            for name, sql_type in columns:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        if not had_stats:
+            cls._rebuild_player_stats(conn)
+
+    def rebuild_player_stats(self):
+        """Recompute the player_stats summary from every completed save."""
+        with self.transaction() as conn:
+            self._rebuild_player_stats(conn)
+
+    @staticmethod
+    def _rebuild_player_stats(conn: sqlite3.Connection):
+        conn.execute("DELETE FROM player_stats")
+        for course_type, condition in (("'*'", ""), ("course_type", "AND course_type IS NOT NULL")):
+            conn.execute(f"""
+                INSERT INTO player_stats
+                SELECT player_id, current_mode, {course_type}, COUNT(*), SUM(strokes),
+                       MIN(strokes), MAX(saved_at)
+                FROM saves WHERE completed AND player_id IS NOT NULL {condition}
+                GROUP BY player_id, current_mode, {course_type}
+            """)
+
+    def save_game_state(self, save_data: dict) -> None:
+        self.execute(INSERT_SAVE, _save_row(save_data))
+
+    def load_game_state(self, save_id: int) -> Optional[bytes]:
+        """
+        The full game state (GameEngine.save) stored with a save, or None
+        if it has none; resume it with GameEngine.resume.
+        """
+        row = self.connection().execute("SELECT state FROM saves WHERE id = ?", (save_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no save with id {save_id}")
+        return row[0]
+
+    def save_many(self, saves: Iterable[dict]) -> int:
+        """Insert many save dicts (see save_game_state) in one transaction."""
+        return self.executemany(INSERT_SAVE, (_save_row(save_data) for save_data in saves))
+
+    def leaderboard(self, current_mode: Union[GameMode, str],
+                    course_type: Union[CourseType, str, None] = None,
+                    limit: int = 10) -> List[dict]:
+        """
+        Best completed-round strokes per player for a mode, over all course
+        types or just `course_type`, best first. Served from player_stats.
+        """
+        rows = self.connection().execute("""
+            SELECT s.player_id, p.name, s.best_strokes, s.rounds
+            FROM player_stats AS s LEFT JOIN players AS p ON p.id = s.player_id
+            WHERE s.current_mode = ? AND s.course_type = ?
+            ORDER BY s.best_strokes, s.player_id
+            LIMIT ?
+        """, (_name(current_mode), _name(course_type) or "*", limit))
+        return [
+            {"player_id": player_id, "name": name, "best_strokes": best, "rounds": rounds}
+            for player_id, name, best, rounds in rows
+        ]
+
+    def player_stats(self, player_id: int) -> List[dict]:
+        """Summary rows (rounds, total and best strokes) for one player."""
+        rows = self.connection().execute("""
+            SELECT current_mode, course_type, rounds, total_strokes, best_strokes, last_saved_at
+            FROM player_stats WHERE player_id = ?
+            ORDER BY current_mode, course_type
+        """, (player_id,))
+        return [
+            {"current_mode": mode, "course_type": course_type, "rounds": rounds,
+             "total_strokes": total, "best_strokes": best, "last_saved_at": last}
+            for mode, course_type, rounds, total, best, last in rows
+        ]
+
+    def recent_saves(self, player_id: int, limit: int = 10) -> List[dict]:
+        """A player's most recent saves, newest first."""
+        rows = self.connection().execute(f"""
+            SELECT {", ".join(SAVE_COLUMNS)} FROM saves
+            WHERE player_id = ? ORDER BY id DESC LIMIT ?
+        """, (player_id, limit))
+        return [dict(zip(SAVE_COLUMNS, row)) for row in rows]
+
+    def save_course(self, course: Course, compress: bool = True) -> int:
+        """
+        Store `course` as a single packed grid BLOB (zlib-compressed unless
+        `compress` is False) and return its id.
+        """
+        grid = bytes(course.terrain)
+        encoding = "raw"
+        if compress:
+            grid, encoding = zlib.compress(grid, GRID_COMPRESSION_LEVEL), "zlib"
+        hole_x, hole_y = course.getHolePosition()
+        cursor = self.execute("""
+            INSERT INTO courses (
+                course_type, width, height, hole_x, hole_y,
+                schema_version, grid_encoding, grid
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            course.course_type.name, course.width, course.height, hole_x, hole_y,
+            COURSE_SCHEMA_VERSION, encoding, grid
+        ))
+        return cursor.lastrowid
+
+    def load_course(self, course_id: int, lazy: bool = False) -> Union[Course, "StoredCourse"]:
+        """
+        Load a course saved with save_course, or an older course stored as
+        per-square rows in `cells`. With `lazy`, only the metadata is read
+        and a StoredCourse is returned; its grid is fetched and decoded on
+        the first call to StoredCourse.decode().
+        """
+        row = self.connection().execute("""
+            SELECT course_type, width, height, hole_x, hole_y, schema_version
+            FROM courses WHERE id = ?
+        """, (course_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no course with id {course_id}")
+        course_type, width, height, hole_x, hole_y, schema_version = row
+        hole = (hole_x, hole_y) if hole_x is not None else None
+        stored = StoredCourse(self, course_id, CourseType[course_type], width, height, hole, schema_version)
+        return stored if lazy else stored.decode()
+
+    def load_cached_course(self, course_id: int, cache: CourseCache) -> Course:
+        """
+        load_course through `cache`, keyed by the course id in place of a
+        seed. The returned course is shared and must not be modified.
+        """
+        stored = self.load_course(course_id, lazy=True)
+        key = CourseKey(stored.course_type, stored.width, stored.height, course_id,
+                        f"db-{COURSE_SCHEMA_VERSION}")
+        return cache.getOrCreate(key, stored.decode)
+
+    def migrate_cell_rows(self, course_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Repack courses still stored as per-square `cells` rows into grid
+        BLOBs and drop their rows. Returns the number of courses migrated.
+        """
+        if course_ids is None:
+            course_ids = [row[0] for row in self.connection().execute(
+                "SELECT id FROM courses WHERE grid IS NULL"
+            )]
+        migrated = 0
+        with self.transaction() as conn:
+            for course_id in course_ids:
+                course = self.load_course(course_id)
+                conn.execute("""
+                    UPDATE courses SET schema_version = ?, grid_encoding = ?, grid = ?
+                    WHERE id = ?
+                """, (COURSE_SCHEMA_VERSION, "zlib", zlib.compress(bytes(course.terrain), GRID_COMPRESSION_LEVEL), course_id))
+                conn.execute("DELETE FROM cells WHERE course_id = ?", (course_id,))
+                migrated += 1
+        return migrated
+
+    def _read_grid(self, course_id: int, width: int, height: int,
+                   schema_version: Optional[int]) -> bytes:
+        conn = self.connection()
+        if schema_version is None:
+            return self._read_cell_rows(conn, course_id, width, height)
+        if schema_version != COURSE_SCHEMA_VERSION:
+            raise ValueError(f"course {course_id} uses unsupported grid schema version {schema_version}")
+        encoding, grid = conn.execute(
+            "SELECT grid_encoding, grid FROM courses WHERE id = ?", (course_id,)
+        ).fetchone()
+        if encoding == "zlib":
+            return zlib.decompress(grid)
+        if encoding == "raw":
+            return bytes(grid)
+        raise ValueError(f"course {course_id} has unknown grid encoding {encoding!r}")
+
+    @staticmethod
+    def _read_cell_rows(conn: sqlite3.Connection, course_id: int, width: int, height: int) -> bytearray:
+        # Squares missing from the legacy rows default to fairway.
+        terrain = bytearray([FAIRWAY_CODE]) * (width * height)
+        for x, y, hazard_type in conn.execute(
+            "SELECT x, y, hazard_type FROM cells WHERE course_id = ?", (course_id,)
+        ):
+            if 0 <= x < width and 0 <= y < height:
+                terrain[y * width + x] = TERRAIN_CODES[HazardType[hazard_type]]
+        return terrain
+
+    def close(self):
+        """Close every connection this Database opened, in all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> "Database":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StoredCourse:
+    """Metadata of a saved course whose grid has not been decoded yet."""
+    def __init__(self, database: Database, course_id: int, course_type: CourseType,
+                 width: int, height: int, hole_position: Optional[Tuple[int, int]],
+                 schema_version: Optional[int]):
+        self.database = database
+        self.course_id = course_id
+        self.course_type = course_type
+        self.width = width
+        self.height = height
+        self.hole_position = hole_position
+        self.schema_version = schema_version
+        self._course: Optional[Course] = None
+
+    def decode(self) -> Course:
+        """Fetch and unpack the grid (once) and return the Course."""
+        if self._course is None:
+            terrain = self.database._read_grid(self.course_id, self.width, self.height, self.schema_version)
+            self._course = Course.fromTerrain(self.width, self.height, self.course_type, terrain, self.hole_position)
+        return self._course
+
+
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: str = "dicegolf.db") -> Database:
+    """Process-wide shared Database for `db_path`."""
+    with _databases_lock:
+        database = _databases.get(db_path)
+        if database is None:
+            database = _databases[db_path] = Database(db_path)
+        return database
+
+
+def init_db(db_path: str = "dicegolf.db"):
+    """
+    Initialize the SQLite database with the tables
+    (players, saves, courses, cells) if they do not exist.
+    """
+    get_database(db_path).init_schema()
 
 def save_game_state(db_path: str, save_data: dict) -> None:
     """
@@ -68,29 +490,36 @@ def save_game_state(db_path: str, save_data: dict) -> None:
       "strokes": 5,
       "mulligans_remaining": 3,
       "ball_pos_x": 10,
-      "ball_pos_y": 5
+      "ball_pos_y": 5,
+      "course_type": "SHORT_COURSE",  # optional
+      "completed": False,             # optional; True for a finished round
+      "state": engine.save()          # optional; lets the game be resumed
     }
+    Uses the shared connection for `db_path` rather than reconnecting.
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        INSERT INTO saves (
-            player_id,
-            current_mode,
-            strokes,
-            mulligans_remaining,
-            ball_pos_x,
-            ball_pos_y
-        ) VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        save_data["player_id"],
-        save_data["current_mode"],
-        save_data["strokes"],
-        save_data["mulligans_remaining"],
-        save_data["ball_pos_x"],
-        save_data["ball_pos_y"]
-    ))
+    get_database(db_path).save_game_state(save_data)
+
+def save_many(db_path: str, saves: Iterable[dict]) -> int:
+    """Batch version of save_game_state: all saves in one transaction."""
+    return get_database(db_path).save_many(saves)
+
+def load_game_state(db_path: str, save_id: int) -> Optional[bytes]:
+    """The resumable game state stored with a save (see Database.load_game_state)."""
+    return get_database(db_path).load_game_state(save_id)
+
+def save_course(db_path: str, course: Course, compress: bool = True) -> int:
+    """Store a Course as one packed grid BLOB; returns the new course id."""
+    return get_database(db_path).save_course(course, compress)
+
+def load_course(db_path: str, course_id: int, lazy: bool = False) -> Union[Course, StoredCourse]:
+    """Load a saved Course (see Database.load_course)."""
+    return get_database(db_path).load_course(course_id, lazy)
+
+def leaderboard(db_path: str, current_mode: Union[GameMode, str],
+                course_type: Union[CourseType, str, None] = None, limit: int = 10) -> List[dict]:
+    """Best strokes per player (see Database.leaderboard)."""
+    return get_database(db_path).leaderboard(current_mode, course_type, limit)
 
-    conn.commit()
-    conn.close()
\ No newline at end of file
+def recent_saves(db_path: str, player_id: int, limit: int = 10) -> List[dict]:
+    """A player's most recent saves, newest first."""
+    return get_database(db_path).recent_saves(player_id, limit)
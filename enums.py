@@ -20,4 +20,11 @@ class CourseType(Enum):
 class ClubType(Enum):
     DRIVER = auto()
     IRON = auto()
-    PUTTER = auto()
\ No newline at end of file
+    PUTTER = auto()
+
+class EngineEvent(Enum):
+    SHOT_TAKEN = auto()
+    HAZARD_APPLIED = auto()
+    MULLIGAN_USED = auto()
+    OUT_OF_BOUNDS = auto()
+    HOLE_COMPLETED = auto()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from enums import GameMode, CourseType, ClubType
+from models.rules import CLUB_DISTANCES
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class Connection:
+    """One client connection; requests are sent one at a time and timed."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 latencies: List[float]):
+        self.reader = reader
+        self.writer = writer
+        self.latencies = latencies
+        self.errors = 0
+        self._nextId = 0
+
+    async def request(self, cmd: str, **fields) -> dict:
+        self._nextId += 1
+        line = json.dumps({"id": self._nextId, "cmd": cmd, **fields}).encode() + b"\n"
+        started = time.perf_counter()
+        self.writer.write(line)
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.latencies.append(time.perf_counter() - started)
+        if not response.get("ok"):
+            self.errors += 1
+        return response
+
+
+def aim(state: dict) -> Tuple[str, int, int]:
+    """Head for the hole along the nearest shot line, with the longest club that does not overshoot."""
+    (bx, by), (hx, hy) = state["ball"], state["hole"]
+    ddx, ddy = hx - bx, hy - by
+    dx, dy = (ddx > 0) - (ddx < 0), (ddy > 0) - (ddy < 0)
+    adx, ady = abs(ddx), abs(ddy)
+    wanted = max(adx, ady) if adx == 0 or ady == 0 or adx == ady else min(adx, ady)
+    club = ClubType.PUTTER
+    for clubType, distance in CLUB_DISTANCES:  # Longest first
+        if distance <= wanted:
+            club = clubType
+            break
+    return club.name, dx, dy
+
+
+async def play(host: str, port: int, holes: int, mode: GameMode, courseType: CourseType,
+               seed: int, latencies: List[float]) -> Tuple[int, int]:
+    """Play `holes` holes on one connection; returns (holes completed, errors)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    connection = Connection(reader, writer, latencies)
+    completed = 0
+    try:
+        for hole in range(holes):
+            state = await connection.request(
+                "start", mode=mode.name, course_type=courseType.name, seed=seed + hole)
+            if not state.get("ok"):
+                continue
+            session = state["session"]
+            while not state.get("finished"):
+                if mode == GameMode.DICE_GOLF:
+                    await connection.request("roll", session=session)
+                club, dx, dy = aim(state)
+                state = await connection.request("shot", session=session, club=club, dx=dx, dy=dy)
+                if not state.get("ok"):
+                    break
+            completed += bool(state.get("completed"))
+            await connection.request("close", session=session)
+    finally:
+        writer.close()
+    return completed, connection.errors
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run(host: str, port: int, clients: int, holes: int, mode: GameMode,
+              courseType: CourseType, seed: int = 0) -> dict:
+    """Drive `clients` concurrent connections and summarise latency and throughput."""
+    latencies: List[float] = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        play(host, port, holes, mode, courseType, seed + client * holes, latencies)
+        for client in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "holes_completed": sum(completed for completed, _ in results),
+        "errors": sum(errors for _, errors in results),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else float("nan"),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_local(clients: int, holes: int, mode: GameMode, courseType: CourseType,
+                    seed: int = 0, db_path: Optional[str] = None) -> dict:
+    """Start a GameServer in this process (on a scratch database by default) and load it."""
+    from db import Database
+    from server import GameServer
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database = Database(db_path or os.path.join(scratch, "loadtest.db"))
+        database.init_schema()
+        server = GameServer(database)
+        await server.start(DEFAULT_HOST, 0)
+        try:
+            report = await run(DEFAULT_HOST, server.port, clients, holes, mode, courseType, seed)
+        finally:
+            await server.stop()
+            database.close()
+        report["saves_written"] = server.saves.written
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load-test a Dice Golf server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--local", action="store_true",
+                        help="start a server in this process on a scratch database")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--holes", type=int, default=10, help="holes per client")
+    parser.add_argument("--mode", choices=[mode.name for mode in GameMode], default=GameMode.DICE_GOLF.name)
+    parser.add_argument("--course-type", choices=[course_type.name for course_type in CourseType],
+                        default=CourseType.SHORT_COURSE.name)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    mode, courseType = GameMode[args.mode], CourseType[args.course_type]
+    if args.local:
+        report = asyncio.run(run_local(args.clients, args.holes, mode, courseType, args.seed))
+    else:
+        report = asyncio.run(run(args.host, args.port, args.clients, args.holes, mode, courseType, args.seed))
+    print(f"{report['clients']} clients, {report['requests']} requests in {report['seconds']:.2f}s "
+          f"({report['requests_per_second']:.0f} req/s), {report['holes_completed']} holes completed, "
+          f"{report['errors']} errors")
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    if "saves_written" in report:
+        print(f"{report['saves_written']} saves written")
+
+
+if __name__ == "__main__":
+    main()
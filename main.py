@@ -1,7 +1,134 @@
+import threading
 import tkinter as tk
 from tkinter import messagebox
 from enums import GameMode, CourseType, ClubType
-from models.game_engine import GameEngine, HazardType
+from models.game_engine import GameEngine
+from models.rules import TERRAIN_APPEARANCE, UNKNOWN_APPEARANCE, distance_modifier
+
+HIGHLIGHT_COLOR = "lightblue"
+HINT_COLOR = "orange"
+# Risk overlay, from the safest squares to the most treacherous
+RISK_COLORS = ("#fff5cc", "#ffe099", "#ffc266", "#ff9940", "#ff6626", "#e62e1a")
+# Courses with more cells than this are drawn on a CourseCanvas, not buttons
+BUTTON_GRID_LIMIT = 2500
+CELL_SIZE = 32  # Pixels per square on a CourseCanvas
+BACKGROUND_POLL_MS = 50  # How often the Tk thread checks on a background computation
+
+
+class CourseCanvas:
+    """
+    A course drawn on one tk.Canvas for grids far too big for a button per
+    cell. Only the squares in view have canvas items; squares scrolled out
+    of view hand theirs to the next ones scrolled in, so the item count
+    stays at about one viewport whatever the course size. Clicks are
+    mapped to squares from their coordinates.
+    """
+    def __init__(self, master, columns, rows, appearance, on_click, cell_size=CELL_SIZE):
+        self.columns = columns
+        self.rows = rows
+        self.appearance = appearance  # (x, y) -> (text, bg)
+        self.on_click = on_click
+        self.cell_size = cell_size
+        self.font = ("Arial", cell_size // 2)
+        self.tiles = {}  # (x, y) -> (rectangle, text, (text, bg) shown)
+        self.free_items = []  # (rectangle, text) pairs hidden, ready for reuse
+        self.refresh_pending = False
+
+        self.canvas = tk.Canvas(master, bg="white", highlightthickness=0,
+                                scrollregion=(0, 0, columns * cell_size, rows * cell_size))
+        self.x_scrollbar = tk.Scrollbar(master, orient="horizontal", command=self.canvas.xview)
+        self.y_scrollbar = tk.Scrollbar(master, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(
+            xscrollcommand=lambda first, last: self.scrolled(self.x_scrollbar, first, last),
+            yscrollcommand=lambda first, last: self.scrolled(self.y_scrollbar, first, last),
+        )
+        self.y_scrollbar.pack(side="right", fill="y")
+        self.x_scrollbar.pack(side="bottom", fill="x")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_refresh())
+        self.canvas.bind("<Button-1>", self.clicked)
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.canvas.xview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def scrolled(self, scrollbar, first, last):
+        """The view moved: update the scrollbar and the squares in view."""
+        scrollbar.set(first, last)
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.canvas.after_idle(self.refresh)
+
+    def visible_cells(self):
+        """(x0, y0, x1, y1): the squares in view are x0 <= x < x1, y0 <= y < y1."""
+        size = self.cell_size
+        left, top = int(self.canvas.canvasx(0)), int(self.canvas.canvasy(0))
+        return (
+            max(left // size, 0),
+            max(top // size, 0),
+            min((left + self.canvas.winfo_width()) // size + 1, self.columns),
+            min((top + self.canvas.winfo_height()) // size + 1, self.rows),
+        )
+
+    def refresh(self):
+        """Recycle the items of squares that left the view and draw the ones that entered it."""
+        self.refresh_pending = False
+        x0, y0, x1, y1 = self.visible_cells()
+        gone = [cell for cell in self.tiles if not (x0 <= cell[0] < x1 and y0 <= cell[1] < y1)]
+        for cell in gone:
+            rectangle, text, _ = self.tiles.pop(cell)
+            self.canvas.itemconfigure(rectangle, state="hidden")
+            self.canvas.itemconfigure(text, state="hidden")
+            self.free_items.append((rectangle, text))
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                if (x, y) not in self.tiles:
+                    self.show(x, y)
+
+    def show(self, x, y):
+        size = self.cell_size
+        left, top = x * size, y * size
+        appearance = text_value, bg = self.appearance(x, y)
+        if self.free_items:
+            rectangle, text = self.free_items.pop()
+            self.canvas.coords(rectangle, left, top, left + size, top + size)
+            self.canvas.itemconfigure(rectangle, fill=bg, state="normal")
+            self.canvas.coords(text, left + size / 2, top + size / 2)
+            self.canvas.itemconfigure(text, text=text_value, state="normal")
+        else:
+            rectangle = self.canvas.create_rectangle(left, top, left + size, top + size, fill=bg, outline="lightgray")
+            text = self.canvas.create_text(left + size / 2, top + size / 2, text=text_value, font=self.font)
+        self.tiles[x, y] = (rectangle, text, appearance)
+
+    def update(self, cells):
+        """Redraw the squares among `cells` that are in view and look different now."""
+        for cell in cells:
+            tile = self.tiles.get(cell)
+            if tile is None:
+                continue  # Drawn from scratch when it scrolls into view
+            rectangle, text, shown = tile
+            appearance = self.appearance(*cell)
+            if appearance != shown:
+                self.canvas.itemconfigure(rectangle, fill=appearance[1])
+                self.canvas.itemconfigure(text, text=appearance[0])
+                self.tiles[cell] = (rectangle, text, appearance)
+
+    def center_on(self, x, y):
+        """Scroll so square (x, y) is as near the middle of the view as the course allows."""
+        size = self.cell_size
+        self.canvas.update_idletasks()
+        self.canvas.xview_moveto(max((x + 0.5) * size - self.canvas.winfo_width() / 2, 0) / (self.columns * size))
+        self.canvas.yview_moveto(max((y + 0.5) * size - self.canvas.winfo_height() / 2, 0) / (self.rows * size))
+
+    def clicked(self, event):
+        x = int(self.canvas.canvasx(event.x)) // self.cell_size
+        y = int(self.canvas.canvasy(event.y)) // self.cell_size
+        if 0 <= x < self.columns and 0 <= y < self.rows:
+            self.on_click(x, y)
 
 
 class DiceGolfApp:
@@ -10,9 +137,17 @@ class DiceGolfApp:
         self.root.title("Dice Golf")
         self.engine = None
         self.grid_buttons = []
+        self.course_view = None  # CourseCanvas when the course is drawn on a canvas
         self.current_roll = 0
-        self.highlighted_cells = []
-        self.previous_position = None  # To track the previous position of the ball
+        self.highlighted_cells = frozenset()
+        self.hint_cell = None  # Suggested landing among the highlighted cells
+        self.risk_levels = None  # Per-cell index into RISK_COLORS while the overlay is shown
+
+        # Shadow model of what each button shows, as (text, bg), plus the
+        # cells that may need a redraw; redraws are coalesced via after_idle.
+        self.shown_cells = []
+        self.dirty_cells = set()
+        self.redraw_pending = False
 
         self.create_top_controls()
         self.initialize_game_mode_window()
@@ -28,6 +163,12 @@ class DiceGolfApp:
         self.mulligan_button = tk.Button(self.top_frame, text="Use Mulligan", font=("Arial", 14), command=self.use_mulligan)
         self.mulligan_button.pack(side=tk.LEFT, padx=10)
 
+        self.hint_button = tk.Button(self.top_frame, text="Hint", font=("Arial", 14), command=self.show_hint)
+        self.hint_button.pack(side=tk.LEFT, padx=10)
+
+        self.risk_button = tk.Button(self.top_frame, text="Risk", font=("Arial", 14), command=self.toggle_risk)
+        self.risk_button.pack(side=tk.LEFT, padx=10)
+
         self.roll_result_label = tk.Label(self.top_frame, text="Dice Roll: -", font=("Arial", 16), bg="lightgray")
         self.roll_result_label.pack(side=tk.LEFT, padx=10)
 
@@ -52,26 +193,74 @@ class DiceGolfApp:
         tk.Radiobutton(self.mode_window, text="Medium Course (Par 4)", variable=self.course_var, value="MEDIUM_COURSE").pack()
         tk.Radiobutton(self.mode_window, text="Long Course (Par 5)", variable=self.course_var, value="LONG_COURSE").pack()
 
+        # Custom size: blank keeps the course's own size
+        tk.Label(self.mode_window, text="Custom size (width x height, optional):", font=("Arial", 14)).pack(pady=5)
+        size_frame = tk.Frame(self.mode_window)
+        size_frame.pack()
+        self.width_var = tk.StringVar()
+        self.height_var = tk.StringVar()
+        tk.Entry(size_frame, textvariable=self.width_var, width=6).pack(side=tk.LEFT)
+        tk.Label(size_frame, text="x").pack(side=tk.LEFT)
+        tk.Entry(size_frame, textvariable=self.height_var, width=6).pack(side=tk.LEFT)
+        self.canvas_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.mode_window, text="Canvas view (always used for large courses)",
+                       variable=self.canvas_var).pack()
+
         # Start Game Button
         tk.Button(self.mode_window, text="Start Game", command=self.start_game).pack(pady=10)
 
+    def custom_size(self):
+        """The (width, height) typed into the mode window, or None if left blank."""
+        width, height = self.width_var.get().strip(), self.height_var.get().strip()
+        if not width and not height:
+            return None
+        if not (width.isdigit() and height.isdigit() and int(width) > 0 and int(height) > 0):
+            raise ValueError("Width and height must both be positive whole numbers.")
+        return int(width), int(height)
+
     def start_game(self):
         """Initialize the game engine and setup the grid."""
         mode = GameMode[self.mode_var.get()]
         course = CourseType[self.course_var.get()]
+        try:
+            size = self.custom_size()
+        except ValueError as error:
+            messagebox.showerror("Custom Size", str(error))
+            return
 
         # Initialize GameEngine
         self.engine = GameEngine()
-        self.engine.startGame(mode, course)
+        self.engine.startGame(mode, course, size)
 
         self.mode_window.destroy()  # Close the game mode selection window
-        self.setup_scrollable_course_grid()
+        active = self.engine.activeCourse
+        if self.canvas_var.get() or active.width * active.height > BUTTON_GRID_LIMIT:
+            self.setup_canvas_course_view()
+        else:
+            self.setup_scrollable_course_grid()
 
-    def setup_scrollable_course_grid(self):
-        """Create a scrollable grid of buttons representing the course."""
+    def clear_course_area(self):
+        """Remove the current course view, keeping the top controls."""
         for widget in self.root.winfo_children():
             if widget != self.top_frame:
                 widget.destroy()
+        self.grid_buttons = []
+        self.shown_cells = []
+        self.course_view = None
+        self.risk_levels = None
+
+    def setup_canvas_course_view(self):
+        """Draw the course on a virtualized CourseCanvas, scrolled to the ball."""
+        self.clear_course_area()
+        course = self.engine.activeCourse
+        self.course_view = CourseCanvas(self.root, course.width, course.height,
+                                        self.cell_appearance, self.on_grid_click)
+        self.course_view.center_on(*self.engine.ball.getPosition())
+        self.update_grid()
+
+    def setup_scrollable_course_grid(self):
+        """Create a scrollable grid of buttons representing the course."""
+        self.clear_course_area()
 
         # Create a canvas and a scrollbar
         canvas = tk.Canvas(self.root)
@@ -89,7 +278,6 @@ class DiceGolfApp:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        self.grid_buttons = []
         for y in range(self.engine.activeCourse.height):
             row_buttons = []
             for x in range(self.engine.activeCourse.width):
@@ -100,27 +288,29 @@ class DiceGolfApp:
                 btn.grid(row=y, column=x, padx=2, pady=2)
                 row_buttons.append(btn)
             self.grid_buttons.append(row_buttons)
+            self.shown_cells.append([(" ", None)] * len(row_buttons))
 
         self.update_grid()
 
     def roll_dice(self):
         """Roll the dice and update the GUI."""
-        self.current_roll = self.engine.dice.rollD6()
-        cell = self.engine.activeCourse.getCell(*self.engine.ball.getPosition())
-
-        if cell and cell.getTerrain() == HazardType.FAIRWAY:
-            self.current_roll += 1
-        elif cell and cell.getTerrain() == HazardType.SAND:
-            self.current_roll -= 1
+        # The engine's pending roll: rolling again shows the same number, and
+        # the replay log knows which roll the next move used
+        self.current_roll = self.engine.rollDice()
+        terrain = self.engine.activeCourse.getTerrain(*self.engine.ball.getPosition())
+        if terrain is not None:
+            # The GUI always rolls, so it uses the DICE_GOLF modifiers
+            self.current_roll += distance_modifier(GameMode.DICE_GOLF, ClubType.DRIVER, terrain)
 
         self.roll_result_label.config(text=f"Dice Roll: {self.current_roll}")
         self.highlight_valid_moves()
 
     def clear_highlights(self):
         """Clear previously highlighted cells."""
-        for x, y in self.highlighted_cells:
-            self.grid_buttons[y][x].config(bg="white")  # Reset background color
-        self.highlighted_cells = []
+        self.dirty_cells.update(self.highlighted_cells)
+        self.highlighted_cells = frozenset()
+        self.hint_cell = None
+        self.schedule_redraw()
 
 
     def highlight_valid_moves(self):
@@ -130,17 +320,85 @@ class DiceGolfApp:
         if self.current_roll <= 0:
             return  # If no roll, do nothing
 
+        # Every cell along the eight shot lines, up to the rolled distance
         ball_x, ball_y = self.engine.ball.getPosition()
-        directions = [(-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)]  # NW, N, NE, E, SE, S, SW, W
-
-        for dx, dy in directions:
-            for step in range(1, self.current_roll + 1):  # Loop up to the rolled distance
-                x, y = ball_x + dx * step, ball_y + dy * step
-                if self.engine.activeCourse.isValidPosition(x, y):  # Check if position is valid
-                    self.grid_buttons[y][x].config(bg="lightblue")  # Highlight the cell
-                    self.highlighted_cells.append((x, y))
-                else:
-                    break  # Stop highlighting in this direction if the position is invalid
+        self.highlighted_cells = self.engine.activeCourse.getReachableCells(ball_x, ball_y, self.current_roll)
+        self.dirty_cells.update(self.highlighted_cells)
+
+    def run_in_background(self, button, compute, apply):
+        """
+        Run `compute()` on a worker thread so large courses do not freeze the
+        window, then `apply(result)` on the Tk thread. `button` is disabled
+        until then. `compute` must not touch any widget.
+        """
+        result = {}
+
+        def work():
+            try:
+                result["value"] = compute()
+            except Exception as error:  # Reported on the Tk thread
+                result["error"] = error
+
+        def poll():
+            if worker.is_alive():
+                self.root.after(BACKGROUND_POLL_MS, poll)
+                return
+            button.config(state=tk.NORMAL)
+            if "error" in result:
+                messagebox.showerror("Error", str(result["error"]))
+            else:
+                apply(result["value"])
+
+        button.config(state=tk.DISABLED)
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        self.root.after(BACKGROUND_POLL_MS, poll)
+
+    def show_hint(self):
+        """Mark the highlighted cell that leaves the fewest strokes to the hole."""
+        if not self.highlighted_cells:
+            messagebox.showinfo("Hint", "Roll the dice first!")
+            return
+        from models.solver import distance_field  # Imported on first use: pulls in NumPy
+        course = self.engine.activeCourse
+
+        def apply(field):
+            # The player may have moved meanwhile: rank what is highlighted now
+            if self.engine.activeCourse is not course or not self.highlighted_cells:
+                return
+            # Rank by where the ball comes to rest: the move applies hazards too
+            self.hint_cell = field.rankLandings(self.highlighted_cells, self.engine.ball.getPosition())[0]
+            self.dirty_cells.add(self.hint_cell)
+            self.schedule_redraw()
+        self.run_in_background(self.hint_button, lambda: distance_field(course, GameMode.DICE_GOLF), apply)
+
+    def toggle_risk(self):
+        """Show or hide how many strokes a shot from each square tends to waste."""
+        if self.engine is None:
+            return
+        if self.risk_levels is not None:
+            self.risk_levels = None
+            self.mark_all_dirty()
+            self.schedule_redraw()
+            return
+        from models.analysis import shot_distribution  # Imported on first use: pulls in NumPy
+        course = self.engine.activeCourse
+
+        def compute():
+            # The GUI rolls every shot with the driver, so only its shots are rated
+            heatmap = shot_distribution(course, GameMode.DICE_GOLF, (ClubType.DRIVER,)).riskMap()
+            rows = heatmap.tolist() if hasattr(heatmap, "tolist") else heatmap
+            peak = max(map(max, rows)) or 1.0
+            top = len(RISK_COLORS) - 1
+            return [[min(int(value / peak * len(RISK_COLORS)), top) for value in row] for row in rows]
+
+        def apply(levels):
+            if self.engine.activeCourse is not course:
+                return
+            self.risk_levels = levels
+            self.mark_all_dirty()
+            self.schedule_redraw()
+        self.run_in_background(self.risk_button, compute, apply)
 
     def on_grid_click(self, x, y):
         """Handle clicks on the grid."""
@@ -148,27 +406,33 @@ class DiceGolfApp:
             messagebox.showwarning("Invalid Move", "You can only move to highlighted cells!")
             return
 
-        # Save the current position as the previous position before moving
-        self.previous_position = self.engine.ball.getPosition()
-
-        # Move the ball and count the stroke using GameEngine
-        self.engine.ball.setPosition(x, y)
-        self.engine.player.incrementStrokes()
+        # Move the ball and count the stroke using GameEngine, which
+        # remembers where the shot started for a mulligan
+        self.dirty_cells.add(self.engine.ball.getPosition())
+        # Water, slopes etc. resolve through the course's hazard table, as for any shot
+        hazard = self.engine.placeBall(x, y)
+        if hazard is not None:
+            self.roll_result_label.config(text=f"Hazard: {hazard.name.title()}")
         self.update_strokes_label()
 
         self.current_roll = 0  # Reset roll after move
-        self.update_grid()
+        self.dirty_cells.add((x, y))
+        self.dirty_cells.add(self.engine.ball.getPosition())
+        self.clear_highlights()
 
         if self.engine.checkVictoryCondition():
+            self.redraw()  # Show the final position before the dialog
             messagebox.showinfo("Victory!", f"Congratulations! You completed the hole in {self.engine.calculateScore()} strokes.")
             self.root.destroy()
 
     def use_mulligan(self):
         """Use a mulligan if available."""
-        if self.engine.player.getMulligans() > 0 and self.previous_position:
-            self.engine.useMulligan()
-            self.engine.ball.setPosition(*self.previous_position)  # Restore the previous position
-            self.update_grid()
+        if self.engine.player.getMulligans() > 0 and self.engine.previousPosition:
+            self.dirty_cells.add(self.engine.ball.getPosition())
+            self.engine.useMulligan(revert=True)  # Back to where the last shot started
+            self.dirty_cells.add(self.engine.ball.getPosition())
+            self.update_strokes_label()
+            self.clear_highlights()
             messagebox.showinfo("Mulligan Used", f"Mulligans left: {self.engine.player.getMulligans()}")
         else:
             messagebox.showwarning("No Mulligans", "You have no mulligans left or no previous position!")
@@ -179,32 +443,53 @@ class DiceGolfApp:
         self.stroke_label.config(text=f"Strokes: {strokes}")
 
     def update_grid(self):
-        """Update the grid to reflect the current course state."""
+        """Queue a redraw of every cell; unchanged buttons are left alone."""
         self.clear_highlights()
+        self.mark_all_dirty()
 
+    def mark_all_dirty(self):
+        """Queue every cell for a redraw check: every button, or every square a CourseCanvas shows."""
+        if self.course_view is not None:
+            self.dirty_cells.update(self.course_view.tiles)
+            return
         for y, row in enumerate(self.grid_buttons):
-            for x, btn in enumerate(row):
-                cell = self.engine.activeCourse.getCell(x, y)
-                if (x, y) == self.engine.ball.getPosition():
-                    btn.config(text="o", bg="yellow", font=("Arial", 16))
-                elif (x, y) == self.engine.activeCourse.getHolePosition():
-                    btn.config(text="●", bg="green", font=("Arial", 16))
-                elif cell:
-                    terrain = cell.getTerrain()
-                    if terrain == HazardType.FAIRWAY:
-                        btn.config(text="·", bg="lightgreen")
-                    elif terrain == HazardType.SAND:
-                        btn.config(text="ᨒ", bg="tan")
-                    elif terrain == HazardType.WATER:
-                        btn.config(text="♒︎", bg="blue")
-                    elif terrain == HazardType.SLOPE:
-                        btn.config(text="›", bg="gray")
-                    elif terrain == HazardType.TREES:
-                        btn.config(text="↟", bg="darkgreen")
-                    elif terrain == HazardType.ROUGH:
-                        btn.config(text="෴", bg="brown")
-                else:
-                    btn.config(text=" ", bg="white")
+            self.dirty_cells.update((x, y) for x in range(len(row)))
+
+    def schedule_redraw(self):
+        """Coalesce pending cell updates into one redraw when Tk is idle."""
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after_idle(self.redraw)
+
+    def redraw(self):
+        """Reconfigure only the dirty buttons whose symbol or color changed."""
+        self.redraw_pending = False
+        dirty, self.dirty_cells = self.dirty_cells, set()
+        if self.course_view is not None:
+            self.course_view.update(dirty)
+            return
+        for x, y in dirty:
+            appearance = self.cell_appearance(x, y)
+            if self.shown_cells[y][x] != appearance:
+                text, bg = appearance
+                self.grid_buttons[y][x].config(text=text, bg=bg)
+                self.shown_cells[y][x] = appearance
+
+    def cell_appearance(self, x, y):
+        """The (text, bg) a cell should show for the current game state."""
+        if (x, y) == self.engine.ball.getPosition():
+            text, bg = "o", "yellow"
+        elif (x, y) == self.engine.activeCourse.getHolePosition():
+            text, bg = "●", "green"
+        else:
+            text, bg = TERRAIN_APPEARANCE.get(self.engine.activeCourse.getTerrain(x, y), UNKNOWN_APPEARANCE)
+            if self.risk_levels is not None:
+                bg = RISK_COLORS[self.risk_levels[y][x]]
+        if (x, y) == self.hint_cell:
+            bg = HINT_COLOR
+        elif (x, y) in self.highlighted_cells:
+            bg = HIGHLIGHT_COLOR
+        return text, bg
 
 
 if __name__ == "__main__":
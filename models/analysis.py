@@ -0,0 +1,118 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure Python
+    np = None
+
+from enums import GameMode, ClubType
+from .course import Course, SHOT_DIRECTIONS
+from .solver import Shot, _shotOutcomes
+
+REDUCTIONS = ("mean", "min", "max")
+
+
+class ShotDistribution:
+    """
+    Every outcome of every shot from every square of a course. For action
+    a = actions[a] (club, dx, dy) and outcome k (the d6 roll in DICE_GOLF;
+    a SPEED_GOLF shot has one outcome), a shot from cell s comes to rest on
+    cell landing[a][k][s] having cost penalty[a][k][s] extra strokes, with
+    probability probabilities[k]. Cells are row-major indices. Out-of-bounds
+    shots and hazard chains off the course leave the ball on s, as in
+    GameEngine.takeShot.
+
+    With NumPy the tables are int32 arrays of shape (actions, outcomes,
+    cells) and results are arrays; without it, nested lists.
+    """
+    def __init__(self, width: int, height: int, mode: GameMode, actions: List[Shot],
+                 probabilities, landing, penalty):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.actions = actions
+        self.probabilities = probabilities
+        self.landing = landing
+        self.penalty = penalty
+
+    def outcomes(self, x: int, y: int, club: ClubType, dx: int, dy: int) -> Dict[Tuple[Tuple[int, int], int], float]:
+        """{(resting square, penalty): probability} for one shot from (x, y)."""
+        a = self.actions.index((club, dx, dy))
+        s = y * self.width + x
+        result: Dict[Tuple[Tuple[int, int], int], float] = {}
+        for k, probability in enumerate(self.probabilities):
+            t, penalty = int(self.landing[a][k][s]), int(self.penalty[a][k][s])
+            key = ((t % self.width, t // self.width), penalty)
+            result[key] = result.get(key, 0.0) + float(probability)
+        return result
+
+    def expectedLoss(self):
+        """
+        Per action and cell, the strokes a shot is expected to waste: its
+        penalty plus the chance it leaves the ball where it was (out of
+        bounds, carried back, or no distance at all).
+        """
+        if np is not None:
+            n = self.width * self.height
+            wasted = self.penalty + (self.landing == np.arange(n))
+            return np.tensordot(self.probabilities, wasted, axes=([0], [1]))
+        return [
+            [
+                sum(p * (penalty_k[s] + (landing_k[s] == s))
+                    for p, landing_k, penalty_k in zip(self.probabilities, landing_a, penalty_a))
+                for s in range(self.width * self.height)
+            ]
+            for landing_a, penalty_a in zip(self.landing, self.penalty)
+        ]
+
+    def riskMap(self, reduce: str = "mean"):
+        """
+        expectedLoss combined over the actions from each square ("mean": a
+        shot in any direction, "min": the safest shot, "max": the worst),
+        as a (height, width) grid.
+        """
+        if reduce not in REDUCTIONS:
+            raise ValueError(f"reduce must be one of {REDUCTIONS}, not {reduce!r}")
+        loss = self.expectedLoss()
+        if np is not None:
+            return getattr(loss, reduce)(axis=0).reshape(self.height, self.width)
+        combine = {"mean": lambda values: sum(values) / len(values), "min": min, "max": max}[reduce]
+        per_cell = [combine(values) for values in zip(*loss)]
+        return [per_cell[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+
+
+def _actions(clubs: Optional[Iterable[ClubType]]) -> List[Shot]:
+    return [(club, dx, dy) for club in (clubs or ClubType) for dx, dy in SHOT_DIRECTIONS]
+
+
+def shot_distribution(course: Course, mode: GameMode,
+                      clubs: Optional[Iterable[ClubType]] = None) -> ShotDistribution:
+    """
+    The ShotDistribution of `course` under `mode` for every direction and
+    every club (or just `clubs`), computed for the whole grid at once with
+    the solver's transition builder, so the same rules and hazard table as
+    the engine. With NumPy the result takes 8 bytes per action, outcome and
+    cell (24 actions and 6 rolls in DICE_GOLF), and building it a few times
+    that; pass `clubs` to cut it down on very large courses.
+    """
+    actions, probabilities, landing, penalty = _shotOutcomes(course, mode, _actions(clubs))
+    if np is not None:
+        probabilities = np.asarray(probabilities)
+    return ShotDistribution(course.width, course.height, mode, actions, probabilities, landing, penalty)
+
+
+def risk_heatmap(course: Course, mode: GameMode, reduce: str = "mean"):
+    """Expected strokes wasted by a shot from each square (see ShotDistribution.riskMap)."""
+    return shot_distribution(course, mode).riskMap(reduce)
+
+
+def course_difficulty(course: Course, mode: GameMode) -> float:
+    """
+    Average strokes a shot wastes to hazards and the course edge, over
+    every square, direction and club: a simulation-free difficulty rating
+    for comparing courses.
+    """
+    heatmap = risk_heatmap(course, mode)
+    if np is not None:
+        return float(heatmap.mean())
+    return sum(map(sum, heatmap)) / (course.width * course.height)
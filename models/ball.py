@@ -2,6 +2,8 @@ from typing import Tuple
 
 class Ball:
     """Represents the position of the ball."""
+    __slots__ = ("x", "y")
+
     def __init__(self, x: int = 0, y: int = 0):
         self.x = x
         self.y = y
@@ -15,4 +17,7 @@ class Ball:
         self.y = y
 
     def getPosition(self) -> Tuple[int, int]:
-        return (self.x, self.y)
\ No newline at end of file
+        return (self.x, self.y)
+
+    def copy(self) -> "Ball":
+        return Ball(self.x, self.y)
\ No newline at end of file
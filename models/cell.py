@@ -1,9 +1,20 @@
 from enums import HazardType
 
+# Array-backed courses store one small integer code per square; the code
+# is the terrain's index in TERRAINS.
+TERRAINS = tuple(HazardType)
+TERRAIN_CODES = {terrain: code for code, terrain in enumerate(TERRAINS)}
+
 class Cell:
     """Each cell on the course. Could contain hazards."""
+    __slots__ = ("terrain",)
+
     def __init__(self, terrain: HazardType):
         self.terrain = terrain
 
     def getTerrain(self) -> HazardType:
-        return self.terrain
\ No newline at end of file
+        return self.terrain
+
+# Shared Cell instances, one per terrain code. Courses hand these out from
+# getCell, so they must be treated as read-only.
+FLYWEIGHT_CELLS = tuple(Cell(terrain) for terrain in TERRAINS)
@@ -2,6 +2,8 @@ from enums import ClubType
 
 class Club:
     """Base class for clubs."""
+    __slots__ = ("clubType",)
+
     def __init__(self, club_type: ClubType):
         self.clubType = club_type
 
@@ -13,6 +15,8 @@ class Club:
         return 0
 
 class Driver(Club):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(ClubType.DRIVER)
 
@@ -20,6 +24,8 @@ class Driver(Club):
         return 6  # e.g., 6 spaces
 
 class Iron(Club):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(ClubType.IRON)
 
@@ -27,8 +33,13 @@ class Iron(Club):
         return 3  # e.g., 3 spaces normally
 
 class Putter(Club):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(ClubType.PUTTER)
 
     def getBaseDistance(self) -> int:
-        return 1  # e.g., 1 space
\ No newline at end of file
+        return 1  # e.g., 1 space
+
+# Clubs hold no per-shot state, so one shared instance per type serves everyone.
+CLUBS = {club.getType(): club for club in (Driver(), Iron(), Putter())}
@@ -1,51 +1,247 @@
+import functools
+import hashlib
 import random
-from typing import Optional, Tuple
+import struct
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple
 
 from enums import HazardType, CourseType
-from .cell import Cell
+from .cell import Cell, FLYWEIGHT_CELLS, TERRAINS, TERRAIN_CODES
+from .rules import HazardTable
+
+FAIRWAY_CODE = TERRAIN_CODES[HazardType.FAIRWAY]
+_VALID_CODES = bytes(range(len(TERRAINS)))
+
+_REACHABILITY_SIZES = 8  # Course sizes whose reachability index is kept for new courses
+
+
+@functools.lru_cache(maxsize=_REACHABILITY_SIZES)
+def _reachability_index(width: int, height: int) -> Dict[Tuple[int, int], FrozenSet[Tuple[int, int]]]:
+    # Courses hold on to their index, so evicting a size only stops new courses sharing it
+    return {}
+
+# The eight shot directions (dx, dy): NW, N, NE, E, SE, S, SW, W.
+SHOT_DIRECTIONS = ((-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0))
+
+# Relative terrain frequencies used by Course.generate for each course type.
+# Uniform by default; adjust these (or pass weights=) to rebalance courses.
+TERRAIN_WEIGHTS: Dict[CourseType, Dict[HazardType, float]] = {
+    course_type: {terrain: 1.0 for terrain in TERRAINS} for course_type in CourseType
+}
+
+# Generation methods and their versions:
+# "exact" draws each square with rng.choices, exactly honouring the weights.
+# "bulk" draws one random byte per square and maps it through a 256-entry
+# table with bytes.translate, so weights are rounded to multiples of 1/256
+# but whole grids are filled at C speed.
+# Bump a method's version whenever its seed -> course mapping changes, so
+# caches keyed by seed never serve a course the generator would not produce.
+GENERATOR_VERSIONS = {"exact": 1, "bulk": 1}
+GENERATION_METHODS = tuple(GENERATOR_VERSIONS)
+_CHUNK_CELLS = 1 << 20
+
+
+def iter_terrain_chunks(
+    width: int,
+    height: int,
+    rng: Optional[random.Random] = None,
+    weights: Optional[Mapping[HazardType, float]] = None,
+    method: str = "exact",
+    chunk_cells: int = _CHUNK_CELLS,
+) -> Iterator[bytes]:
+    """
+    Generate a course's row-major terrain codes as a stream of chunks of
+    whole rows (about `chunk_cells` squares each), with the first and last
+    rows set to fairway. Lets grids too big to hold at once be written out
+    piece by piece; Course.generate assembles the same stream.
+    """
+    if rng is None:
+        rng = random
+    if method not in GENERATION_METHODS:
+        raise ValueError(f"unknown generation method {method!r}")
+    codes = _terrain_weights(weights)
+    rows_per_chunk = max(1, chunk_cells // max(width, 1))
+    fairway_row = bytes([FAIRWAY_CODE]) * width
+
+    population = range(len(TERRAINS))
+    table = _byte_table(codes) if method == "bulk" else None
+    uniform = len(set(codes)) == 1
+
+    def draw(cells: int) -> bytes:
+        if table is not None:
+            return rng.randbytes(cells).translate(table)
+        if uniform:
+            return bytes(rng.choices(population, k=cells))
+        return bytes(rng.choices(population, weights=codes, k=cells))
+
+    for first_row in range(0, height, rows_per_chunk):
+        last_row = min(first_row + rows_per_chunk, height)
+        chunk = bytearray(draw((last_row - first_row) * width))
+        if first_row == 0:
+            chunk[0:width] = fairway_row
+        if last_row == height:
+            chunk[len(chunk) - width:] = fairway_row
+        yield bytes(chunk)
+
+
+def _terrain_weights(weights: Optional[Mapping[HazardType, float]]) -> List[float]:
+    """Weights in TERRAINS (terrain code) order."""
+    if weights is None:
+        return [1.0] * len(TERRAINS)
+    codes = [float(weights.get(terrain, 0.0)) for terrain in TERRAINS]
+    if min(codes) < 0 or sum(codes) <= 0:
+        raise ValueError("terrain weights must be non-negative with a positive total")
+    return codes
+
+
+def _byte_table(weights: List[float]) -> bytes:
+    """256-entry byte -> terrain code table, by largest remainder."""
+    total = sum(weights)
+    shares = [256 * w / total for w in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(range(len(weights)), key=lambda code: shares[code] - counts[code], reverse=True)
+    for code in by_remainder[:256 - sum(counts)]:
+        counts[code] += 1
+    return b"".join(bytes([code]) * count for code, count in enumerate(counts))
 
 class Course:
-    """A Course holds a grid of cells and has a hole position."""
+    """
+    A Course holds a grid of cells and has a hole position.
+    The grid is stored as one row-major bytearray of terrain codes
+    (see models.cell.TERRAINS); getCell hands out shared flyweight Cells.
+    """
     def __init__(self, width: int, height: int, course_type: CourseType):
         self.width = width
         self.height = height
         self.course_type = course_type
-        self.cells = []  # type: list[list[Cell]]
+        self.terrain = bytearray([FAIRWAY_CODE]) * (width * height)
+        self.revision = 0  # Bumped whenever the terrain changes
+        # Reachability index: (cell index, distance) -> reachable cells.
+        # It depends only on the dimensions, so same-sized courses share it
+        # (for the most recently used _REACHABILITY_SIZES sizes).
+        self._reachable = _reachability_index(width, height)
         self.holePosition = (width // 2, 0)  # By default, near top middle
+        self._hazards: Optional[HazardTable] = None
 
-    def generate(self):
+    def generate(self, rng: Optional[random.Random] = None,
+                 weights: Optional[Mapping[HazardType, float]] = None,
+                 method: str = "exact"):
         """
         Procedurally generate the course grid with hazards, etc.
         This is a simplistic generator for demo purposes.
+        Draws from `rng` (default: the global random module), with terrain
+        `weights` defaulting to TERRAIN_WEIGHTS for the course type; see
+        GENERATION_METHODS for `method`.
         """
-        self.cells = []
-        for y in range(self.height):
-            row = []
-            for x in range(self.width):
-                # Random terrain for demonstration only:
-                terrain = random.choice(list(HazardType))
-                row.append(Cell(terrain))
-            self.cells.append(row)
-
-        # Make the bottom row (start) always fairway
-        for x in range(self.width):
-            self.cells[self.height - 1][x] = Cell(HazardType.FAIRWAY)
-
-        # Make the top row (hole area) always fairway
-        for x in range(self.width):
-            self.cells[0][x] = Cell(HazardType.FAIRWAY)
+        if rng is None:
+            rng = random
+        if weights is None:
+            weights = TERRAIN_WEIGHTS[self.course_type]
+
+        # Random terrain for demonstration only; the bottom row (start) and
+        # the top row (hole area) are always fairway
+        terrain = bytearray(self.width * self.height)
+        offset = 0
+        for chunk in iter_terrain_chunks(self.width, self.height, rng, weights, method):
+            terrain[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        self.terrain = terrain
+        self.revision += 1
 
         # Place the hole somewhere on the top row
-        hole_x = random.randint(0, self.width - 1)
+        hole_x = rng.randint(0, self.width - 1)
         self.holePosition = (hole_x, 0)
 
+    @classmethod
+    def fromTerrain(cls, width: int, height: int, course_type: CourseType,
+                    terrain: bytes, holePosition: Optional[Tuple[int, int]] = None) -> "Course":
+        """Build a course around an existing row-major buffer of terrain codes."""
+        if len(terrain) != width * height:
+            raise ValueError(f"expected {width * height} terrain codes, got {len(terrain)}")
+        course = cls(width, height, course_type)
+        course.terrain = bytearray(terrain)
+        if course.terrain.translate(None, _VALID_CODES):
+            raise ValueError("terrain buffer contains an unknown terrain code")
+        if holePosition is not None:
+            course.holePosition = holePosition
+        return course
+
+    @property
+    def cells(self) -> List[List[Cell]]:
+        """Read-only 2D view of the grid as (shared) Cell objects."""
+        width, terrain = self.width, self.terrain
+        return [
+            [FLYWEIGHT_CELLS[code] for code in terrain[y * width:(y + 1) * width]]
+            for y in range(self.height)
+        ]
+
     def getCell(self, x: int, y: int) -> Optional[Cell]:
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.cells[y][x]
+            return FLYWEIGHT_CELLS[self.terrain[y * self.width + x]]
+        return None
+
+    def getTerrain(self, x: int, y: int) -> Optional[HazardType]:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return TERRAINS[self.terrain[y * self.width + x]]
         return None
 
+    def setTerrain(self, x: int, y: int, terrain: HazardType):
+        if not self.isValidPosition(x, y):
+            raise IndexError(f"({x}, {y}) is outside the course")
+        self.terrain[y * self.width + x] = TERRAIN_CODES[terrain]
+        self.revision += 1
+
+    def hazardTable(self) -> HazardTable:
+        """Resolved hazard chains for this terrain (see models.rules.HazardTable), rebuilt after changes."""
+        table = self._hazards
+        if table is None or table.revision != self.revision or table.terrain is not self.terrain:
+            table = self._hazards = HazardTable(self.width, self.height, self.terrain, self.revision)
+        return table
+
     def getHolePosition(self) -> Tuple[int, int]:
         return self.holePosition
 
     def isValidPosition(self, x: int, y: int) -> bool:
-        return (0 <= x < self.width) and (0 <= y < self.height)
\ No newline at end of file
+        return (0 <= x < self.width) and (0 <= y < self.height)
+
+    def getReachableCells(self, x: int, y: int, distance: int) -> FrozenSet[Tuple[int, int]]:
+        """
+        Cells reachable from (x, y) along the eight shot lines, one to
+        `distance` steps out, stopping at the course edge. Each
+        (cell, distance) pair is computed once and then served from the index.
+        """
+        key = (y * self.width + x, distance)
+        cells = self._reachable.get(key)
+        if cells is None:
+            cells = frozenset(self._walkShotLines(x, y, distance))
+            self._reachable[key] = cells
+        return cells
+
+    def _walkShotLines(self, x: int, y: int, distance: int):
+        # Steps left to each edge; a line stops at the nearest edge it heads for.
+        room_x = {-1: x, 0: distance, 1: self.width - 1 - x}
+        room_y = {-1: y, 0: distance, 1: self.height - 1 - y}
+        for dx, dy in SHOT_DIRECTIONS:
+            for step in range(1, min(distance, room_x[dx], room_y[dy]) + 1):
+                yield (x + dx * step, y + dy * step)
+
+    def gridKey(self) -> bytes:
+        """Content hash of the dimensions, hole and terrain grid."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(struct.pack("<4i", self.width, self.height, *self.holePosition))
+        digest.update(self.terrain)
+        return digest.digest()
+
+    def copy(self) -> "Course":
+        """Return an independent course with a copy of the terrain buffer."""
+        clone = Course(self.width, self.height, self.course_type)
+        clone.terrain = bytearray(self.terrain)
+        clone.holePosition = self.holePosition
+        return clone
+
+    def asArray(self):
+        """
+        Return the terrain as a (height, width) NumPy uint8 array sharing
+        memory with the course. Requires NumPy.
+        """
+        import numpy as np
+        return np.frombuffer(self.terrain, dtype=np.uint8).reshape(self.height, self.width)
@@ -0,0 +1,193 @@
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from enums import GameMode, CourseType
+from .course import Course, GENERATOR_VERSIONS
+from .rng import SeededRandom
+
+
+class CourseKey(NamedTuple):
+    """Identifies a course: generated from `seed` (or, e.g., a DB id) by `generator`."""
+    courseType: CourseType
+    width: int
+    height: int
+    seed: int
+    generator: str  # e.g. "exact-1"; "db-1" for courses loaded from the database
+
+
+def generator_id(method: str = "exact") -> str:
+    return f"{method}-{GENERATOR_VERSIONS[method]}"
+
+
+class _Entry:
+    __slots__ = ("course", "artifacts", "size")
+
+    def __init__(self, course: Course, size: int):
+        self.course = course
+        self.artifacts: Dict[Hashable, Any] = {}
+        self.size = size
+
+
+class CourseCache:
+    """
+    Thread-safe LRU cache of courses and their derived artifacts (render
+    rows, solver tables, ...), bounded by an estimate of the memory they
+    use and optionally by entry count. Evicting a course drops its
+    artifacts with it.
+
+    Cached courses are shared between callers and must not be modified.
+    """
+    def __init__(self, maxBytes: int = 256 * 1024 * 1024, maxEntries: Optional[int] = None):
+        self.maxBytes = maxBytes
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.currentBytes = 0
+        self._entries: "OrderedDict[CourseKey, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: CourseKey) -> Optional[Course]:
+        with self._lock:
+            entry = self._lookup(key)
+            return entry.course if entry else None
+
+    def put(self, key: CourseKey, course: Course) -> Course:
+        """Cache `course` under `key`; if another thread won the race, keep theirs."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(course, _course_size(course))
+                self._entries[key] = entry
+                self.currentBytes += entry.size
+                self._evict()
+            return entry.course
+
+    def getOrCreate(self, key: CourseKey, factory: Callable[[], Course]) -> Course:
+        """Cached course for `key`, calling `factory` (outside the lock) on a miss."""
+        course = self.get(key)
+        if course is None:
+            course = self.put(key, factory())
+        return course
+
+    def getOrGenerate(self, courseType: CourseType, width: int, height: int,
+                      seed: int, method: str = "exact") -> Course:
+        """The course Course.generate produces from SeededRandom(seed), cached."""
+        def generate() -> Course:
+            course = Course(width, height, courseType)
+            course.generate(SeededRandom(seed), method=method)
+            return course
+        return self.getOrCreate(CourseKey(courseType, width, height, seed, generator_id(method)), generate)
+
+    def artifact(self, key: CourseKey, name: Hashable, factory: Callable[[Course], Any],
+                 size: Optional[int] = None) -> Any:
+        """
+        Derived data `name` for the cached course `key`, built by
+        factory(course) on first use and then kept (and counted against
+        the memory bound) until the course is evicted.
+        Raises KeyError if the course is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(key)
+            if name in entry.artifacts:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.artifacts[name]
+            self.misses += 1
+            course = entry.course
+        value = factory(course)
+        with self._lock:
+            if self._entries.get(key) is entry and name not in entry.artifacts:
+                entry.artifacts[name] = value
+                added = size if size is not None else _approximate_size(value)
+                entry.size += added
+                self.currentBytes += added
+                self._evict()
+            return entry.artifacts.get(name, value)
+
+    def renderRows(self, key: CourseKey):
+        """Static terrain rows for CourseRenderer.prime."""
+        from .renderer import terrain_rows
+        return self.artifact(key, "render", terrain_rows)
+
+    def solverTable(self, key: CourseKey, mode: GameMode):
+        """Expected-strokes table (models.solver) for the course under `mode`."""
+        from .solver import solve
+        return self.artifact(key, ("solver", mode), lambda course: solve(course, mode, cached=False))
+
+    def distanceField(self, key: CourseKey, mode: GameMode):
+        """Fewest-strokes field (models.solver.DistanceField) for hints and move ordering."""
+        from .solver import distance_field
+        return self.artifact(key, ("distance", mode), lambda course: distance_field(course, mode, cached=False))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.currentBytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.currentBytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: CourseKey) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while self._entries and (
+            self.currentBytes > self.maxBytes
+            or (self.maxEntries is not None and len(self._entries) > self.maxEntries)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self.currentBytes -= entry.size
+            self.evictions += 1
+
+
+_EMPTY_ARRAY_SIZE = sys.getsizeof(array("i"))
+
+
+def _course_size(course: Course) -> int:
+    """
+    The course, plus the HazardTable it caches on itself (Course.hazardTable)
+    as soon as a shot is played on it: two int32 arrays per square, counted
+    up front whether or not it is built yet.
+    """
+    hazards = 2 * (_EMPTY_ARRAY_SIZE + 4 * course.width * course.height)
+    return sys.getsizeof(course.terrain) + sys.getsizeof(course.__dict__) + hazards
+
+
+def _approximate_size(value: Any) -> int:
+    """Rough footprint: NumPy nbytes, or the object plus its direct items."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(value)
+    items = None
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif isinstance(value, dict):
+        items = list(value.keys()) + list(value.values())
+    elif hasattr(value, "__dict__"):
+        items = list(vars(value).values())
+    for item in items or ():
+        size += _approximate_size(item) if isinstance(item, (list, tuple, dict)) else sys.getsizeof(item)
+    return size
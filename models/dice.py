@@ -1,7 +1,25 @@
 import random
+from typing import List, Optional
 
 class Dice:
     """Dice logic for Dice Golf mode."""
-    @staticmethod
-    def rollD6() -> int:
-        return random.randint(1, 6)
\ No newline at end of file
+    def __init__(self, rng: Optional[random.Random] = None):
+        # Any random.Random (or the random module itself, the default)
+        self.rng = rng if rng is not None else random
+        # Every roll drawn so far (shared with forks) and the index of the
+        # next one, so moving `position` back replays the same rolls.
+        self.rolls: List[int] = []
+        self.position = 0
+
+    def rollD6(self) -> int:
+        if self.position == len(self.rolls):
+            self.rolls.append(self.rng.randint(1, 6))
+        roll = self.rolls[self.position]
+        self.position += 1
+        return roll
+
+    def fork(self) -> "Dice":
+        """Dice at the same position that will roll the same numbers as this one."""
+        twin = Dice.__new__(Dice)
+        twin.rng, twin.rolls, twin.position = self.rng, self.rolls, self.position
+        return twin
@@ -0,0 +1,163 @@
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from enums import EngineEvent
+
+if TYPE_CHECKING:
+    from .game_engine import GameEngine
+
+# listener(event, engine, fields); `fields` holds the keys in EVENT_FIELDS.
+Listener = Callable[[EngineEvent, "GameEngine", dict], None]
+
+# Fields passed with each event. Positions are (x, y) tuples.
+EVENT_FIELDS = {
+    # origin: ball before the shot; position: ball after it (and any hazard)
+    EngineEvent.SHOT_TAKEN: ("club", "dx", "dy", "distance", "origin", "position", "strokes"),
+    # position: where the ball landed; outcome: where the hazard left it
+    EngineEvent.HAZARD_APPLIED: ("hazard", "position", "outcome", "strokes"),
+    EngineEvent.MULLIGAN_USED: ("revert", "position", "mulligans", "strokes"),
+    # target: the off-course square the shot was aimed at; the ball stays put
+    EngineEvent.OUT_OF_BOUNDS: ("club", "dx", "dy", "distance", "origin", "target"),
+    EngineEvent.HOLE_COMPLETED: ("strokes", "mulligans"),
+}
+
+
+class EventHub:
+    """
+    Per-engine observer registry. The engine checks `active` before
+    building an event, so an engine with no listeners pays one attribute
+    test per emit site.
+    """
+    __slots__ = ("active", "_listeners")
+
+    def __init__(self):
+        self.active = False
+        self._listeners: Dict[EngineEvent, List[Listener]] = {}
+
+    def subscribe(self, listener: Listener, *events: EngineEvent) -> Callable[[], None]:
+        """Call `listener` for `events` (default: all); returns an unsubscribe function."""
+        events = events or tuple(EngineEvent)
+        for event in events:
+            self._listeners.setdefault(event, []).append(listener)
+        self.active = True
+
+        def unsubscribe():
+            for event in events:
+                listeners = self._listeners.get(event, [])
+                if listener in listeners:
+                    listeners.remove(listener)
+                    if not listeners:
+                        del self._listeners[event]
+            self.active = bool(self._listeners)
+        return unsubscribe
+
+    def emit(self, event: EngineEvent, engine: "GameEngine", **fields):
+        for listener in tuple(self._listeners.get(event, ())):
+            listener(event, engine, fields)
+
+
+class TimingHistogram:
+    """Call durations in power-of-two nanosecond buckets; mergeable."""
+    __slots__ = ("count", "totalNs", "minNs", "maxNs", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.totalNs = 0
+        self.minNs: Optional[int] = None
+        self.maxNs: Optional[int] = None
+        self.buckets = [0] * 64  # bucket b holds durations in [2**(b-1), 2**b)
+
+    def add(self, ns: int):
+        self.count += 1
+        self.totalNs += ns
+        if self.minNs is None or ns < self.minNs:
+            self.minNs = ns
+        if self.maxNs is None or ns > self.maxNs:
+            self.maxNs = ns
+        self.buckets[min(ns.bit_length(), 63)] += 1
+
+    def merge(self, other: "TimingHistogram"):
+        self.count += other.count
+        self.totalNs += other.totalNs
+        for bound in (other.minNs, other.maxNs):
+            if bound is None:
+                continue
+            if self.minNs is None or bound < self.minNs:
+                self.minNs = bound
+            if self.maxNs is None or bound > self.maxNs:
+                self.maxNs = bound
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """Upper bound (ns) of the bucket holding the given fraction of calls."""
+        if not self.count:
+            return None
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted and count:
+                return min(1 << bucket, self.maxNs)
+        return self.maxNs
+
+    def asDict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ns": self.totalNs / self.count if self.count else None,
+            "min_ns": self.minNs,
+            "max_ns": self.maxNs,
+            "p50_ns": self.percentile(0.5),
+            "p99_ns": self.percentile(0.99),
+        }
+
+
+class EngineMetrics:
+    """
+    Event counters and timing histograms for takeShot, placeBall,
+    applyHazardEffects and renderCourse. One instance can be attached to
+    many engines (e.g. every session in a server) to aggregate them;
+    it is not thread-safe, so give each thread or process its own and merge.
+    """
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, TimingHistogram] = {}
+
+    def attach(self, engine: "GameEngine") -> Callable[[], None]:
+        """Start timing and counting `engine`; returns a function that detaches it."""
+        engine.metrics = self
+        unsubscribe = engine.events.subscribe(self._onEvent)
+
+        def detach():
+            unsubscribe()
+            if engine.metrics is self:
+                engine.metrics = None
+        return detach
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def time(self, name: str, ns: int):
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = TimingHistogram()
+        histogram.add(ns)
+
+    def merge(self, other: "EngineMetrics"):
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+        for name, histogram in other.timings.items():
+            self.timings.setdefault(name, TimingHistogram()).merge(histogram)
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
+
+    def asDict(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timings": {name: histogram.asDict() for name, histogram in self.timings.items()},
+        }
+
+    def _onEvent(self, event: EngineEvent, engine: "GameEngine", fields: dict):
+        self.count(event.name.lower())
+        if event == EngineEvent.HAZARD_APPLIED:
+            self.count(f"hazard_{fields['hazard'].name.lower()}")
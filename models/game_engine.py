@@ -1,36 +1,127 @@
-from typing import Optional
+from collections import deque
+from time import perf_counter_ns
+from typing import Callable, Deque, List, NamedTuple, Optional, Tuple
 
-from enums import GameMode, HazardType, ClubType, CourseType
+from enums import GameMode, HazardType, ClubType, CourseType, EngineEvent
+from .cell import TERRAINS
 from .dice import Dice
-from .clubs import Driver, Iron, Putter
+from .clubs import CLUBS
 from .course import Course
+from .course_cache import CourseCache, CourseKey, generator_id
+from .events import EngineMetrics, EventHub
 from .player import Player
 from .ball import Ball
+from .renderer import CourseRenderer
+from .replay import ReplayLog
+from .rng import SeededRandom, derive_seed
+from .savestate import load_state, save_state
+from .rules import CLUB_DISTANCES, CODE_HAZARDS, DISTANCE_MODIFIERS, OFF_COURSE, TERRAIN_SYMBOLS
+
+# Grid size (width, height) generated for each course type.
+COURSE_DIMENSIONS = {
+    CourseType.SHORT_COURSE: (8, 13),
+    CourseType.MEDIUM_COURSE: (10, 15),
+    CourseType.LONG_COURSE: (12, 17),
+}
+
+# A policy picks the next shot for a running engine: (club, dx, dy).
+ShotPolicy = Callable[["GameEngine"], Tuple[ClubType, int, int]]
+
+
+# Decides after a shot whether to spend a mulligan and replay it.
+MulliganRule = Callable[["GameEngine"], bool]
+
+
+class HoleResult(NamedTuple):
+    """Outcome of one simulated hole."""
+    strokes: int
+    completed: bool
+    path: Tuple[Tuple[int, int], ...]
+    hazards: Tuple[HazardType, ...]
+    mulligans: int = 0
+
+
+class EngineSnapshot(NamedTuple):
+    """
+    Immutable engine state. The course, dice roll tape and replay log are
+    shared by reference; only their positions are recorded.
+    """
+    mode: Optional[GameMode]
+    course: Optional[Course]
+    ball: Optional[Tuple[int, int]]
+    previousPosition: Optional[Tuple[int, int]]
+    playerName: Optional[str]
+    strokes: int
+    mulligans: int
+    strokeCount: int
+    pendingRoll: Optional[int]
+    lastHazard: Optional[HazardType]
+    dice: Dice
+    dicePosition: int
+    replayLog: Optional[ReplayLog]
+    replayLength: int
+
 
 class GameEngine:
     """Controls the flow of the game and integrates all components."""
-    def __init__(self):
+    def __init__(self, headless: bool = False, seed: Optional[int] = None,
+                 courseCache: Optional[CourseCache] = None, undoDepth: int = 0):
         self.currentMode: Optional[GameMode] = None
-        self.dice: Dice = Dice()
+        # Every game draws its course and dice from streams derived from this
+        # seed and the game's index, so any game can be reproduced exactly.
+        self.rng: SeededRandom = SeededRandom(seed)
+        self.gameIndex: int = 0
+        self.replayLog: Optional[ReplayLog] = None
+        self.dice: Dice = Dice(self.rng.spawn("dice", 0))
         self.activeCourse: Optional[Course] = None
         self.player: Optional[Player] = None
         self.ball: Optional[Ball] = None
         self.strokeCount: int = 0
-
-    def startGame(self, mode: GameMode, courseType: CourseType):
+        # Headless engines never print or render; used for simulation.
+        self.headless: bool = headless
+        # Console renderer; point renderer.stream elsewhere or set
+        # renderer.enabled = False for a quiet, non-headless engine.
+        self.renderer: CourseRenderer = CourseRenderer(enabled=not headless)
+        self.lastHazard: Optional[HazardType] = None
+        self.previousPosition: Optional[Tuple[int, int]] = None  # Ball before the last shot
+        self.pendingRoll: Optional[int] = None  # DICE_GOLF roll not yet used by a shot
+        # Observers (see models.events.EVENT_FIELDS) and optional timings;
+        # both cost next to nothing while unused.
+        self.events: EventHub = EventHub()
+        self.metrics: Optional[EngineMetrics] = None
+        # With undoDepth > 0, every shot, mulligan and placeBall first pushes
+        # a snapshot; the oldest are dropped beyond undoDepth.
+        self.undoStack: Optional[Deque[EngineSnapshot]] = deque(maxlen=undoDepth) if undoDepth > 0 else None
+        # Optional shared cache of generated courses (and their render rows);
+        # cached courses are shared, so the engine never modifies them.
+        self.courseCache: Optional[CourseCache] = courseCache
+        self.courseKey: Optional[CourseKey] = None
+
+    def startGame(self, mode: GameMode, courseType: CourseType, size: Optional[Tuple[int, int]] = None):
+        """Start a hole on a new course: `courseType`'s own dimensions, or (width, height) `size`."""
+        if size is not None and size == COURSE_DIMENSIONS[courseType]:
+            size = None
+        width, height = size or COURSE_DIMENSIONS[courseType]
+        if width < 1 or height < 1:
+            raise ValueError(f"course size must be positive, not {width}x{height}")
         self.currentMode = mode
         self.player = Player("Golfer1")
         self.ball = Ball()
+        self.dice = Dice(self.rng.spawn("dice", self.gameIndex))
+        self.replayLog = ReplayLog(self.rng.initialSeed, mode, courseType, self.gameIndex, size)
 
         # Generate or load a course
-        width, height = 8, 13  # Example defaults
-        if courseType == CourseType.MEDIUM_COURSE:
-            width, height = 10, 15
-        elif courseType == CourseType.LONG_COURSE:
-            width, height = 12, 17
-
-        self.activeCourse = Course(width, height, courseType)
-        self.activeCourse.generate()
+        course_seed = derive_seed(self.rng.initialSeed, "course", self.gameIndex)
+        if self.courseCache is None:
+            self.courseKey = None
+            self.activeCourse = Course(width, height, courseType)
+            self.activeCourse.generate(SeededRandom(course_seed))
+        else:
+            self.courseKey = CourseKey(courseType, width, height, course_seed, generator_id())
+            self.activeCourse = self.courseCache.getOrGenerate(courseType, width, height, course_seed)
+            if not self.headless:
+                self.renderer.prime(self.activeCourse, self.courseCache.renderRows(self.courseKey))
+        self.gameIndex += 1
 
         # Place ball at bottom fairway (center)
         start_x = width // 2
@@ -38,6 +129,13 @@ class GameEngine:
         self.ball.setPosition(start_x, start_y)
 
         self.strokeCount = 0
+        self.lastHazard = None
+        self.previousPosition = None
+        self.pendingRoll = None
+        if self.undoStack is not None:
+            self.undoStack.clear()
+        if self.headless:
+            return
         print(f"Game Started: {mode.name} on {courseType.name} course.")
         print(f"Ball start: ({start_x}, {start_y}). Hole at {self.activeCourse.getHolePosition()}.")
         self.renderCourse()
@@ -48,98 +146,296 @@ class GameEngine:
         - SPEED_GOLF: pick club base distance, adjust for terrain.
         dx, dy = direction deltas.
         """
+        if self.metrics is None:
+            return self._takeShot(clubType, dx, dy)
+        started = perf_counter_ns()
+        self._takeShot(clubType, dx, dy)
+        self.metrics.time("takeShot", perf_counter_ns() - started)
+
+    def _takeShot(self, clubType: ClubType, dx: int, dy: int):
         if not (self.currentMode and self.activeCourse and self.ball and self.player):
-            print("Game not properly initialized.")
+            if not self.headless:
+                print("Game not properly initialized.")
             return
+        if self.undoStack is not None:
+            self.undoStack.append(self.snapshot())
+        self.replayLog.recordShot(clubType, dx, dy)
+        self.previousPosition = (self.ball.x, self.ball.y)
 
         if self.currentMode == GameMode.DICE_GOLF:
-            # For demonstration, roll a D6:
-            distance = self.dice.rollD6()
-
-            # If on fairway => +1, if on sand => -1
-            cell = self.activeCourse.getCell(self.ball.x, self.ball.y)
-            if cell and cell.getTerrain() == HazardType.FAIRWAY:
-                distance += 1
-            elif cell and cell.getTerrain() == HazardType.SAND:
-                distance -= 1
-
-            move_x = dx * distance
-            move_y = dy * distance
-
+            # For demonstration, roll a D6 (or use the roll already shown):
+            distance = self.rollDice()
+            self.pendingRoll = None
         else:  # SPEED_GOLF
-            if clubType == ClubType.DRIVER:
-                club = Driver()
-            elif clubType == ClubType.IRON:
-                club = Iron()
-            else:
-                club = Putter()
-
-            distance = club.getBaseDistance()
+            distance = CLUBS[clubType].getBaseDistance()
 
-            # If in sand and not Iron => -1
-            cell = self.activeCourse.getCell(self.ball.x, self.ball.y)
-            if cell and cell.getTerrain() == HazardType.SAND and clubType != ClubType.IRON:
-                distance -= 1
-
-            move_x = dx * distance
-            move_y = dy * distance
+        # Terrain modifiers (e.g. +1 from fairway, -1 from sand) from the rules table
+        course = self.activeCourse
+        distance += DISTANCE_MODIFIERS[self.currentMode, clubType][course.terrain[self.ball.y * course.width + self.ball.x]]
+        move_x = dx * distance
+        move_y = dy * distance
 
         # Attempt to move the ball
         new_x = self.ball.x + move_x
         new_y = self.ball.y + move_y
 
-        # Check for bounds
-        if not self.activeCourse.isValidPosition(new_x, new_y):
-            print("Shot goes out of bounds or into invalid position. Handle penalty or revert shot.")
+        # Check for bounds; shots along the eight lines go through the
+        # course's reachability index
+        self.lastHazard = None
+        if distance > 0 and -1 <= dx <= 1 and -1 <= dy <= 1 and (dx or dy):
+            in_bounds = (new_x, new_y) in self.activeCourse.getReachableCells(self.ball.x, self.ball.y, distance)
+        else:
+            in_bounds = self.activeCourse.isValidPosition(new_x, new_y)
+        if not in_bounds:
+            if self.events.active:
+                self.events.emit(EngineEvent.OUT_OF_BOUNDS, self, club=clubType, dx=dx, dy=dy,
+                                 distance=distance, origin=self.previousPosition, target=(new_x, new_y))
+            if not self.headless:
+                print("Shot goes out of bounds or into invalid position. Handle penalty or revert shot.")
             # You might revert the move or apply a penalty, up to you:
             # e.g., self.player.incrementStrokes()
         else:
             # Move the ball
             self.ball.setPosition(new_x, new_y)
             # Apply hazard effects
-            self.applyHazardEffects()
+            self.lastHazard = self.applyHazardEffects()
 
         # Increment stroke
         self.strokeCount += 1
         self.player.incrementStrokes()
+        if self.events.active:
+            self._emitShot(clubType, dx, dy, distance)
+        if self.headless:
+            return
         print(f"Shot taken. Distance: {distance}, Ball now at ({new_x}, {new_y}). Strokes: {self.player.getStrokes()}")
 
         # After the shot, render course again
         self.renderCourse()
 
-    def applyHazardEffects(self):
-        """Check the cell for hazards and apply effects (water, slope, etc.)."""
+    def rollDice(self) -> int:
+        """
+        Roll the d6 for the next DICE_GOLF shot ahead of taking it.
+        Rolling again before the shot returns the same roll.
+        """
+        if self.pendingRoll is None:
+            self.pendingRoll = self.dice.rollD6()
+        return self.pendingRoll
+
+    def applyHazardEffects(self) -> Optional[HazardType]:
+        """
+        Check the cell for hazards and apply effects (water, slope, etc.).
+        Returns the hazard that affected the ball, or None.
+        """
+        if self.metrics is None:
+            return self._applyHazardEffects()
+        started = perf_counter_ns()
+        hazard = self._applyHazardEffects()
+        self.metrics.time("applyHazardEffects", perf_counter_ns() - started)
+        return hazard
+
+    def _applyHazardEffects(self) -> Optional[HazardType]:
         if not (self.activeCourse and self.ball and self.player):
-            return
+            return None
 
+        course = self.activeCourse
         x, y = self.ball.getPosition()
-        cell = self.activeCourse.getCell(x, y)
-        if cell is None:
-            return
-
-        terrain = cell.getTerrain()
-        if terrain == HazardType.WATER:
-            print("Ball landed in WATER (♒︎)! +1 stroke penalty. Moving ball down 1 space.")
-            self.player.incrementStrokes()  # penalty
-            self.ball.move(0, 1)
-        elif terrain == HazardType.SLOPE:
-            # For demo, let slope push ball 1 space downward
-            print("Ball slid on SLOPE (›). Moving ball down 1 space.")
-            self.ball.move(0, 1)
-        elif terrain == HazardType.TREES:
-            # In a real game, you'd prevent or handle this more carefully
-            print("Encountered TREES (↟). Ball can only pass if shot from fairway, etc.")
-        # Add more logic if needed for ROUGH, etc.
-
-    def useMulligan(self):
-        """If the player has mulligans left, use one and add a stroke."""
+        if not course.isValidPosition(x, y):
+            return None
+        index = y * course.width + x
+        code = course.terrain[index]
+        if CODE_HAZARDS[code] is None:
+            # Add more logic if needed for ROUGH, etc.
+            return None
+
+        # The whole chain of pushes was resolved when the table was built
+        table = course.hazardTable()
+        if not self.headless:
+            for _, outcome in table.chain(x, y):
+                print(outcome.message)
+        penalty = table.penalty[index]
+        if penalty:
+            self.player.incrementStrokes(penalty)
+        rest = table.final[index]
+        if rest == OFF_COURSE:
+            # Carried off the course: play again from where the shot started
+            if self.previousPosition is not None:
+                self.ball.setPosition(*self.previousPosition)
+            if not self.headless:
+                print("Ball was carried off the course! Back to where the shot was played.")
+        elif rest != index:
+            self.ball.setPosition(rest % course.width, rest // course.width)
+        if self.events.active:
+            self.events.emit(EngineEvent.HAZARD_APPLIED, self, hazard=TERRAINS[code], position=(x, y),
+                             outcome=self.ball.getPosition(), strokes=self.player.getStrokes())
+        return TERRAINS[code]
+
+    def useMulligan(self, revert: bool = False):
+        """
+        If the player has mulligans left, use one and add a stroke.
+        With `revert`, the ball also goes back to where the last shot started.
+        """
         if self.player.getMulligans() > 0:
+            if self.undoStack is not None:
+                self.undoStack.append(self.snapshot())
+            if self.replayLog:
+                self.replayLog.recordMulligan(revert)
             self.player.decrementMulligan()
             self.player.incrementStrokes()  # Mulligan cost
-            print(f"Mulligan used! Remaining: {self.player.getMulligans()}. Strokes: {self.player.getStrokes()}")
-        else:
+            if revert and self.previousPosition is not None:
+                self.ball.setPosition(*self.previousPosition)
+            if self.events.active:
+                self.events.emit(EngineEvent.MULLIGAN_USED, self, revert=revert, position=self.ball.getPosition(),
+                                 mulligans=self.player.getMulligans(), strokes=self.player.getStrokes())
+            if not self.headless:
+                print(f"Mulligan used! Remaining: {self.player.getMulligans()}. Strokes: {self.player.getStrokes()}")
+        elif not self.headless:
             print("No mulligans left!")
 
+    def _emitShot(self, clubType: ClubType, dx: int, dy: int, distance: int):
+        self.events.emit(EngineEvent.SHOT_TAKEN, self, club=clubType, dx=dx, dy=dy, distance=distance,
+                         origin=self.previousPosition, position=self.ball.getPosition(),
+                         strokes=self.player.getStrokes())
+        if self.checkVictoryCondition():
+            self.events.emit(EngineEvent.HOLE_COMPLETED, self, strokes=self.player.getStrokes(),
+                             mulligans=self.player.getMulligans())
+
+    def placeBall(self, x: int, y: int) -> Optional[HazardType]:
+        """
+        Play a stroke that lands the ball on (x, y), as the GUI does when a
+        highlighted square is clicked, and apply the hazards there; returns
+        the hazard that affected the ball, if any. Like a shot, it can be
+        reverted by a mulligan or undone, is timed by attached metrics and
+        emits SHOT_TAKEN (as a driver shot along the move's direction) and
+        HOLE_COMPLETED. The replay log records the move and whether it used
+        a pending rollDice.
+        """
+        if self.metrics is None:
+            return self._placeBall(x, y)
+        started = perf_counter_ns()
+        hazard = self._placeBall(x, y)
+        self.metrics.time("placeBall", perf_counter_ns() - started)
+        return hazard
+
+    def _placeBall(self, x: int, y: int) -> Optional[HazardType]:
+        if self.undoStack is not None:
+            self.undoStack.append(self.snapshot())
+        move_x, move_y = x - self.ball.x, y - self.ball.y
+        if self.replayLog:
+            self.replayLog.recordPlacement(move_x, move_y, self.pendingRoll is not None)
+        self.previousPosition = self.ball.getPosition()
+        self.ball.setPosition(x, y)
+        self.pendingRoll = None
+        self.lastHazard = self.applyHazardEffects()
+        self.strokeCount += 1
+        self.player.incrementStrokes()
+        if self.events.active:
+            self._emitShot(ClubType.DRIVER, (move_x > 0) - (move_x < 0), (move_y > 0) - (move_y < 0),
+                           max(abs(move_x), abs(move_y)))
+        return self.lastHazard
+
+    # ----------------------------------------------------
+    #   SNAPSHOTS, UNDO AND CLONING
+    # ----------------------------------------------------
+    def snapshot(self) -> EngineSnapshot:
+        player, ball = self.player, self.ball
+        return EngineSnapshot(
+            self.currentMode,
+            self.activeCourse,
+            (ball.x, ball.y) if ball else None,
+            self.previousPosition,
+            player.name if player else None,
+            player.totalStrokes if player else 0,
+            player.mulligansRemaining if player else 0,
+            self.strokeCount,
+            self.pendingRoll,
+            self.lastHazard,
+            self.dice,
+            self.dice.position,
+            self.replayLog,
+            len(self.replayLog.events) if self.replayLog else 0,
+        )
+
+    def restore(self, snapshot: EngineSnapshot):
+        """
+        Put the engine back in the snapshot's state. Later dice rolls
+        repeat the ones that followed the snapshot, and the replay log
+        drops the inputs recorded after it.
+        """
+        self.currentMode = snapshot.mode
+        self.activeCourse = snapshot.course
+        if snapshot.ball is None:
+            self.ball = None
+        elif self.ball is None:
+            self.ball = Ball(*snapshot.ball)
+        else:
+            self.ball.setPosition(*snapshot.ball)
+        self.previousPosition = snapshot.previousPosition
+        if snapshot.playerName is None:
+            self.player = None
+        else:
+            if self.player is None:
+                self.player = Player(snapshot.playerName)
+            self.player.name = snapshot.playerName
+            self.player.totalStrokes = snapshot.strokes
+            self.player.mulligansRemaining = snapshot.mulligans
+        self.strokeCount = snapshot.strokeCount
+        self.pendingRoll = snapshot.pendingRoll
+        self.lastHazard = snapshot.lastHazard
+        if self.dice.rolls is not snapshot.dice.rolls:
+            self.dice = snapshot.dice.fork()
+        self.dice.position = snapshot.dicePosition
+        log = snapshot.replayLog
+        if log is None:
+            self.replayLog = None
+        elif log is self.replayLog:
+            del log.events[snapshot.replayLength:]
+        else:
+            self.replayLog = log.copy(snapshot.replayLength)
+
+    def pushUndo(self):
+        """Save the current state on the undo stack (if undo is enabled)."""
+        if self.undoStack is not None:
+            self.undoStack.append(self.snapshot())
+
+    def undo(self) -> bool:
+        """Restore the state before the last shot, mulligan or placeBall; False if there is none."""
+        if not self.undoStack:
+            return False
+        self.restore(self.undoStack.pop())
+        return True
+
+    def clone(self) -> "GameEngine":
+        """
+        Independent engine in the same state, for branching searches.
+        Shares the course, renderer and dice roll tape (so it rolls what
+        this engine would roll next); listeners, metrics and undo history
+        are not copied.
+        """
+        twin = GameEngine.__new__(GameEngine)
+        twin.__dict__.update(self.__dict__)
+        twin.ball = self.ball.copy() if self.ball else None
+        twin.player = self.player.copy() if self.player else None
+        twin.dice = self.dice.fork()
+        twin.replayLog = self.replayLog.copy() if self.replayLog else None
+        twin.events = EventHub()
+        twin.metrics = None
+        if self.undoStack is not None:
+            twin.undoStack = deque(maxlen=self.undoStack.maxlen)
+        return twin
+
+    # ----------------------------------------------------
+    #   SAVE AND RESUME
+    # ----------------------------------------------------
+    def save(self, inlineCourse: Optional[bool] = None) -> bytes:
+        """Compact binary save of the current game (see models.savestate.save_state)."""
+        return save_state(self, inlineCourse)
+
+    @classmethod
+    def resume(cls, data: bytes, headless: bool = True,
+               courseCache: Optional[CourseCache] = None) -> "GameEngine":
+        """Engine continuing the game in `data`, exactly where save() left it."""
+        return load_state(data, headless, courseCache)
+
     def checkVictoryCondition(self) -> bool:
         """Check if the ball is in the hole."""
         if not (self.activeCourse and self.ball):
@@ -150,12 +446,42 @@ class GameEngine:
     def endTurn(self):
         """Check for end-of-turn or victory."""
         if self.checkVictoryCondition():
-            print("Ball in the Hole! Congratulations!")
-            if self.player:
-                print(f"Total Strokes: {self.player.getStrokes()}")
+            if not self.headless:
+                print("Ball in the Hole! Congratulations!")
+                if self.player:
+                    print(f"Total Strokes: {self.player.getStrokes()}")
             return True
         return False
 
+    def playHole(self, policy: Optional[ShotPolicy] = None, maxStrokes: int = 100,
+                 mulliganRule: Optional[MulliganRule] = None) -> HoleResult:
+        """
+        Play the current hole to completion (or until maxStrokes) using
+        `policy` to pick every shot, and return a structured result.
+        After each shot, `mulliganRule` may ask to replay it with a mulligan.
+        """
+        if policy is None:
+            policy = greedy_policy
+        path = [self.ball.getPosition()]
+        hazards = []
+        mulligans = 0
+        while not self.checkVictoryCondition() and self.player.getStrokes() < maxStrokes:
+            clubType, dx, dy = policy(self)
+            self.takeShot(clubType, dx, dy)
+            if self.lastHazard is not None:
+                hazards.append(self.lastHazard)
+            if mulliganRule is not None and self.player.mulligansRemaining > 0 and mulliganRule(self):
+                self.useMulligan(revert=True)
+                mulligans += 1
+            path.append((self.ball.x, self.ball.y))
+        return HoleResult(
+            self.player.getStrokes(),
+            self.checkVictoryCondition(),
+            tuple(path),
+            tuple(hazards),
+            mulligans,
+        )
+
     def calculateScore(self) -> int:
         """Return final stroke count or other scoring logic."""
         if self.player:
@@ -167,7 +493,7 @@ class GameEngine:
     # ----------------------------------------------------
     def renderCourse(self):
         """
-        Print the course grid to console using the specified symbols.
+        Write the course grid to the renderer's stream using the symbols:
           o : Ball
           ● : Hole
           ෴ : Rough
@@ -177,55 +503,91 @@ class GameEngine:
           ♒︎ : Water
           ↟ : Trees
         """
-
-        if not self.activeCourse:
+        if not self.activeCourse or self.headless:
             return
-
-        hole_x, hole_y = self.activeCourse.getHolePosition()
-        ball_x, ball_y = (None, None)
-        if self.ball:
-            ball_x, ball_y = self.ball.getPosition()
-
-        for y in range(self.activeCourse.height):
-            row_str = ""
-            for x in range(self.activeCourse.width):
-
-                # If ball is here, print ball symbol
-                if x == ball_x and y == ball_y:
-                    row_str += "o"
-                    continue
-
-                # If hole is here, print hole symbol
-                if x == hole_x and y == hole_y:
-                    row_str += "●"
-                    continue
-
-                # Otherwise, print terrain symbol
-                cell = self.activeCourse.getCell(x, y)
-                if not cell:
-                    row_str += " "  # Out of bounds or missing cell
-                    continue
-
-                terrain = cell.getTerrain()
-                symbol = self.getTerrainSymbol(terrain)
-                row_str += symbol
-
-            print(row_str)
-        print()  # Extra newline after printing the course
+        if self.metrics is None:
+            return self.renderer.render(self.activeCourse, self.ball)
+        started = perf_counter_ns()
+        self.renderer.render(self.activeCourse, self.ball)
+        self.metrics.time("renderCourse", perf_counter_ns() - started)
 
     def getTerrainSymbol(self, terrain: HazardType) -> str:
         """Map each HazardType to its ASCII symbol."""
-        if terrain == HazardType.ROUGH:
-            return "෴"
-        elif terrain == HazardType.FAIRWAY:
-            return "·"
-        elif terrain == HazardType.SAND:
-            return "ᨒ"
-        elif terrain == HazardType.WATER:
-            return "♒︎"
-        elif terrain == HazardType.SLOPE:
-            return "›"
-        elif terrain == HazardType.TREES:
-            return "↟"
-        # Default
-        return " "  # Fallback, just in case
\ No newline at end of file
+        return TERRAIN_SYMBOLS.get(terrain, " ")  # Fallback, just in case
+
+
+# ----------------------------------------------------
+#   HEADLESS SIMULATION
+# ----------------------------------------------------
+# Per terrain code, every SPEED_GOLF club with its distance from that
+# terrain (longest base distance first), and the club with the shortest
+# distance that still moves the ball
+_SPEED_CLUBS = tuple(
+    tuple((clubType, distance + DISTANCE_MODIFIERS[GameMode.SPEED_GOLF, clubType][code])
+          for clubType, distance in CLUB_DISTANCES)
+    for code in range(len(TERRAINS))
+)
+_SPEED_FALLBACK = tuple(
+    min((item for item in clubs if item[1] > 0), key=lambda item: item[1])[0] for clubs in _SPEED_CLUBS
+)
+
+
+def greedy_policy(engine: GameEngine) -> Tuple[ClubType, int, int]:
+    """
+    Simple baseline policy: shoot straight at the hole when it lies on one
+    of the eight shot lines, otherwise head diagonally toward that line.
+    In SPEED_GOLF pick the longest club that does not overshoot.
+    """
+    bx, by = engine.ball.x, engine.ball.y
+    hx, hy = engine.activeCourse.getHolePosition()
+    ddx, ddy = hx - bx, hy - by
+    dx = (ddx > 0) - (ddx < 0)
+    dy = (ddy > 0) - (ddy < 0)
+    if engine.currentMode == GameMode.DICE_GOLF:
+        return ClubType.DRIVER, dx, dy
+
+    adx, ady = abs(ddx), abs(ddy)
+    aligned = adx == 0 or ady == 0 or adx == ady
+    wanted = max(adx, ady) if aligned else min(adx, ady)
+    course = engine.activeCourse
+    code = course.terrain[by * course.width + bx]
+
+    # Longest club that does not overshoot, else the shortest that moves at all
+    best = _SPEED_FALLBACK[code]
+    best_distance = 0
+    for clubType, distance in _SPEED_CLUBS[code]:
+        if best_distance < distance <= wanted:
+            best, best_distance = clubType, distance
+    return best, dx, dy
+
+
+def mulligan_on_water(engine: GameEngine) -> bool:
+    """Mulligan rule: replay any shot that ended in the water."""
+    return engine.lastHazard == HazardType.WATER
+
+
+def simulate(
+    n_holes: int,
+    mode: GameMode,
+    course_type: CourseType,
+    policy: Optional[ShotPolicy] = None,
+    max_strokes: int = 100,
+    seed: Optional[int] = None,
+    first_hole: int = 0,
+    mulligan_rule: Optional[MulliganRule] = None,
+    course_cache: Optional[CourseCache] = None,
+) -> List[HoleResult]:
+    """
+    Play `n_holes` freshly generated holes headlessly and return one
+    HoleResult per hole. Nothing is printed or rendered.
+    Hole i is fully determined by (seed, first_hole + i), so a run can be
+    split across workers by giving each its own `first_hole` range.
+    Pass a `course_cache` to reuse courses across repeated runs.
+    """
+    engine = GameEngine(headless=True, seed=seed, courseCache=course_cache)
+    engine.gameIndex = first_hole
+    results = []
+    for _ in range(n_holes):
+        engine.startGame(mode, course_type)
+        results.append(engine.playHole(policy, max_strokes, mulligan_rule))
+    return results
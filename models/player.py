@@ -1,5 +1,7 @@
 class Player:
     """Represents the golfer."""
+    __slots__ = ("name", "totalStrokes", "mulligansRemaining")
+
     def __init__(self, name: str = "Player"):
         self.name = name
         self.totalStrokes: int = 0
@@ -16,4 +18,10 @@ class Player:
         return self.totalStrokes
 
     def getMulligans(self) -> int:
-        return self.mulligansRemaining
\ No newline at end of file
+        return self.mulligansRemaining
+
+    def copy(self) -> "Player":
+        twin = Player(self.name)
+        twin.totalStrokes = self.totalStrokes
+        twin.mulligansRemaining = self.mulligansRemaining
+        return twin
\ No newline at end of file
@@ -0,0 +1,72 @@
+import sys
+from typing import List, Optional, TextIO, Tuple
+
+from .ball import Ball
+from .course import Course
+from .rules import CODE_SYMBOLS
+
+# ASCII symbols for the console view of a course.
+BALL_SYMBOL = "o"
+HOLE_SYMBOL = "●"
+
+# Static terrain of a course: per-row symbol lists and the joined row strings.
+TerrainRows = Tuple[List[List[str]], List[str]]
+
+
+def terrain_rows(course: Course) -> TerrainRows:
+    """Build the static (ball- and hole-free) rows for a course."""
+    width, terrain = course.width, course.terrain
+    row_symbols = [
+        [CODE_SYMBOLS[code] for code in terrain[y * width:(y + 1) * width]]
+        for y in range(course.height)
+    ]
+    return row_symbols, ["".join(symbols) for symbols in row_symbols]
+
+
+class CourseRenderer:
+    """
+    Renders a course as text. The terrain rows are built once per course
+    (and rebuilt only when its terrain changes); each frame overlays the
+    ball and hole and is written to the stream in a single call.
+    """
+    def __init__(self, stream: Optional[TextIO] = None, enabled: bool = True):
+        self.stream = stream  # None means sys.stdout at render time
+        self.enabled = enabled
+        self._course: Optional[Course] = None
+        self._revision = -1
+        self._rowSymbols: List[List[str]] = []
+        self._rowStrings: List[str] = []
+
+    def prime(self, course: Course, rows: TerrainRows):
+        """Adopt rows built elsewhere (e.g. by a CourseCache) for `course`."""
+        self._rowSymbols, self._rowStrings = rows
+        self._course, self._revision = course, course.revision
+
+    def render(self, course: Course, ball: Optional[Ball] = None):
+        if not self.enabled:
+            return
+        (self.stream or sys.stdout).write(self.renderFrame(course, ball))
+
+    def renderFrame(self, course: Course, ball: Optional[Ball] = None) -> str:
+        """The full frame as one string, with a trailing blank line."""
+        self._refresh(course)
+        overlays = {}  # y -> {x: symbol}
+        hole_x, hole_y = course.getHolePosition()
+        overlays.setdefault(hole_y, {})[hole_x] = HOLE_SYMBOL
+        if ball is not None:
+            overlays.setdefault(ball.y, {})[ball.x] = BALL_SYMBOL  # Ball drawn over hole
+
+        rows = list(self._rowStrings)
+        for y, row_overlay in overlays.items():
+            if 0 <= y < course.height:
+                symbols = list(self._rowSymbols[y])
+                for x, symbol in row_overlay.items():
+                    if 0 <= x < course.width:
+                        symbols[x] = symbol
+                rows[y] = "".join(symbols)
+        return "\n".join(rows) + "\n\n"
+
+    def _refresh(self, course: Course):
+        if course is self._course and course.revision == self._revision:
+            return
+        self.prime(course, terrain_rows(course))
@@ -0,0 +1,114 @@
+import struct
+from typing import Iterator, Optional, Tuple
+
+from enums import GameMode, ClubType, CourseType
+
+_MAGIC = b"RLRP"
+_VERSION = 3
+_HEADER = struct.Struct("<4sBBBQI")  # magic, version, mode, course type, seed, game index
+_SIZE = struct.Struct("<II")         # course width, height; 0, 0 for the course type's own (version 2+)
+_EVENT = struct.Struct("<Bbb")       # club, dx, dy -- or _MULLIGAN, revert, 0 -- or _PLACE*, dx, dy
+_MULLIGAN = 0xFF
+_PLACE_ROLLED = 0xFE  # placeBall after a rollDice (version 3+)
+_PLACE = 0xFD         # placeBall with no roll pending (version 3+)
+
+_MODES = tuple(GameMode)
+_COURSE_TYPES = tuple(CourseType)
+_CLUBS = tuple(ClubType)
+
+
+class ReplayLog:
+    """
+    Compact record of one game: the engine seed plus every input
+    (shots, mulligans and the GUI's placeBall moves), 3 bytes each. Replaying it re-simulates the
+    game exactly without storing any intermediate state. `size` is the
+    course's (width, height) when the game was started at a custom size.
+    """
+    def __init__(self, seed: int, mode: GameMode, courseType: CourseType, gameIndex: int = 0,
+                 size: Optional[Tuple[int, int]] = None):
+        self.seed = seed
+        self.mode = mode
+        self.courseType = courseType
+        self.gameIndex = gameIndex
+        self.size = size
+        self.events = bytearray()
+
+    def recordShot(self, clubType: ClubType, dx: int, dy: int):
+        self.events += _EVENT.pack(_CLUBS.index(clubType), dx, dy)
+
+    def recordMulligan(self, revert: bool = False):
+        self.events += _EVENT.pack(_MULLIGAN, int(revert), 0)
+
+    def recordPlacement(self, dx: int, dy: int, rolled: bool):
+        """A placeBall move by (dx, dy) from the ball; `rolled`: it used a pending rollDice."""
+        self.events += _EVENT.pack(_PLACE_ROLLED if rolled else _PLACE, dx, dy)
+
+    def copy(self, length: Optional[int] = None) -> "ReplayLog":
+        """Independent log with the same header and the first `length` bytes of events."""
+        twin = ReplayLog(self.seed, self.mode, self.courseType, self.gameIndex, self.size)
+        twin.events = self.events[:length] if length is not None else bytearray(self.events)
+        return twin
+
+    def inputs(self) -> Iterator[Tuple[str, tuple]]:
+        """
+        Yield ("shot", (club, dx, dy)) for each shot,
+        ("mulligan", (revert,)) for each mulligan and
+        ("place", (dx, dy, rolled)) for each placeBall.
+        """
+        for club, dx, dy in _EVENT.iter_unpack(self.events):
+            if club == _MULLIGAN:
+                yield "mulligan", (bool(dx),)
+            elif club in (_PLACE, _PLACE_ROLLED):
+                yield "place", (dx, dy, club == _PLACE_ROLLED)
+            else:
+                yield "shot", (_CLUBS[club], dx, dy)
+
+    def toBytes(self) -> bytes:
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, _MODES.index(self.mode), _COURSE_TYPES.index(self.courseType),
+            self.seed, self.gameIndex,
+        )
+        return header + _SIZE.pack(*(self.size or (0, 0))) + bytes(self.events)
+
+    @classmethod
+    def fromBytes(cls, data: bytes) -> "ReplayLog":
+        if len(data) < _HEADER.size:
+            raise ValueError("truncated replay log")
+        magic, version, mode, course_type, seed, game_index = _HEADER.unpack_from(data)
+        if (magic != _MAGIC or version not in (1, 2, _VERSION)
+                or mode >= len(_MODES) or course_type >= len(_COURSE_TYPES)):
+            raise ValueError("not a replay log, or an unsupported version")
+        offset, size = _HEADER.size, None
+        if version >= 2:
+            if len(data) < offset + _SIZE.size:
+                raise ValueError("truncated replay log")
+            width, height = _SIZE.unpack_from(data, offset)
+            offset += _SIZE.size
+            size = (width, height) if width else None
+        log = cls(seed, _MODES[mode], _COURSE_TYPES[course_type], game_index, size)
+        log.events = bytearray(data[offset:])
+        if len(log.events) % _EVENT.size:
+            raise ValueError("truncated replay log")
+        return log
+
+    def replay(self, headless: bool = True):
+        """
+        Re-run the game on a fresh engine and return that engine. Placements
+        draw the roll they used and then apply hazards, as the GUI does.
+        """
+        from .game_engine import GameEngine
+        engine = GameEngine(headless=headless, seed=self.seed)
+        engine.gameIndex = self.gameIndex
+        engine.startGame(self.mode, self.courseType, self.size)
+        for kind, args in self.inputs():
+            if kind == "mulligan":
+                engine.useMulligan(*args)
+            elif kind == "place":
+                dx, dy, rolled = args
+                if rolled:
+                    engine.rollDice()
+                x, y = engine.ball.getPosition()
+                engine.placeBall(x + dx, y + dy)
+            else:
+                engine.takeShot(*args)
+        return engine
@@ -0,0 +1,31 @@
+import hashlib
+import random
+from typing import Optional
+
+_SEED_MASK = (1 << 64) - 1
+
+
+def derive_seed(seed: int, *keys) -> int:
+    """A 64-bit seed for the stream named by `keys` under `seed`."""
+    digest = hashlib.blake2b(repr((seed,) + keys).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class SeededRandom(random.Random):
+    """
+    A random.Random that remembers its 64-bit seed and can be split into
+    independent child streams, e.g. one per course and one per dice cup,
+    so that parallel workers and replays draw exactly the same numbers.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.initialSeed = seed & _SEED_MASK
+        super().__init__(self.initialSeed)
+
+    def spawn(self, *keys) -> "SeededRandom":
+        """Child stream determined only by this stream's seed and `keys`."""
+        return SeededRandom(derive_seed(self.initialSeed, *keys))
+
+    def __reduce__(self):
+        return self.__class__, (self.initialSeed,), self.getstate()
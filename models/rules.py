@@ -0,0 +1,197 @@
+from array import array
+from itertools import compress
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from enums import GameMode, HazardType, ClubType
+from .cell import TERRAINS, TERRAIN_CODES
+from .clubs import CLUBS
+
+# ----------------------------------------------------
+#   RULE DEFINITIONS
+# ----------------------------------------------------
+# Shot distance modifier by (mode, terrain the shot is played from)...
+_TERRAIN_MODIFIERS = {
+    (GameMode.DICE_GOLF, HazardType.FAIRWAY): 1,
+    (GameMode.DICE_GOLF, HazardType.SAND): -1,
+    (GameMode.SPEED_GOLF, HazardType.SAND): -1,
+}
+# ...and clubs that override it: (mode, club, terrain) -> modifier.
+_CLUB_MODIFIERS = {
+    (GameMode.SPEED_GOLF, ClubType.IRON, HazardType.SAND): 0,  # Irons play cleanly out of sand
+}
+
+
+class HazardOutcome(NamedTuple):
+    """What landing on a terrain does to the ball."""
+    penalty: int  # Extra strokes
+    push: Tuple[int, int]  # (dx, dy) the ball is moved, then the square it reaches applies too
+    message: str  # Shown by non-headless engines
+
+
+HAZARD_OUTCOMES: Dict[HazardType, HazardOutcome] = {
+    HazardType.WATER: HazardOutcome(1, (0, 1), "Ball landed in WATER (♒︎)! +1 stroke penalty. Moving ball down 1 space."),
+    # For demo, let slope push ball 1 space downward
+    HazardType.SLOPE: HazardOutcome(0, (0, 1), "Ball slid on SLOPE (›). Moving ball down 1 space."),
+    # In a real game, you'd prevent or handle this more carefully
+    HazardType.TREES: HazardOutcome(0, (0, 0), "Encountered TREES (↟). Ball can only pass if shot from fairway, etc."),
+}
+
+# (symbol, color): the console renderer uses the symbol, the GUI both.
+TERRAIN_APPEARANCE: Dict[HazardType, Tuple[str, str]] = {
+    HazardType.FAIRWAY: ("·", "lightgreen"),
+    HazardType.SAND: ("ᨒ", "tan"),
+    HazardType.WATER: ("♒︎", "blue"),
+    HazardType.SLOPE: ("›", "gray"),
+    HazardType.TREES: ("↟", "darkgreen"),
+    HazardType.ROUGH: ("෴", "brown"),
+}
+UNKNOWN_APPEARANCE = (" ", "white")
+
+# ----------------------------------------------------
+#   PRECOMPUTED TABLES
+# ----------------------------------------------------
+# Per-terrain tables are tuples indexed by terrain code (see models.cell).
+TERRAIN_SYMBOLS = {terrain: symbol for terrain, (symbol, _) in TERRAIN_APPEARANCE.items()}
+TERRAIN_COLORS = {terrain: color for terrain, (_, color) in TERRAIN_APPEARANCE.items()}
+CODE_SYMBOLS = tuple(TERRAIN_APPEARANCE.get(terrain, UNKNOWN_APPEARANCE)[0] for terrain in TERRAINS)
+CODE_HAZARDS: Tuple[Optional[HazardOutcome], ...] = tuple(HAZARD_OUTCOMES.get(terrain) for terrain in TERRAINS)
+CODE_PENALTIES = tuple(outcome.penalty if outcome else 0 for outcome in CODE_HAZARDS)
+# (dx, dy) the ball is pushed, or None where it stays
+CODE_PUSHES = tuple(outcome.push if outcome and outcome.push != (0, 0) else None for outcome in CODE_HAZARDS)
+
+# (mode, club) -> distance modifier per terrain code
+DISTANCE_MODIFIERS: Dict[Tuple[GameMode, ClubType], Tuple[int, ...]] = {
+    (mode, club): tuple(
+        _CLUB_MODIFIERS.get((mode, club, terrain), _TERRAIN_MODIFIERS.get((mode, terrain), 0))
+        for terrain in TERRAINS
+    )
+    for mode in GameMode
+    for club in ClubType
+}
+
+# Base distance of each club in SPEED_GOLF, longest first
+CLUB_DISTANCES: Tuple[Tuple[ClubType, int], ...] = tuple(sorted(
+    ((club_type, club.getBaseDistance()) for club_type, club in CLUBS.items()),
+    key=lambda item: -item[1],
+))
+
+
+def distance_modifier(mode: GameMode, club: ClubType, terrain: HazardType) -> int:
+    """Distance added to a shot played with `club` from `terrain`."""
+    return DISTANCE_MODIFIERS[mode, club][TERRAIN_CODES[terrain]]
+
+
+# ----------------------------------------------------
+#   HAZARD CHAINS
+# ----------------------------------------------------
+OFF_COURSE = -1  # HazardTable.final: the chain carried the ball off the course
+
+_UNRESOLVED, _ON_CHAIN, _RESOLVED = 0, 1, 2
+# bytes.translate tables picking out squares that push the ball, and
+# squares that keep it but cost strokes (empty if there are none)
+_PUSHING = bytes(push is not None for push in CODE_PUSHES).ljust(256, b"\0")
+_STOPPING_PENALTIES = (
+    bytes(push is None and penalty > 0 for push, penalty in zip(CODE_PUSHES, CODE_PENALTIES)).ljust(256, b"\0")
+    if any(push is None and penalty > 0 for push, penalty in zip(CODE_PUSHES, CODE_PENALTIES)) else b""
+)
+
+
+class HazardTable:
+    """
+    Where a ball landing on each square of a course comes to rest, and the
+    penalty strokes on the way. Pushes are followed to a fixed point: the
+    square a hazard pushes the ball onto applies its own outcome, and so
+    on, until the ball stops on a square that does not move it. A chain
+    that returns to a square it already visited stops there, counting each
+    hazard's penalty once; one that leaves the course ends in OFF_COURSE,
+    and the ball goes back to where the shot was played from.
+    Built once per course terrain (see Course.hazardTable), after which
+    every landing resolves with two lookups.
+    """
+    __slots__ = ("width", "height", "terrain", "revision", "final", "penalty")
+
+    def __init__(self, width: int, height: int, terrain: bytes, revision: int = 0):
+        self.width = width
+        self.height = height
+        self.terrain = terrain
+        self.revision = revision  # Course.revision the table was built for
+        n = width * height
+        # Row-major cell index of the resting square (or OFF_COURSE), and the penalty
+        self.final = final = array("i", range(n))
+        self.penalty = penalty = array("i", bytes(4 * n))
+        pushes, penalties = CODE_PUSHES, CODE_PENALTIES
+        state = bytearray(n)
+        if _STOPPING_PENALTIES:
+            for i in compress(range(n), terrain.translate(_STOPPING_PENALTIES)):
+                penalty[i] = penalties[terrain[i]]
+        pushed = list(compress(range(n), terrain.translate(_PUSHING)))
+        # Pushes mostly run down the course, so going bottom-up usually
+        # finds the square pushed onto already resolved
+        for i in reversed(pushed):
+            if state[i]:
+                continue
+            code = terrain[i]
+            dx, dy = pushes[code]
+            x, y = i % width + dx, i // width + dy
+            if not (0 <= x < width and 0 <= y < height):
+                final[i], penalty[i] = OFF_COURSE, penalties[code]
+            else:
+                t = y * width + x
+                if state[t] != _RESOLVED and pushes[terrain[t]] is not None:
+                    self._resolve(i, state)
+                    continue
+                final[i], penalty[i] = final[t], penalties[code] + penalty[t]
+            state[i] = _RESOLVED
+
+    def _resolve(self, start: int, state: bytearray):
+        width, height, terrain, final, penalty = self.width, self.height, self.terrain, self.final, self.penalty
+        chain: List[int] = []
+        i = start
+        while True:
+            if state[i] == _RESOLVED:
+                rest, total = final[i], penalty[i]
+                break
+            if state[i] == _ON_CHAIN:
+                # A cycle: the ball rests on any of its squares after
+                # taking every penalty on it once
+                cycle = chain[chain.index(i):]
+                del chain[-len(cycle):]
+                total = sum(CODE_PENALTIES[terrain[j]] for j in cycle)
+                for j in cycle:
+                    final[j], penalty[j], state[j] = j, total, _RESOLVED
+                rest = i
+                break
+            state[i] = _ON_CHAIN
+            chain.append(i)
+            push = CODE_PUSHES[terrain[i]]
+            if push is None:
+                rest, total = i, 0
+                break
+            x, y = i % width + push[0], i // width + push[1]
+            if not (0 <= x < width and 0 <= y < height):
+                rest, total = OFF_COURSE, 0
+                break
+            i = y * width + x
+        for j in reversed(chain):
+            total += CODE_PENALTIES[terrain[j]]
+            final[j], penalty[j], state[j] = rest, total, _RESOLVED
+
+    def resolve(self, x: int, y: int) -> Tuple[Optional[Tuple[int, int]], int]:
+        """(resting square or None if off the course, penalty) for a ball landing on (x, y)."""
+        i = y * self.width + x
+        rest = self.final[i]
+        return (None if rest == OFF_COURSE else (rest % self.width, rest // self.width)), self.penalty[i]
+
+    def chain(self, x: int, y: int) -> List[Tuple[Tuple[int, int], HazardOutcome]]:
+        """Each hazard square the ball passes through from (x, y), with its outcome, in order."""
+        steps, seen = [], set()
+        while 0 <= x < self.width and 0 <= y < self.height and (x, y) not in seen:
+            outcome = CODE_HAZARDS[self.terrain[y * self.width + x]]
+            if outcome is None:
+                break
+            steps.append(((x, y), outcome))
+            seen.add((x, y))
+            if outcome.push == (0, 0):
+                break
+            x, y = x + outcome.push[0], y + outcome.push[1]
+        return steps
@@ -0,0 +1,196 @@
+import struct
+from typing import Optional
+
+from enums import GameMode, CourseType
+from .cell import TERRAINS, TERRAIN_CODES
+from .course import Course, GENERATOR_VERSIONS
+from .course_cache import CourseCache, CourseKey
+from .dice import Dice
+from .replay import ReplayLog
+from .rng import SeededRandom
+
+_MAGIC = b"RLGS"
+_VERSION = 1
+_INLINE_COURSE = 0x01
+_HAS_REPLAY = 0x02
+
+_HEADER = struct.Struct("<4sBBBBQI")  # magic, version, flags, mode, course type, engine seed, game index
+_COURSE = struct.Struct("<IIiiQ")     # width, height, hole x, hole y, course seed
+_DICE = struct.Struct("<QII")         # dice seed, rolls drawn, next roll
+_LENGTH = struct.Struct("<I")
+# One engine state: ball x, y, previous x, y (-1 if none), strokes, mulligans,
+# stroke count, pending roll (0 if none), last hazard (0xFF if none),
+# dice position, replay log length. Used for the live state and every undo entry.
+_STATE = struct.Struct("<iiiiiiIBBII")
+_NO_HAZARD = 0xFF
+
+_MODES = tuple(GameMode)
+_COURSE_TYPES = tuple(CourseType)
+
+
+def save_state(engine, inline_course: Optional[bool] = None) -> bytes:
+    """
+    Encode a started game: mode, the course (by generator reference, or
+    inline as its terrain grid), ball, player counters, the dice stream
+    position, the replay log and the undo history. Listeners, metrics and
+    the course cache are not saved.
+
+    By default the course is referenced when the engine generated it
+    through a course cache, which keeps a save to a few dozen bytes;
+    `inline_course` forces either form.
+    """
+    course = engine.activeCourse
+    if course is None or engine.player is None or engine.ball is None:
+        raise ValueError("no game in progress")
+    key = engine.courseKey
+    reproducible = key is not None and _generator_method(key.generator) is not None
+    if inline_course is None:
+        inline_course = not reproducible
+    elif not inline_course and not reproducible:
+        raise ValueError("the course was not generated from a seed; it can only be saved inline")
+    dice = engine.dice
+    if not isinstance(dice.rng, SeededRandom):
+        raise ValueError("the dice are not drawn from a SeededRandom stream")
+    log = engine.replayLog
+
+    flags = (_INLINE_COURSE if inline_course else 0) | (_HAS_REPLAY if log is not None else 0)
+    parts = [
+        _HEADER.pack(_MAGIC, _VERSION, flags, _MODES.index(engine.currentMode),
+                     _COURSE_TYPES.index(course.course_type), engine.rng.initialSeed, engine.gameIndex),
+        _COURSE.pack(course.width, course.height, *course.holePosition, 0 if inline_course else key.seed),
+    ]
+    if inline_course:
+        parts.append(bytes(course.terrain))
+    else:
+        generator = key.generator.encode("ascii")
+        parts += (bytes([len(generator)]), generator)
+    name = engine.player.name.encode("utf-8")
+    parts += (_LENGTH.pack(len(name)), name)
+    parts.append(_DICE.pack(dice.rng.initialSeed, len(dice.rolls), dice.position))
+    if log is not None:
+        parts += (_LENGTH.pack(len(log.events)), bytes(log.events))
+    undo = engine.undoStack
+    parts.append(_LENGTH.pack(undo.maxlen if undo is not None else 0))
+    snapshots = (engine.snapshot(), *(undo or ()))
+    parts.append(_LENGTH.pack(len(snapshots) - 1))
+    parts += (_pack_snapshot(snapshot) for snapshot in snapshots)
+    return b"".join(parts)
+
+
+def load_state(data: bytes, headless: bool = True, course_cache: Optional[CourseCache] = None):
+    """
+    Rebuild the engine saved by save_state. A referenced course is taken
+    from `course_cache` when given (regenerated on a miss), so resuming a
+    game on an already cached course does no generation at all.
+    """
+    from .game_engine import GameEngine, EngineSnapshot, COURSE_DIMENSIONS
+    view = memoryview(data)
+    magic, version, flags, mode, course_type, seed, game_index = _unpack(_HEADER, view, 0)
+    if magic != _MAGIC or version != _VERSION or mode >= len(_MODES) or course_type >= len(_COURSE_TYPES):
+        raise ValueError("not a saved game, or an unsupported version")
+    mode, course_type = _MODES[mode], _COURSE_TYPES[course_type]
+    offset = _HEADER.size
+
+    width, height, hole_x, hole_y, course_seed = _unpack(_COURSE, view, offset)
+    offset += _COURSE.size
+    key = None
+    if flags & _INLINE_COURSE:
+        end = offset + width * height
+        if end > len(view):
+            raise ValueError("truncated saved game")
+        course = Course.fromTerrain(width, height, course_type, view[offset:end], (hole_x, hole_y))
+        offset = end
+    else:
+        if offset >= len(view) or offset + 1 + view[offset] > len(view):
+            raise ValueError("truncated saved game")
+        size = view[offset]
+        generator = bytes(view[offset + 1:offset + 1 + size]).decode("ascii")
+        offset += 1 + size
+        method = _generator_method(generator)
+        if method is None:
+            raise ValueError(f"course generator {generator!r} is not available in this version")
+        key = CourseKey(course_type, width, height, course_seed, generator)
+        if course_cache is not None:
+            course = course_cache.getOrGenerate(course_type, width, height, course_seed, method)
+        else:
+            course = Course(width, height, course_type)
+            course.generate(SeededRandom(course_seed), method=method)
+        if course.holePosition != (hole_x, hole_y):
+            raise ValueError("the referenced course does not match the saved game")
+
+    (size,) = _unpack(_LENGTH, view, offset)
+    offset += _LENGTH.size
+    name = bytes(view[offset:offset + size]).decode("utf-8")
+    offset += size
+    dice_seed, drawn, position = _unpack(_DICE, view, offset)
+    offset += _DICE.size
+    log = None
+    if flags & _HAS_REPLAY:
+        (size,) = _unpack(_LENGTH, view, offset)
+        offset += _LENGTH.size
+        custom_size = (width, height) if (width, height) != COURSE_DIMENSIONS[course_type] else None
+        log = ReplayLog(seed, mode, course_type, game_index - 1, custom_size)
+        log.events = bytearray(view[offset:offset + size])
+        offset += size
+    (undo_depth,) = _unpack(_LENGTH, view, offset)
+    (undo_count,) = _unpack(_LENGTH, view, offset + _LENGTH.size)
+    offset += 2 * _LENGTH.size
+    if offset + (undo_count + 1) * _STATE.size != len(view):
+        raise ValueError("truncated or oversized saved game")
+
+    engine = GameEngine(headless=headless, seed=seed, courseCache=course_cache, undoDepth=undo_depth)
+    engine.gameIndex = game_index
+    engine.currentMode = mode
+    engine.activeCourse = course
+    engine.courseKey = key if course_cache is not None else None
+    # The dice tape is redrawn from its stream rather than stored: the same
+    # number of draws leaves the stream exactly where the saved game left it.
+    dice_rng = SeededRandom(dice_seed)
+    dice = Dice(dice_rng)
+    dice.rolls = [dice_rng.randint(1, 6) for _ in range(drawn)]
+    engine.dice = dice
+    engine.replayLog = log
+
+    snapshots = [
+        _unpack_snapshot(view, offset + index * _STATE.size, mode, course, name, dice, log, EngineSnapshot)
+        for index in range(undo_count + 1)
+    ]
+    engine.restore(snapshots[0])
+    if engine.undoStack is not None:
+        engine.undoStack.extend(snapshots[1:])
+    if not headless and engine.courseKey is not None:
+        engine.renderer.prime(course, course_cache.renderRows(engine.courseKey))
+    return engine
+
+
+def _unpack(layout: struct.Struct, view, offset: int) -> tuple:
+    if offset + layout.size > len(view):
+        raise ValueError("truncated saved game")
+    return layout.unpack_from(view, offset)
+
+
+def _generator_method(generator: str) -> Optional[str]:
+    """The Course.generate method behind a CourseKey generator id, if this version still has it."""
+    method, _, version = generator.rpartition("-")
+    return method if version == str(GENERATOR_VERSIONS.get(method)) else None
+
+
+def _pack_snapshot(snapshot) -> bytes:
+    previous = snapshot.previousPosition or (-1, -1)
+    hazard = snapshot.lastHazard
+    return _STATE.pack(
+        *snapshot.ball, *previous, snapshot.strokes, snapshot.mulligans, snapshot.strokeCount,
+        snapshot.pendingRoll or 0, _NO_HAZARD if hazard is None else TERRAIN_CODES[hazard],
+        snapshot.dicePosition, snapshot.replayLength,
+    )
+
+
+def _unpack_snapshot(view, offset, mode, course, name, dice, log, snapshot_type):
+    (x, y, previous_x, previous_y, strokes, mulligans, stroke_count,
+     pending_roll, hazard, dice_position, replay_length) = _STATE.unpack_from(view, offset)
+    return snapshot_type(
+        mode, course, (x, y), (previous_x, previous_y) if previous_x >= 0 else None,
+        name, strokes, mulligans, stroke_count, pending_roll or None,
+        None if hazard == _NO_HAZARD else TERRAINS[hazard],
+        dice, dice_position, log, replay_length,
+    )
@@ -0,0 +1,535 @@
+import heapq
+import math
+import threading
+from operator import mul
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure Python
+    np = None
+
+from enums import GameMode, ClubType
+from .course import Course, SHOT_DIRECTIONS
+from .rules import CLUB_DISTANCES, DISTANCE_MODIFIERS, OFF_COURSE
+
+Shot = Tuple[ClubType, int, int]
+
+_DICE_ROLLS = (1, 2, 3, 4, 5, 6)  # Dice.rollD6, each with probability 1/6
+
+_CACHE_SIZE = 64
+_cache = OrderedDict()  # (mode, course.gridKey()) -> ExpectedStrokesTable
+_fieldCache = OrderedDict()  # (mode, course.gridKey()) -> DistanceField
+# Guards both memos: callers include CourseCache users and the GUI's worker
+# threads. Tables are computed outside it.
+_cacheLock = threading.Lock()
+
+
+class ExpectedStrokesTable:
+    """Expected strokes-to-hole under optimal play for every cell of a course."""
+    def __init__(self, width: int, height: int, mode: GameMode,
+                 values: List[float], bestShots: List[Optional[Shot]]):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        # Row-major; math.inf where the hole cannot be reached with certainty.
+        self.values = values
+        self.bestShots = bestShots
+
+    def expectedStrokes(self, x: int, y: int) -> float:
+        return self.values[y * self.width + x]
+
+    def bestShot(self, x: int, y: int) -> Optional[Shot]:
+        """The (club, dx, dy) minimizing expected strokes, or None at the hole."""
+        return self.bestShots[y * self.width + x]
+
+
+def solve(course: Course, mode: GameMode, cached: bool = True) -> ExpectedStrokesTable:
+    """
+    Compute (or fetch from the memo) the expected-strokes table for `course`
+    under `mode`. Results are cached by a hash of the terrain grid, so
+    repeated calls for an unchanged course are free. With `cached` False the
+    memo is neither read nor filled, for callers that keep tables themselves
+    (CourseCache.solverTable).
+    """
+    key = (mode, course.gridKey()) if cached else None
+    table = _memoGet(_cache, key)
+    if table is not None:
+        return table
+
+    actions, probs, succ, cost = _buildTransitions(course, mode)
+    hole = course.holePosition[1] * course.width + course.holePosition[0]
+    if np is not None:
+        values, best = _valueIterationNumpy(probs, succ, cost, hole)
+    elif len(probs) == 1:
+        values, best, _ = _shortestPaths(succ, cost, hole)
+    else:
+        values, best = _valueIterationPython(probs, succ, cost, hole)
+
+    table = ExpectedStrokesTable(
+        course.width, course.height, mode, values,
+        [actions[a] if a >= 0 else None for a in best],
+    )
+    return _memoPut(_cache, key, table)
+
+
+def clear_cache():
+    with _cacheLock:
+        _cache.clear()
+        _fieldCache.clear()
+
+
+def _memoGet(memo: OrderedDict, key):
+    if key is None:
+        return None
+    with _cacheLock:
+        value = memo.get(key)
+        if value is not None:
+            memo.move_to_end(key)
+        return value
+
+
+def _memoPut(memo: OrderedDict, key, value):
+    """Memoise `value` (unless key is None) and return it, or the one another thread stored first."""
+    if key is None:
+        return value
+    with _cacheLock:
+        value = memo.setdefault(key, value)
+        if len(memo) > _CACHE_SIZE:
+            memo.popitem(last=False)
+        return value
+
+
+def optimal_policy(engine) -> Shot:
+    """Shot policy for GameEngine.playHole that follows the solver's best shot."""
+    table = solve(engine.activeCourse, engine.currentMode)
+    shot = table.bestShot(engine.ball.x, engine.ball.y)
+    if shot is None:
+        from .game_engine import greedy_policy
+        return greedy_policy(engine)
+    return shot
+
+
+# ----------------------------------------------------
+#   DISTANCE FIELD (HINTS AND MOVE ORDERING)
+# ----------------------------------------------------
+class DistanceField:
+    """
+    Fewest strokes from every cell to the hole, found by one Dijkstra
+    search backwards from the hole, with the shot that starts such a path.
+    In SPEED_GOLF these are exact. In DICE_GOLF they assume every roll is
+    the one you want, so they are a lower bound and a move-ordering
+    heuristic rather than an expectation (see solve for that).
+    """
+    def __init__(self, course: Course, mode: GameMode, strokes: List[float],
+                 bestShots: List[Optional[Shot]], nextCells: List[int]):
+        self.width = course.width
+        self.height = course.height
+        self.mode = mode
+        self.hole = course.getHolePosition()
+        self.terrain = bytes(course.terrain)
+        # Row-major; math.inf where the hole cannot be reached.
+        self.strokes = strokes
+        self.bestShots = bestShots
+        self.nextCells = nextCells  # Cell index after the best shot, or -1
+        self._landings = _landings(course)
+
+    def minStrokes(self, x: int, y: int) -> float:
+        return self.strokes[y * self.width + x]
+
+    def bestShot(self, x: int, y: int) -> Optional[Shot]:
+        """First shot of a shortest path, or None at the hole or when stuck."""
+        return self.bestShots[y * self.width + x]
+
+    def nextPosition(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Where the ball ends up after bestShot (with the ideal roll)."""
+        t = self.nextCells[y * self.width + x]
+        return (t % self.width, t // self.width) if t >= 0 else None
+
+    def bestShotForRoll(self, x: int, y: int, roll: int) -> Shot:
+        """
+        DICE_GOLF: the direction to play once the d6 shows `roll`, i.e. the
+        one whose landing (after terrain modifier and hazards) is closest
+        to the hole, counting any penalty. Eight lookups.
+        """
+        width, height = self.width, self.height
+        final, penalty = self._landings
+        s = y * width + x
+        distance = roll + DISTANCE_MODIFIERS[GameMode.DICE_GOLF, ClubType.DRIVER][self.terrain[s]]
+        best, best_value = None, math.inf
+        for dx, dy in SHOT_DIRECTIONS:
+            tx, ty = x + dx * distance, y + dy * distance
+            if distance > 0 and 0 <= tx < width and 0 <= ty < height:
+                t = ty * width + tx
+                value = 1 + penalty[t] + self.strokes[final[t] if final[t] != OFF_COURSE else s]
+            else:
+                value = 1 + self.strokes[s]  # Out of bounds: the ball stays put
+            if best is None or value < best_value:
+                best, best_value = (ClubType.DRIVER, dx, dy), value
+        return best
+
+    def rank(self, cells: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """`cells` ordered by fewest strokes to the hole, e.g. to try bot moves best-first."""
+        width, strokes = self.width, self.strokes
+        return sorted(cells, key=lambda cell: strokes[cell[1] * width + cell[0]])
+
+    def rankLandings(self, cells: Iterable[Tuple[int, int]], origin: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        `cells` ordered by strokes to the hole for a ball landing there from
+        `origin`: hazards on the landing square apply first (penalty, pushes,
+        and back to `origin` if they carry it off the course), as in
+        bestShotForRoll.
+        """
+        width, strokes = self.width, self.strokes
+        final, penalty = self._landings
+        s = origin[1] * width + origin[0]
+
+        def value(cell):
+            t = cell[1] * width + cell[0]
+            return penalty[t] + strokes[final[t] if final[t] != OFF_COURSE else s]
+        return sorted(cells, key=value)
+
+
+def distance_field(course: Course, mode: GameMode, cached: bool = True) -> DistanceField:
+    """The (cached, unless `cached` is False; see solve) DistanceField for `course` under `mode`."""
+    key = (mode, course.gridKey()) if cached else None
+    field = _memoGet(_fieldCache, key)
+    if field is not None:
+        return field
+
+    actions, _, succ, cost = _buildTransitions(course, mode)
+    hole = course.holePosition[1] * course.width + course.holePosition[0]
+    if np is not None:
+        strokes, best, nextCells = _shortestPathsNumpy(succ, cost, hole)
+    else:
+        strokes, best, nextCells = _shortestPaths(succ, cost, hole)
+    field = DistanceField(course, mode, strokes, [actions[a] if a >= 0 else None for a in best], nextCells)
+    return _memoPut(_fieldCache, key, field)
+
+
+def hint_policy(engine) -> Shot:
+    """
+    Shot policy guided by the distance field. In DICE_GOLF it rolls first
+    (GameEngine.rollDice, which the shot then uses) and aims for that roll.
+    """
+    field = distance_field(engine.activeCourse, engine.currentMode)
+    x, y = engine.ball.x, engine.ball.y
+    if engine.currentMode == GameMode.DICE_GOLF:
+        return field.bestShotForRoll(x, y, engine.rollDice())
+    shot = field.bestShot(x, y)
+    if shot is None:
+        from .game_engine import greedy_policy
+        return greedy_policy(engine)
+    return shot
+
+
+# ----------------------------------------------------
+#   TRANSITION MODEL
+# ----------------------------------------------------
+def _landings(course: Course):
+    """
+    Final cell (or OFF_COURSE) and stroke penalty for a ball landing on each
+    cell: the course's HazardTable, which GameEngine.applyHazardEffects uses
+    too. A ball carried off the course goes back to where it was hit from.
+    """
+    table = course.hazardTable()
+    return table.final, table.penalty
+
+
+def _shotActions(mode: GameMode) -> List[Shot]:
+    """The solver's actions: the driver in DICE_GOLF, which GameEngine.playHole rolls; every club in SPEED_GOLF."""
+    if mode == GameMode.DICE_GOLF:
+        return [(ClubType.DRIVER, dx, dy) for dx, dy in SHOT_DIRECTIONS]
+    return [(clubType, dx, dy) for clubType, _ in CLUB_DISTANCES for dx, dy in SHOT_DIRECTIONS]
+
+
+def _baseDistances(mode: GameMode, actions: List[Shot]):
+    """(probabilities, per-action base distance of each outcome) before terrain modifiers."""
+    if mode == GameMode.DICE_GOLF:
+        return [1 / len(_DICE_ROLLS)] * len(_DICE_ROLLS), [list(_DICE_ROLLS) for _ in actions]
+    bases = dict(CLUB_DISTANCES)
+    return [1.0], [[bases[club]] for club, _, _ in actions]
+
+
+def _shotOutcomes(course: Course, mode: GameMode, actions: Optional[List[Shot]] = None):
+    """
+    Return (actions, probs, landing, penalty) where landing[a][k][s] is the
+    cell the ball comes to rest on after action a with outcome k from cell
+    s, and penalty[a][k][s] the hazard strokes it costs, using the same
+    rules table and HazardTable as GameEngine.takeShot. Out-of-bounds
+    shots, and hazard chains that leave the course, leave the ball in
+    place. `actions` defaults to _shotActions(mode). With NumPy the tables
+    are int32 arrays of shape (actions, outcomes, cells); without it,
+    nested lists. Shared with models.analysis.shot_distribution.
+    """
+    width, height = course.width, course.height
+    n = width * height
+    final, penalty = _landings(course)
+    actions = _shotActions(mode) if actions is None else actions
+    probs, bases = _baseDistances(mode, actions)
+
+    if np is not None:
+        index = np.arange(n, dtype=np.int32)
+        terrain = np.frombuffer(bytes(course.terrain), dtype=np.uint8)
+        modifiers = np.array([DISTANCE_MODIFIERS[mode, club] for club, _, _ in actions], dtype=np.int32)
+        directions = np.array([(dx, dy) for _, dx, dy in actions], dtype=np.int32).reshape(-1, 2)
+
+        # (actions, outcomes, cells): distance, then target square
+        distance = np.asarray(bases, dtype=np.int32)[:, :, None] + modifiers[:, terrain][:, None, :]
+        tx = index % width + directions[:, 0, None, None] * distance
+        ty = index // width + directions[:, 1, None, None] * distance
+        inside = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+        target = np.where(inside, ty * width + tx, 0)
+
+        rest = np.where(inside, np.frombuffer(final, dtype=np.int32)[target], OFF_COURSE)
+        landing = np.where(rest != OFF_COURSE, rest, index).astype(np.int32)
+        extra = np.where(inside, np.frombuffer(penalty, dtype=np.int32)[target], 0).astype(np.int32)
+        return actions, probs, landing, extra
+
+    landing, extra = [], []
+    for (club, dx, dy), base in zip(actions, bases):
+        modifiers = DISTANCE_MODIFIERS[mode, club]
+        landing_a, extra_a = [], []
+        for b in base:
+            landing_k, extra_k = [0] * n, [0] * n
+            s = 0
+            for y in range(height):
+                for x in range(width):
+                    d = b + modifiers[course.terrain[s]]
+                    tx, ty = x + dx * d, y + dy * d
+                    landing_k[s] = s
+                    if 0 <= tx < width and 0 <= ty < height:
+                        t = ty * width + tx
+                        if final[t] != OFF_COURSE:
+                            landing_k[s] = final[t]
+                        extra_k[s] = penalty[t]
+                    s += 1
+            landing_a.append(landing_k)
+            extra_a.append(extra_k)
+        landing.append(landing_a)
+        extra.append(extra_a)
+    return actions, probs, landing, extra
+
+
+def _buildTransitions(course: Course, mode: GameMode):
+    """
+    Return (actions, probs, succ, cost): _shotOutcomes with cost[a][k][s]
+    the strokes a shot costs, the shot itself plus any hazard penalty.
+    """
+    actions, probs, succ, penalty = _shotOutcomes(course, mode)
+    if np is not None:
+        return actions, np.asarray(probs), succ, 1.0 + penalty
+    return actions, probs, succ, [[[1 + p for p in penalty_k] for penalty_k in penalty_a] for penalty_a in penalty]
+
+
+def _shortestPaths(succ, cost, hole):
+    """
+    Dijkstra backwards from the hole over every (action, outcome) shot.
+    With one outcome per action (SPEED_GOLF) these are the expected strokes;
+    with dice, the strokes if every roll is the one wanted. Returns the
+    values, the best action per cell and the cell it leads to.
+    """
+    n_actions, n = len(succ), len(succ[0][0])
+    predecessors = [[] for _ in range(n)]
+    for a in range(n_actions):
+        for succ_k, cost_k in zip(succ[a], cost[a]):
+            for s in range(n):
+                t = succ_k[s]
+                if t != s:
+                    predecessors[t].append((s, a, cost_k[s]))
+
+    values = [math.inf] * n
+    best = [-1] * n
+    next_cells = [-1] * n
+    values[hole] = 0.0
+    heap = [(0.0, hole)]
+    while heap:
+        value, t = heapq.heappop(heap)
+        if value > values[t]:
+            continue
+        for s, a, c in predecessors[t]:
+            if s != hole and value + c < values[s]:
+                values[s], best[s], next_cells[s] = value + c, a, t
+                heapq.heappush(heap, (value + c, s))
+    return values, best, next_cells
+
+
+def _shortestPathsNumpy(succ, cost, hole):
+    """
+    _shortestPaths on NumPy transition arrays, with the same results. Every
+    cell at the lowest unsettled value is settled at once and its
+    predecessors relaxed together; ties go, as with the heap, to the lower
+    value, then the lower cell index, then the earlier (action, outcome).
+    """
+    n_actions, n_outcomes, n = succ.shape
+    index = np.arange(n)
+    moves = succ != index
+    # Every shot that moves the ball, as an edge s -> t, sorted by t
+    target = succ[moves]
+    order = np.argsort(target, kind="stable")
+    target = target[order]
+    source = np.broadcast_to(index, succ.shape)[moves][order]
+    action = np.broadcast_to(np.arange(n_actions)[:, None, None], succ.shape)[moves][order]
+    edge_cost = cost[moves][order]
+    starts = np.searchsorted(target, np.arange(n + 1))
+    del moves, order
+
+    values = np.full(n, math.inf)
+    best = np.full(n, -1, dtype=np.intp)
+    next_cells = np.full(n, -1, dtype=np.intp)
+    settled = np.zeros(n, dtype=bool)
+    values[hole] = 0.0
+    while True:
+        open_values = np.where(settled, math.inf, values)
+        value = open_values.min()
+        if value == math.inf:
+            break
+        frontier = np.flatnonzero(open_values == value)
+        settled[frontier] = True
+        counts = starts[frontier + 1] - starts[frontier]
+        if not counts.sum():
+            continue
+        # Edge indices of every frontier cell, in cell then edge order
+        edges = np.repeat(starts[frontier] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        sources = source[edges]
+        candidates = value + edge_cost[edges]
+        better = (candidates < values[sources]) & (sources != hole)
+        edges, sources, candidates = edges[better], sources[better], candidates[better]
+        # The first lowest candidate per source cell
+        first = np.lexsort((edges, candidates, sources))
+        keep = np.ones(len(first), dtype=bool)
+        keep[1:] = sources[first[1:]] != sources[first[:-1]]
+        chosen = first[keep]
+        cells = sources[chosen]
+        values[cells] = candidates[chosen]
+        best[cells] = action[edges[chosen]]
+        next_cells[cells] = target[edges[chosen]]
+    return values.tolist(), best.tolist(), next_cells.tolist()
+
+
+# ----------------------------------------------------
+#   VALUE ITERATION
+# ----------------------------------------------------
+# Both solvers first restrict play to the cells from which the hole can be
+# reached with probability 1 (and to actions that never leave that set),
+# so value iteration converges; every other cell gets math.inf.
+# A shot that leaves the ball in place is folded into its action's value in
+# closed form: Q = (sum of other outcomes + p_self * c_self) / (1 - p_self).
+
+_TOLERANCE = 1e-7
+_MAX_SWEEPS = 10000
+
+
+def _valueIterationPython(probs, succ, cost, hole):
+    n_actions, n_outcomes, n = len(succ), len(probs), len(succ[0][0])
+    winning = [True] * n
+    while True:
+        allowed = [
+            [s for s in range(n) if winning[s] and all(winning[succ[a][k][s]] for k in range(n_outcomes))]
+            for a in range(n_actions)
+        ]
+        predecessors = [[] for _ in range(n)]
+        for a in range(n_actions):
+            for s in allowed[a]:
+                for k in range(n_outcomes):
+                    t = succ[a][k][s]
+                    if t != s:
+                        predecessors[t].append(s)
+        order, seen = [hole], {hole}
+        for t in order:
+            for s in predecessors[t]:
+                if s not in seen:
+                    seen.add(s)
+                    order.append(s)
+        if len(seen) == sum(winning):
+            break
+        winning = [s in seen for s in range(n)]
+
+    # Fold each allowed action into q = base + sum(weight * values[target]).
+    folded = [[] for _ in range(n)]
+    for a in range(n_actions):
+        succ_a, cost_a = succ[a], cost[a]
+        for s in allowed[a]:
+            base, p_self, terms = 0.0, 0.0, {}
+            for k in range(n_outcomes):
+                t = succ_a[k][s]
+                base += probs[k] * cost_a[k][s]
+                if t == s:
+                    p_self += probs[k]
+                else:
+                    terms[t] = terms.get(t, 0.0) + probs[k]
+            if p_self >= 1.0:
+                continue
+            scale = 1.0 / (1.0 - p_self)
+            folded[s].append((a, base * scale, tuple(terms), tuple(w * scale for w in terms.values())))
+
+    values = [math.inf] * n
+    for s in order:
+        values[s] = 0.0
+    best = [-1] * n
+    lookup = values.__getitem__
+    for _ in range(_MAX_SWEEPS):
+        delta = 0.0
+        for s in order[1:]:
+            best_q, best_a = math.inf, -1
+            for a, base, targets, weights in folded[s]:
+                q = base + sum(map(mul, weights, map(lookup, targets)))
+                if q < best_q:
+                    best_q, best_a = q, a
+            change = abs(best_q - values[s])
+            if change > delta:
+                delta = change
+            values[s], best[s] = best_q, best_a
+        if delta < _TOLERANCE:
+            break
+        # Gauss-Seidel converges fastest when cells nearer the hole go first.
+        order.sort(key=lookup)
+    return values, best
+
+
+def _valueIterationNumpy(probs, succ, cost, hole):
+    n_actions, n_outcomes, n = succ.shape
+    index = np.arange(n)
+    p = probs[None, :, None]
+    is_self = succ == index
+    p_self = (p * is_self).sum(axis=1)
+
+    winning = np.ones(n, dtype=bool)
+    while True:
+        allowed = winning[succ].all(axis=1) & winning & (p_self < 1.0)
+        reach = np.zeros(n, dtype=bool)
+        reach[hole] = True
+        while True:
+            grown = reach | (allowed & (reach[succ] & ~is_self).any(axis=1)).any(axis=0)
+            if (grown == reach).all():
+                break
+            reach = grown
+        if (reach == winning).all():
+            break
+        winning = reach
+    allowed = winning[succ].all(axis=1) & winning & (p_self < 1.0)
+
+    # Self outcomes (and every outcome of a disallowed action) gather from a
+    # trailing sentinel slot that always holds 0, so each sweep is one
+    # gather, one weighted sum and one min.
+    gather = np.where(is_self | ~allowed[:, None, :], n, succ)
+    with np.errstate(divide="ignore"):
+        scale = np.where(allowed, 1.0 / (1.0 - p_self), 0.0)
+    base = np.where(allowed, (p * cost).sum(axis=1) * scale, np.inf)
+    weights = p * scale[:, None, :]
+    values = np.zeros(n + 1)
+    values[:n][~winning] = np.inf
+    for _ in range(_MAX_SWEEPS):
+        q = base + (weights * values[gather]).sum(axis=1)
+        updated = q.min(axis=0)
+        updated[hole] = 0.0
+        updated[~winning] = np.inf
+        delta = np.abs(updated[winning] - values[:n][winning]).max()
+        values[:n] = updated
+        if delta < _TOLERANCE:
+            break
+
+    best = np.where(winning, q.argmin(axis=0), -1)
+    best[hole] = -1
+    return values[:n].tolist(), best.tolist()
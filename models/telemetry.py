@@ -0,0 +1,246 @@
+import glob
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Iterator, List, Tuple
+
+from enums import GameMode, ClubType, EngineEvent
+from .cell import TERRAIN_CODES
+
+_MAGIC = b"RLTM"
+_VERSION = 1
+
+# One shot per record, every field a little-endian int32. Mode, club and
+# hazard are indices into GameMode, ClubType and models.cell.TERRAINS
+# (hazard -1: none); course identifies the course layout (see course_id).
+FIELDS = (
+    "session", "course", "mode", "club",
+    "from_x", "from_y", "to_x", "to_y",
+    "distance", "hazard", "strokes",
+)
+_RECORD = struct.Struct(f"<{len(FIELDS)}i")
+_HEADER = struct.Struct("<4sHHII")  # magic, version, header size, record size, field count
+_COLUMNS = {name: index for index, name in enumerate(FIELDS)}
+_MODES = {mode: index for index, mode in enumerate(GameMode)}
+_CLUBS = {club: index for index, club in enumerate(ClubType)}
+
+# Columns are read in place as native int32; big-endian hosts read a swapped copy
+_NATIVE_ORDER = sys.byteorder == "little"
+
+DEFAULT_SEGMENT_BYTES = 64 << 20
+DEFAULT_BUFFER_RECORDS = 4096
+
+
+def course_id(course) -> int:
+    """Signed 32-bit id of a course layout: the first bytes of Course.gridKey."""
+    return int.from_bytes(course.gridKey()[:4], "little", signed=True)
+
+
+def segment_paths(directory: str, prefix: str = "shots") -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*.bin")))
+
+
+class TelemetryWriter:
+    """
+    Append-only shot log: fixed-width records (FIELDS) buffered in memory
+    and written to numbered segment files, starting a new segment once
+    one would grow past `segmentBytes`. Each writer starts a segment of
+    its own, so files written earlier are never modified.
+    Not thread-safe; give each thread or process its own prefix.
+    """
+    def __init__(self, directory: str, prefix: str = "shots",
+                 segmentBytes: int = DEFAULT_SEGMENT_BYTES, bufferRecords: int = DEFAULT_BUFFER_RECORDS):
+        self.directory = directory
+        self.prefix = prefix
+        self.segmentBytes = max(segmentBytes, _HEADER.size + _RECORD.size)
+        self.bufferBytes = max(bufferRecords, 1) * _RECORD.size
+        self.records = 0  # Written or buffered by this writer
+        self.segments = 0  # Started by this writer
+        self._buffer = bytearray()
+        self._file = None
+        self._fileBytes = 0
+        existing = segment_paths(directory, prefix)
+        self._nextSegment = int(existing[-1].rsplit("-", 1)[1].split(".")[0]) + 1 if existing else 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, session: int, course: int, mode: GameMode, club: ClubType,
+              origin: Tuple[int, int], position: Tuple[int, int], distance: int,
+              hazard, strokes: int):
+        self._buffer += _RECORD.pack(
+            session, course, _MODES[mode], _CLUBS[club], *origin, *position,
+            distance, -1 if hazard is None else TERRAIN_CODES[hazard], strokes,
+        )
+        self.records += 1
+        if len(self._buffer) >= self.bufferBytes:
+            self.flush()
+
+    def attach(self, engine, session: int = 0) -> Callable[[], None]:
+        """Log every shot `engine` takes under `session`; returns a function that detaches it."""
+        last = [None, None, 0]  # course, its revision, its id: recomputed when either changes
+
+        def onShot(event: EngineEvent, engine, fields: dict):
+            course = engine.activeCourse
+            if course is not last[0] or course.revision != last[1]:
+                last[:] = course, course.revision, course_id(course)
+            self.write(session, last[2], engine.currentMode, fields["club"], fields["origin"],
+                       fields["position"], fields["distance"], engine.lastHazard, fields["strokes"])
+        return engine.events.subscribe(onShot, EngineEvent.SHOT_TAKEN)
+
+    def flush(self):
+        """Write buffered records out, rotating segments as they fill up."""
+        with memoryview(self._buffer) as view:
+            written = 0
+            while written < len(view):
+                if self._file is None or self._fileBytes + _RECORD.size > self.segmentBytes:
+                    self._startSegment()
+                room = (self.segmentBytes - self._fileBytes) // _RECORD.size * _RECORD.size
+                with view[written:written + room] as chunk:
+                    self._file.write(chunk)
+                    size = len(chunk)
+                self._fileBytes += size
+                written += size
+        self._buffer.clear()
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TelemetryWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _startSegment(self):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"{self.prefix}-{self._nextSegment:06d}.bin")
+        self._nextSegment += 1
+        self.segments += 1
+        # "xb": a segment is only ever written by the writer that created it
+        self._file = open(path, "xb")
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, _HEADER.size, _RECORD.size, len(FIELDS)))
+        self._fileBytes = _HEADER.size
+
+
+class TelemetrySegment:
+    """
+    One memory-mapped segment file; columns are zero-copy strided views
+    (on little-endian hosts; big-endian ones byteswap a copy on open).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        with open(path, "rb") as f:
+            # Shorter than a header: just created by a live writer, or cut off
+            # by a crash before the header was written. Read as no records.
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                self.records = 0
+                self._data = memoryview(b"")
+                self._values = self._data.cast("i")
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size, record_size, field_count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size or field_count != len(FIELDS):
+            self._map.close()
+            raise ValueError(f"{path} is not a telemetry segment, or an unsupported version")
+        # A segment cut short mid-record (e.g. by a crash) ends at its last whole record
+        self.records = (len(self._map) - header_size) // record_size
+        self._data = memoryview(self._map)[header_size:header_size + self.records * record_size]
+        if _NATIVE_ORDER:
+            self._values = self._data.cast("i")
+        else:
+            values = array("i")
+            values.frombytes(self._data)
+            values.byteswap()
+            self._values = memoryview(values)
+
+    def __len__(self) -> int:
+        return self.records
+
+    def column(self, name: str) -> memoryview:
+        """Every record's `name` as a strided int32 memoryview over the file."""
+        return self._values[_COLUMNS[name]::len(FIELDS)]
+
+    def array(self, name: str):
+        """column() as a NumPy int32 array sharing the mapped memory. Requires NumPy."""
+        return self.table()[:, _COLUMNS[name]]
+
+    def table(self):
+        """All records as a (records, fields) NumPy int32 array over the mapped memory."""
+        import numpy as np
+        return np.frombuffer(self._values, dtype=np.int32).reshape(self.records, len(FIELDS))
+
+    def rows(self) -> Iterator[Tuple[int, ...]]:
+        return _RECORD.iter_unpack(self._data)
+
+    def close(self):
+        """Release the mapping; views handed out must no longer be in use."""
+        self._values.release()
+        self._data.release()
+        if self._map is not None:
+            self._map.close()
+
+
+class TelemetryReader:
+    """
+    Read-only access to every segment written under `prefix` in
+    `directory`, each memory-mapped so scans never copy the log into
+    Python objects. Segments present when the reader opens are included.
+    """
+    def __init__(self, directory: str, prefix: str = "shots"):
+        self.segments: List[TelemetrySegment] = []
+        try:
+            for path in segment_paths(directory, prefix):
+                self.segments.append(TelemetrySegment(path))
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def columns(self, name: str) -> List[memoryview]:
+        """One zero-copy view of column `name` per segment."""
+        return [segment.column(name) for segment in self.segments]
+
+    def array(self, name: str):
+        """
+        Column `name` over all segments as one NumPy array: a view of the
+        mapped file for a single segment, otherwise a concatenated copy.
+        Requires NumPy.
+        """
+        import numpy as np
+        arrays = [segment.array(name) for segment in self.segments]
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.int32)
+
+    def rows(self) -> Iterator[Tuple[int, ...]]:
+        for segment in self.segments:
+            yield from segment.rows()
+
+    def total(self, name: str) -> int:
+        """Sum of column `name`, with NumPy when available."""
+        try:
+            import numpy as np
+        except ImportError:
+            return sum(sum(view) for view in self.columns(name))
+        return int(sum(int(np.asarray(segment.array(name), dtype=np.int64).sum()) for segment in self.segments))
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def __enter__(self) -> "TelemetryReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
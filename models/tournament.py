@@ -0,0 +1,143 @@
+import math
+import multiprocessing
+import os
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from enums import GameMode, CourseType
+from .game_engine import GameEngine, HoleResult, MulliganRule, ShotPolicy
+from .rng import derive_seed
+
+
+class StrokeStats:
+    """Running, mergeable aggregate of hole results; holds no per-hole data."""
+    def __init__(self):
+        self.holes = 0
+        self.completed = 0
+        self.totalStrokes = 0
+        self.totalSquaredStrokes = 0
+        self.minStrokes: Optional[int] = None
+        self.maxStrokes: Optional[int] = None
+        self.totalMulligans = 0
+        self.histogram: Dict[int, int] = {}  # strokes -> holes
+
+    def add(self, result: HoleResult):
+        strokes = result.strokes
+        self.holes += 1
+        self.completed += result.completed
+        self.totalStrokes += strokes
+        self.totalSquaredStrokes += strokes * strokes
+        if self.minStrokes is None or strokes < self.minStrokes:
+            self.minStrokes = strokes
+        if self.maxStrokes is None or strokes > self.maxStrokes:
+            self.maxStrokes = strokes
+        self.totalMulligans += result.mulligans
+        self.histogram[strokes] = self.histogram.get(strokes, 0) + 1
+
+    def merge(self, other: "StrokeStats"):
+        self.holes += other.holes
+        self.completed += other.completed
+        self.totalStrokes += other.totalStrokes
+        self.totalSquaredStrokes += other.totalSquaredStrokes
+        for bound in (other.minStrokes, other.maxStrokes):
+            if bound is None:
+                continue
+            if self.minStrokes is None or bound < self.minStrokes:
+                self.minStrokes = bound
+            if self.maxStrokes is None or bound > self.maxStrokes:
+                self.maxStrokes = bound
+        self.totalMulligans += other.totalMulligans
+        for strokes, count in other.histogram.items():
+            self.histogram[strokes] = self.histogram.get(strokes, 0) + count
+
+    def meanStrokes(self) -> float:
+        return self.totalStrokes / self.holes if self.holes else math.nan
+
+    def stdevStrokes(self) -> float:
+        if self.holes < 2:
+            return math.nan
+        mean = self.meanStrokes()
+        variance = (self.totalSquaredStrokes - self.holes * mean * mean) / (self.holes - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def meanMulligans(self) -> float:
+        return self.totalMulligans / self.holes if self.holes else math.nan
+
+    def completionRate(self) -> float:
+        return self.completed / self.holes if self.holes else math.nan
+
+
+class TournamentUpdate(NamedTuple):
+    """Stats for one finished chunk of holes, streamed back as it completes."""
+    policy: str
+    mode: GameMode
+    courseType: CourseType
+    stats: StrokeStats
+
+
+class _Chunk(NamedTuple):
+    policy: str
+    shotPolicy: ShotPolicy
+    mode: GameMode
+    courseType: CourseType
+    seed: int
+    firstHole: int
+    holes: int
+    maxStrokes: int
+    mulliganRule: Optional[MulliganRule]
+
+
+def run_tournament(
+    policies: Dict[str, ShotPolicy],
+    holes_per_course_type: int = 1000,
+    modes: Iterable[GameMode] = tuple(GameMode),
+    course_types: Iterable[CourseType] = tuple(CourseType),
+    seed: int = 0,
+    processes: Optional[int] = None,
+    chunk_size: int = 250,
+    max_strokes: int = 100,
+    mulligan_rule: Optional[MulliganRule] = None,
+) -> Iterator[TournamentUpdate]:
+    """
+    Play every policy over `holes_per_course_type` generated holes of each
+    mode and course type, spread over a process pool, and yield one
+    TournamentUpdate per finished chunk (in completion order).
+
+    All policies see the same courses and dice streams for a given
+    (seed, mode, course type, hole), so their results are directly
+    comparable. Policies and the mulligan rule must be picklable
+    (module-level functions) unless `processes` is 1, which runs inline.
+    """
+    chunks = (
+        _Chunk(name, policy, mode, course_type, derive_seed(seed, mode.name, course_type.name),
+               first, min(chunk_size, holes_per_course_type - first), max_strokes, mulligan_rule)
+        for mode in modes
+        for course_type in course_types
+        for first in range(0, holes_per_course_type, chunk_size)
+        for name, policy in policies.items()
+    )
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        yield from map(_play_chunk, chunks)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(_play_chunk, chunks)
+
+
+def summarize(updates: Iterable[TournamentUpdate]) -> Dict[Tuple[str, GameMode, CourseType], StrokeStats]:
+    """Fold a stream of updates into one StrokeStats per (policy, mode, course type)."""
+    totals: Dict[Tuple[str, GameMode, CourseType], StrokeStats] = {}
+    for update in updates:
+        key = (update.policy, update.mode, update.courseType)
+        totals.setdefault(key, StrokeStats()).merge(update.stats)
+    return totals
+
+
+def _play_chunk(chunk: _Chunk) -> TournamentUpdate:
+    engine = GameEngine(headless=True, seed=chunk.seed)
+    engine.gameIndex = chunk.firstHole
+    stats = StrokeStats()
+    for _ in range(chunk.holes):
+        engine.startGame(chunk.mode, chunk.courseType)
+        stats.add(engine.playHole(chunk.shotPolicy, chunk.maxStrokes, chunk.mulliganRule))
+    return TournamentUpdate(chunk.policy, chunk.mode, chunk.courseType, stats)
@@ -0,0 +1,369 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import traceback
+from typing import Dict, List, Optional, Set
+
+from db import Database
+from enums import GameMode, CourseType, ClubType
+from models.course_cache import CourseCache
+from models.events import EngineMetrics
+from models.game_engine import GameEngine
+from models.telemetry import TelemetryWriter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_STROKES = 100  # A hole ends, unfinished, after this many strokes
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ProtocolError(ValueError):
+    """A request the server cannot serve; reported back to the client."""
+
+
+class Session:
+    """One hosted game: a headless engine plus what the server tracks about it."""
+    def __init__(self, sessionId: int, engine: GameEngine, playerId: Optional[int]):
+        self.sessionId = sessionId
+        self.engine = engine
+        self.playerId = playerId
+        self.finished = False
+        self.saved = False
+
+    def state(self) -> dict:
+        engine = self.engine
+        return {
+            "session": self.sessionId,
+            "mode": engine.currentMode.name,
+            "course_type": engine.activeCourse.course_type.name,
+            "ball": list(engine.ball.getPosition()),
+            "hole": list(engine.activeCourse.getHolePosition()),
+            "strokes": engine.player.getStrokes(),
+            "mulligans": engine.player.getMulligans(),
+            "roll": engine.pendingRoll,
+            "hazard": engine.lastHazard.name if engine.lastHazard else None,
+            "completed": engine.checkVictoryCondition(),
+            "finished": self.finished,
+        }
+
+    def course(self) -> dict:
+        course = self.engine.activeCourse
+        return {
+            "width": course.width,
+            "height": course.height,
+            # One digit per square, row-major: models.cell terrain codes
+            "terrain": bytes(code + 48 for code in course.terrain).decode("ascii"),
+        }
+
+    def saveData(self) -> dict:
+        engine = self.engine
+        return {
+            "player_id": self.playerId,
+            "current_mode": engine.currentMode,
+            "strokes": engine.player.getStrokes(),
+            "mulligans_remaining": engine.player.getMulligans(),
+            "ball_pos_x": engine.ball.x,
+            "ball_pos_y": engine.ball.y,
+            "course_type": engine.activeCourse.course_type,
+            "completed": engine.checkVictoryCondition(),
+            # Unfinished games keep their full state so they can be resumed
+            "state": None if self.finished else engine.save(),
+        }
+
+
+class SaveBatcher:
+    """
+    Collects save dicts from the event loop and writes them in batches
+    (one Database.save_many transaction each) on a worker thread, so
+    request handling never waits on SQLite.
+    """
+    def __init__(self, database: Database, maxBatch: int = 500, maxDelay: float = 0.05):
+        self.database = database
+        self.maxBatch = maxBatch
+        self.maxDelay = maxDelay  # Seconds to let a batch fill up
+        self.written = 0
+        self.failed = 0
+        self._queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, save_data: dict):
+        self._queue.put_nowait(save_data)
+
+    async def close(self):
+        """Write everything submitted so far, then stop."""
+        self._queue.put_nowait(None)
+        if self._task is not None:
+            await self._task
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch: List[dict] = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+                await asyncio.sleep(self.maxDelay)
+            while len(batch) < self.maxBatch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: List[dict]):
+        try:
+            await asyncio.to_thread(self.database.save_many, batch)
+            self.written += len(batch)
+        except Exception as error:
+            self.failed += len(batch)
+            print(f"Failed to write {len(batch)} saves: {error}", file=sys.stderr)
+
+
+class GameServer:
+    """
+    Hosts many concurrent game sessions over line-delimited JSON.
+
+    Each request is one JSON object per line with a "cmd" and optional
+    "id" (echoed back); each response is one line with "ok" plus either
+    the result fields or an "error". Commands:
+      start    {"mode", "course_type", "seed"?, "player_id"?} -> new session, course and state
+      roll     {"session"}                      -> DICE_GOLF roll for the next shot
+      shot     {"session", "dx", "dy", "club"?} -> state after the shot
+      mulligan {"session", "revert"?}           -> state after the mulligan
+      state    {"session"}                      -> current state
+      close    {"session"}                      -> ends the session
+      stats    {}                               -> server-wide engine metrics and cache counters
+    Finished holes, and sessions closed or dropped before finishing, are
+    saved through a SaveBatcher. With a TelemetryWriter every shot is also
+    logged to it, under the session id.
+    """
+    def __init__(self, database: Database, courseCache: Optional[CourseCache] = None,
+                 maxSessions: int = 100_000, saveBatch: int = 500, saveDelay: float = 0.05,
+                 telemetry: Optional[TelemetryWriter] = None):
+        self.database = database
+        self.telemetry = telemetry
+        self.courseCache = courseCache if courseCache is not None else CourseCache()
+        self.maxSessions = maxSessions
+        self.sessions: Dict[int, Session] = {}
+        self.saves = SaveBatcher(database, saveBatch, saveDelay)
+        self.requests = 0
+        self.metrics = EngineMetrics()  # Shared by every session's engine
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._commands = {
+            "start": self._start,
+            "roll": self._roll,
+            "shot": self._shot,
+            "mulligan": self._mulligan,
+            "state": self._state,
+            "close": self._close,
+            "stats": self._stats,
+        }
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.saves.start()
+        self._server = await asyncio.start_server(self._handleClient, host, port, limit=MAX_LINE_BYTES)
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serveForever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Stop accepting clients, save open sessions and flush pending saves."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for sessionId in list(self.sessions):
+            self._endSession(sessionId)
+        await self.saves.close()
+        if self.telemetry is not None:
+            self.telemetry.flush()
+
+    def handle(self, request: dict, owned: Set[int]) -> dict:
+        """Serve one decoded request; `owned` holds the connection's sessions."""
+        self.requests += 1
+        command = self._commands.get(request.get("cmd"))
+        if command is None:
+            raise ProtocolError(f"unknown command {request.get('cmd')!r}")
+        return command(request, owned)
+
+    async def _handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        owned: Set[int] = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # ValueError: line too long
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ProtocolError("request must be a JSON object")
+                    response = {"ok": True, **self.handle(request, owned)}
+                except (ProtocolError, ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                except Exception:
+                    # A bug serving one request fails that request, not the connection
+                    traceback.print_exc()
+                    response = {"ok": False, "error": "internal server error"}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for sessionId in owned:
+                self._endSession(sessionId)
+            writer.close()
+
+    def _session(self, request: dict, owned: Set[int]) -> Session:
+        sessionId = request.get("session")
+        if sessionId not in owned:
+            raise ProtocolError(f"no session {sessionId!r} on this connection")
+        return self.sessions[sessionId]
+
+    def _playing(self, request: dict, owned: Set[int]) -> Session:
+        session = self._session(request, owned)
+        if session.finished:
+            raise ProtocolError("the hole is finished; start a new session")
+        return session
+
+    def _start(self, request: dict, owned: Set[int]) -> dict:
+        if len(self.sessions) >= self.maxSessions:
+            raise ProtocolError("server is full")
+        mode = _member(GameMode, request.get("mode", GameMode.DICE_GOLF.name))
+        courseType = _member(CourseType, request.get("course_type", CourseType.SHORT_COURSE.name))
+        seed = request.get("seed")
+        playerId = request.get("player_id")
+        if seed is not None and not isinstance(seed, int):
+            raise ProtocolError("seed must be an integer")
+        if playerId is not None and not isinstance(playerId, int):
+            raise ProtocolError("player_id must be an integer")
+        engine = GameEngine(headless=True, seed=seed, courseCache=self.courseCache)
+        self.metrics.attach(engine)
+        engine.startGame(mode, courseType)
+        session = Session(next(self._ids), engine, playerId)
+        if self.telemetry is not None:
+            self.telemetry.attach(engine, session.sessionId)
+        self.sessions[session.sessionId] = session
+        owned.add(session.sessionId)
+        return {"course": session.course(), **session.state()}
+
+    def _roll(self, request: dict, owned: Set[int]) -> dict:
+        session = self._playing(request, owned)
+        if session.engine.currentMode != GameMode.DICE_GOLF:
+            raise ProtocolError("only DICE_GOLF shots are rolled")
+        return {"session": session.sessionId, "roll": session.engine.rollDice()}
+
+    def _shot(self, request: dict, owned: Set[int]) -> dict:
+        session = self._playing(request, owned)
+        club = _member(ClubType, request.get("club", ClubType.DRIVER.name))
+        dx, dy = request["dx"], request["dy"]
+        # type() rather than isinstance: no bools, and no floats such as 1.0
+        if type(dx) is not int or type(dy) is not int or dx not in (-1, 0, 1) or dy not in (-1, 0, 1) \
+                or not (dx or dy):
+            raise ProtocolError("dx and dy must be -1, 0 or 1 and not both 0")
+        session.engine.takeShot(club, dx, dy)
+        self._checkFinished(session)
+        return session.state()
+
+    def _mulligan(self, request: dict, owned: Set[int]) -> dict:
+        session = self._playing(request, owned)
+        session.engine.useMulligan(bool(request.get("revert", True)))
+        self._checkFinished(session)
+        return session.state()
+
+    def _state(self, request: dict, owned: Set[int]) -> dict:
+        return self._session(request, owned).state()
+
+    def _close(self, request: dict, owned: Set[int]) -> dict:
+        session = self._session(request, owned)
+        owned.discard(session.sessionId)
+        self._endSession(session.sessionId)
+        return {"session": session.sessionId, "closed": True}
+
+    def _stats(self, request: dict, owned: Set[int]) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "requests": self.requests,
+            "saves_written": self.saves.written,
+            "saves_failed": self.saves.failed,
+            "course_cache": self.courseCache.stats(),
+            **self.metrics.asDict(),
+        }
+
+    def _checkFinished(self, session: Session):
+        engine = session.engine
+        if engine.checkVictoryCondition() or engine.player.getStrokes() >= MAX_STROKES:
+            session.finished = True
+            self._save(session)
+
+    def _endSession(self, sessionId: int):
+        session = self.sessions.pop(sessionId, None)
+        if session is not None and session.engine.player.getStrokes() > 0:
+            self._save(session)
+
+    def _save(self, session: Session):
+        if not session.saved:
+            session.saved = True
+            self.saves.submit(session.saveData())
+
+
+def _member(enum_type, name):
+    try:
+        return enum_type[name]
+    except (KeyError, TypeError):
+        raise ProtocolError(f"unknown {enum_type.__name__} {name!r}") from None
+
+
+async def serve(db_path: str = "dicegolf.db", host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                telemetry_dir: Optional[str] = None):
+    database = Database(db_path)
+    database.init_schema()
+    telemetry = TelemetryWriter(telemetry_dir) if telemetry_dir is not None else None
+    server = GameServer(database, telemetry=telemetry)
+    await server.start(host, port)
+    print(f"Dice Golf server listening on {host}:{server.port}")
+    try:
+        await server.serveForever()
+    finally:
+        await server.stop()
+        database.close()
+        if telemetry is not None:
+            telemetry.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Host Dice Golf sessions over line-delimited JSON.")
+    parser.add_argument("--db", default="dicegolf.db", help="SQLite database for saves")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--telemetry", help="directory to log every shot to (see models.telemetry)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.telemetry))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
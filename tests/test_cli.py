@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+import cli
+
+
+def _simulate(capsys, processes):
+    cli.main(["simulate", "--mode", "SPEED_GOLF", "--course-type", "LONG_COURSE", "--holes", "300",
+              "--seed", "4", "--processes", str(processes), "--json"])
+    return json.loads(capsys.readouterr().out)
+
+
+def test_simulate_plays_the_same_holes_for_any_process_count(capsys):
+    assert _simulate(capsys, 1) == _simulate(capsys, 2)
+
+
+@pytest.mark.parametrize("argv", [
+    ["generate-course", "--width", "-3"],
+    ["generate-course", "--height", "0"],
+    ["simulate", "--processes", "-1"],
+])
+def test_rejects_out_of_range_sizes(argv, capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        cli.main(argv)
+    assert excinfo.value.code == 2
+    assert "must be at least" in capsys.readouterr().err
@@ -0,0 +1,29 @@
+import sys
+
+import pytest
+
+from enums import CourseType
+from models.course_cache import CourseCache
+
+
+def _resident(course):
+    table = course.hazardTable()
+    return (sys.getsizeof(course.terrain) + sys.getsizeof(course.__dict__)
+            + sys.getsizeof(table.final) + sys.getsizeof(table.penalty))
+
+
+@pytest.mark.parametrize("size", [(12, 17), (300, 200)])
+def test_entry_size_counts_the_hazard_table(size):
+    cache = CourseCache()
+    course = cache.getOrGenerate(CourseType.LONG_COURSE, *size, seed=1)
+    assert cache.currentBytes == pytest.approx(_resident(course), rel=0.1)
+
+
+def test_byte_bound_holds_once_courses_are_played():
+    probe = CourseCache()
+    one = _resident(probe.getOrGenerate(CourseType.LONG_COURSE, 200, 200, seed=0))
+    cache = CourseCache(maxBytes=3 * one)
+    for seed in range(6):
+        cache.getOrGenerate(CourseType.LONG_COURSE, 200, 200, seed=seed).hazardTable()
+    assert len(cache) <= 3 and cache.evictions == 6 - len(cache)
+    assert cache.stats()["bytes"] <= cache.maxBytes
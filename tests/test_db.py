@@ -0,0 +1,77 @@
+import shutil
+import sqlite3
+
+import pytest
+
+import db
+from enums import CourseType, GameMode
+
+# The saves and courses tables as the first version of init_db created them,
+# which is what dicegolf.db still has
+BASELINE_SCHEMA = """
+    CREATE TABLE players (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT,
+                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE saves (id INTEGER PRIMARY KEY AUTOINCREMENT, player_id INTEGER,
+                        current_mode TEXT, strokes INTEGER, mulligans_remaining INTEGER,
+                        ball_pos_x INTEGER, ball_pos_y INTEGER,
+                        saved_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE courses (id INTEGER PRIMARY KEY AUTOINCREMENT, course_type TEXT,
+                          width INTEGER, height INTEGER,
+                          created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE cells (id INTEGER PRIMARY KEY AUTOINCREMENT, course_id INTEGER,
+                        x INTEGER, y INTEGER, hazard_type TEXT);
+"""
+
+SAVE = {
+    "player_id": 1, "current_mode": GameMode.DICE_GOLF, "strokes": 5,
+    "mulligans_remaining": 2, "ball_pos_x": 3, "ball_pos_y": 4,
+    "course_type": CourseType.SHORT_COURSE, "completed": True, "state": b"state",
+}
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    path = str(tmp_path / "baseline.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    return path
+
+
+def _columns(path, table):
+    with sqlite3.connect(path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_database_saves_to_baseline_schema(baseline_db):
+    with db.Database(baseline_db) as database:
+        database.save_game_state(SAVE)
+        saved = database.recent_saves(1)
+        assert database.load_game_state(saved[0]["id"]) == b"state"
+        assert database.leaderboard(GameMode.DICE_GOLF)[0]["best_strokes"] == 5
+    assert saved[0]["course_type"] == "SHORT_COURSE" and saved[0]["completed"] == 1
+    assert {"course_type", "completed", "state"} <= _columns(baseline_db, "saves")
+
+
+def test_module_helpers_save_to_baseline_schema(baseline_db):
+    try:
+        db.save_game_state(baseline_db, SAVE)
+        assert db.save_many(baseline_db, [SAVE, SAVE]) == 2
+        assert len(db.recent_saves(baseline_db, 1)) == 3
+    finally:
+        db.get_database(baseline_db).close()
+
+
+def test_saves_to_a_copy_of_the_repository_database(tmp_path):
+    path = str(tmp_path / "dicegolf.db")
+    shutil.copy(db.__file__.replace("db.py", "dicegolf.db"), path)
+    with db.Database(path) as database:
+        database.save_game_state(SAVE)
+        assert database.recent_saves(1)[0]["strokes"] == 5
+
+
+def test_init_schema_is_idempotent(baseline_db):
+    with db.Database(baseline_db) as database:
+        database.init_schema()
+        database.init_schema()
+        database.save_game_state(SAVE)
+    assert "grid" in _columns(baseline_db, "courses")
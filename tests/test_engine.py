@@ -0,0 +1,57 @@
+from enums import ClubType, CourseType, EngineEvent, GameMode
+from models.events import EVENT_FIELDS, EngineMetrics
+from models.game_engine import GameEngine
+from models.rules import distance_modifier
+from models.telemetry import TelemetryReader, TelemetryWriter
+
+
+def _play_like_the_gui(engine, limit=40):
+    """Roll, then click the highlighted square nearest the hole, until it is holed."""
+    for _ in range(limit):
+        if engine.checkVictoryCondition():
+            return
+        x, y = engine.ball.getPosition()
+        roll = engine.rollDice() + distance_modifier(GameMode.DICE_GOLF, ClubType.DRIVER,
+                                                     engine.activeCourse.getTerrain(x, y))
+        if roll <= 0:
+            continue
+        hx, hy = engine.activeCourse.holePosition
+        engine.placeBall(*min(engine.activeCourse.getReachableCells(x, y, roll),
+                              key=lambda cell: max(abs(cell[0] - hx), abs(cell[1] - hy))))
+
+
+def test_place_ball_is_observed_like_a_shot(tmp_path):
+    engine = GameEngine(headless=True, seed=4)
+    engine.startGame(GameMode.DICE_GOLF, CourseType.MEDIUM_COURSE)
+    events = []
+    engine.events.subscribe(lambda event, engine, fields: events.append((event, fields)))
+    metrics = EngineMetrics()
+    metrics.attach(engine)
+    with TelemetryWriter(str(tmp_path)) as writer:
+        writer.attach(engine)
+        _play_like_the_gui(engine)
+    assert engine.checkVictoryCondition()
+
+    shots = [fields for event, fields in events if event == EngineEvent.SHOT_TAKEN]
+    assert shots and all(set(fields) == set(EVENT_FIELDS[EngineEvent.SHOT_TAKEN]) for fields in shots)
+    assert shots[-1]["position"] == engine.ball.getPosition()
+    assert shots[-1]["strokes"] == engine.player.getStrokes()
+    assert [event for event, _ in events].count(EngineEvent.HOLE_COMPLETED) == 1
+    assert metrics.counters["shot_taken"] == len(shots)
+    assert metrics.timings["placeBall"].count == len(shots)
+    with TelemetryReader(str(tmp_path)) as reader:
+        assert len(reader) == len(shots)
+        assert reader.total("strokes") == sum(fields["strokes"] for fields in shots)
+
+
+def test_place_ball_replays_and_undoes():
+    engine = GameEngine(headless=True, seed=11, undoDepth=100)
+    engine.startGame(GameMode.DICE_GOLF, CourseType.LONG_COURSE)
+    _play_like_the_gui(engine)
+    replayed = engine.replayLog.replay()
+    assert replayed.ball.getPosition() == engine.ball.getPosition()
+    assert replayed.player.getStrokes() == engine.player.getStrokes()
+
+    while engine.undo():
+        pass
+    assert engine.player.getStrokes() == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from enums import ClubType, CourseType, GameMode
+from models.game_engine import GameEngine
+from models.replay import ReplayLog
+
+
+def _played(size=None):
+    engine = GameEngine(headless=True, seed=21)
+    engine.startGame(GameMode.DICE_GOLF, CourseType.MEDIUM_COURSE, size)
+    engine.takeShot(ClubType.DRIVER, 0, -1)
+    engine.useMulligan()
+    engine.takeShot(ClubType.IRON, 1, -1)
+    engine.rollDice()
+    x, y = engine.ball.getPosition()
+    engine.placeBall(x, y - 1)
+    engine.placeBall(x - 1, y - 2)
+    return engine
+
+
+@pytest.mark.parametrize("size", [None, (9, 20)])
+def test_round_trip(size):
+    engine = _played(size)
+    log = ReplayLog.fromBytes(engine.replayLog.toBytes())
+    assert (log.seed, log.mode, log.courseType, log.gameIndex, log.size) == \
+        (engine.replayLog.seed, GameMode.DICE_GOLF, CourseType.MEDIUM_COURSE, engine.replayLog.gameIndex, size)
+    assert list(log.inputs()) == list(engine.replayLog.inputs())
+    assert [kind for kind, _ in log.inputs()] == ["shot", "mulligan", "shot", "place", "place"]
+    replayed = log.replay()
+    assert replayed.ball.getPosition() == engine.ball.getPosition()
+    assert replayed.player.getStrokes() == engine.player.getStrokes()
+    assert replayed.dice.position == engine.dice.position
+
+
+def test_reads_older_versions():
+    engine = GameEngine(headless=True, seed=8)
+    engine.startGame(GameMode.SPEED_GOLF, CourseType.SHORT_COURSE)
+    engine.takeShot(ClubType.DRIVER, 0, -1)
+    data = engine.replayLog.toBytes()
+    header, events = data[:19], data[27:]  # 19-byte header, then (version 2+) the 8-byte size
+    for version, body in ((1, events), (2, data[19:])):
+        log = ReplayLog.fromBytes(header[:4] + bytes([version]) + header[5:] + body)
+        assert list(log.inputs()) == list(engine.replayLog.inputs())
+        assert log.replay().ball.getPosition() == engine.ball.getPosition()
+
+
+def test_truncated_logs_are_rejected():
+    data = _played().replayLog.toBytes()
+    for length in range(len(data)):
+        if length >= 27 and (length - 27) % 3 == 0:
+            continue  # Ends on a whole event: a valid, shorter game
+        with pytest.raises(ValueError):
+            ReplayLog.fromBytes(data[:length])
+
+
+@pytest.mark.parametrize("patch", [(0, b"XXXX"), (4, b"\x04"), (5, b"\x09"), (6, b"\x09")])
+def test_other_files_and_versions_are_rejected(patch):
+    data = bytearray(_played().replayLog.toBytes())
+    offset, value = patch
+    data[offset:offset + len(value)] = value
+    with pytest.raises(ValueError, match="unsupported version"):
+        ReplayLog.fromBytes(bytes(data))
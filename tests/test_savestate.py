@@ -0,0 +1,63 @@
+import pytest
+
+from enums import ClubType, CourseType, GameMode
+from models.course_cache import CourseCache
+from models.game_engine import GameEngine
+
+
+def _played(cache):
+    engine = GameEngine(headless=True, seed=5, courseCache=cache, undoDepth=4)
+    engine.startGame(GameMode.DICE_GOLF, CourseType.SHORT_COURSE)
+    engine.takeShot(ClubType.DRIVER, 0, -1)
+    engine.useMulligan()
+    engine.takeShot(ClubType.IRON, 1, -1)
+    engine.rollDice()
+    return engine
+
+
+def _state(engine):
+    return (engine.currentMode, engine.ball.getPosition(), engine.previousPosition, engine.player.getStrokes(),
+            engine.player.getMulligans(), engine.strokeCount, engine.pendingRoll, engine.lastHazard,
+            engine.dice.position, bytes(engine.replayLog.events), bytes(engine.activeCourse.terrain))
+
+
+@pytest.mark.parametrize("inline", [False, True])
+def test_round_trip_continues_the_same_game(inline):
+    cache = CourseCache()
+    engine = _played(cache)
+    resumed = GameEngine.resume(engine.save(inline), courseCache=cache)
+    assert _state(resumed) == _state(engine)
+    assert len(resumed.undoStack) == len(engine.undoStack)
+    for game in (engine, resumed):
+        game.takeShot(ClubType.PUTTER, -1, -1)
+        game.undo()
+        game.undo()
+    assert _state(resumed) == _state(engine)
+
+
+def test_inline_save_needs_no_cache():
+    engine = GameEngine(headless=True, seed=2)
+    engine.startGame(GameMode.SPEED_GOLF, CourseType.MEDIUM_COURSE)
+    engine.takeShot(ClubType.DRIVER, 0, -1)
+    with pytest.raises(ValueError):
+        engine.save(False)
+    assert _state(GameEngine.resume(engine.save())) == _state(engine)
+
+
+@pytest.mark.parametrize("inline", [False, True])
+def test_truncated_and_padded_saves_are_rejected(inline):
+    data = _played(CourseCache()).save(inline)
+    for length in range(len(data)):
+        with pytest.raises(ValueError):
+            GameEngine.resume(data[:length])
+    with pytest.raises(ValueError):
+        GameEngine.resume(data + b"\0")
+
+
+@pytest.mark.parametrize("patch", [(0, b"RLRP"), (4, b"\x02"), (6, b"\x09"), (7, b"\x09")])
+def test_other_files_and_versions_are_rejected(patch):
+    data = bytearray(_played(CourseCache()).save())
+    offset, value = patch
+    data[offset:offset + len(value)] = value
+    with pytest.raises(ValueError, match="unsupported version"):
+        GameEngine.resume(bytes(data))
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from db import Database
+from server import GameServer
+
+
+async def _exchange(server, requests):
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    replies = []
+    try:
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await reader.readline()))
+    finally:
+        writer.close()
+    return replies
+
+
+def _run(tmp_path, requests, patch=None):
+    async def main():
+        with Database(str(tmp_path / "server.db")) as database:
+            server = GameServer(database)
+            if patch is not None:
+                patch(server)
+            await server.start("127.0.0.1", 0)
+            try:
+                return await _exchange(server, requests)
+            finally:
+                await server.stop()
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("dx, dy", [(1.0, 0), (0, -1.0), (True, 0), ("1", 0)])
+def test_shot_rejects_non_int_directions(tmp_path, dx, dy):
+    start, shot, state = _run(tmp_path, [
+        {"cmd": "start", "seed": 1},
+        {"cmd": "shot", "session": 1, "dx": dx, "dy": dy},
+        {"cmd": "state", "session": 1},
+    ])
+    assert start["ok"] and state["ok"]
+    assert not shot["ok"] and "dx and dy" in shot["error"]
+    assert state["strokes"] == 0
+
+
+def test_unexpected_errors_fail_the_request_not_the_connection(tmp_path, capsys):
+    def patch(server):
+        def broken(request, owned):
+            raise RuntimeError("boom")
+        server._commands["stats"] = broken
+
+    stats, start = _run(tmp_path, [{"cmd": "stats", "id": 7}, {"cmd": "start", "seed": 1}], patch)
+    assert stats == {"ok": False, "error": "internal server error", "id": 7}
+    assert start["ok"]
+    assert "RuntimeError: boom" in capsys.readouterr().err
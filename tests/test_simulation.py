@@ -0,0 +1,48 @@
+import pytest
+
+from enums import ClubType, CourseType, GameMode
+from models.cell import TERRAINS
+from models.game_engine import GameEngine, greedy_policy, mulligan_on_water, simulate
+from models.rules import CLUB_DISTANCES, distance_modifier
+
+
+@pytest.mark.parametrize("mode", list(GameMode))
+@pytest.mark.parametrize("rule", [None, mulligan_on_water])
+def test_simulate_matches_engine_play_hole(mode, rule):
+    results = simulate(60, mode, CourseType.LONG_COURSE, seed=3, first_hole=5, mulligan_rule=rule)
+    engine = GameEngine(headless=True, seed=3)
+    engine.gameIndex = 5
+    for result in results:
+        engine.startGame(mode, CourseType.LONG_COURSE)
+        assert engine.playHole(mulliganRule=rule) == result
+        assert engine.replayLog.replay().ball.getPosition() == engine.ball.getPosition()
+
+
+def test_simulate_is_reproducible():
+    assert simulate(40, GameMode.DICE_GOLF, CourseType.SHORT_COURSE, seed=9) == \
+        simulate(40, GameMode.DICE_GOLF, CourseType.SHORT_COURSE, seed=9)
+
+
+class _Stub:
+    """Just what greedy_policy reads from an engine."""
+    def __init__(self, course, x, y):
+        self.activeCourse, self.currentMode = course, GameMode.SPEED_GOLF
+        self.ball = type("Ball", (), {"x": x, "y": y})()
+
+
+@pytest.mark.parametrize("terrain", TERRAINS)
+def test_greedy_speed_club_follows_the_rules_table(terrain):
+    from models.course import Course
+    course = Course(1, 40, CourseType.LONG_COURSE)
+    course.terrain[39] = TERRAINS.index(terrain)
+    course.holePosition = (0, 0)
+    distances = [(club, base + distance_modifier(GameMode.SPEED_GOLF, club, terrain)) for club, base in CLUB_DISTANCES]
+    for wanted in range(40):
+        course.holePosition = (0, 39 - wanted)
+        club, _, _ = greedy_policy(_Stub(course, 0, 39))
+        fitting = [distance for _, distance in distances if 0 < distance <= wanted]
+        if fitting:
+            assert dict(distances)[club] == max(fitting)
+        else:
+            assert dict(distances)[club] == min(distance for _, distance in distances if distance > 0)
+    assert isinstance(club, ClubType)
@@ -0,0 +1,58 @@
+import threading
+
+from enums import CourseType, GameMode
+from models import solver
+from models.course import Course
+from models.course_cache import CourseCache, CourseKey, generator_id
+from models.rng import SeededRandom
+
+
+def _course(seed, size=(6, 8)):
+    course = Course(*size, CourseType.SHORT_COURSE)
+    course.generate(SeededRandom(seed))
+    return course
+
+
+def test_memos_survive_concurrent_eviction():
+    solver.clear_cache()
+    courses = [_course(seed) for seed in range(solver._CACHE_SIZE * 2)]
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(len(courses)):
+                course = courses[(i + offset) % len(courses)]
+                assert solver.distance_field(course, GameMode.SPEED_GOLF).width == course.width
+                assert solver.solve(course, GameMode.SPEED_GOLF).width == course.width
+        except Exception as error:  # Reported below, from the main thread
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(offset * 7,)) for offset in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(solver._cache) <= solver._CACHE_SIZE and len(solver._fieldCache) <= solver._CACHE_SIZE
+
+
+def test_uncached_calls_match_and_skip_the_memo():
+    solver.clear_cache()
+    course = _course(1)
+    field = solver.distance_field(course, GameMode.DICE_GOLF, cached=False)
+    table = solver.solve(course, GameMode.DICE_GOLF, cached=False)
+    assert not solver._cache and not solver._fieldCache
+    assert field.strokes == solver.distance_field(course, GameMode.DICE_GOLF).strokes
+    assert table.values == solver.solve(course, GameMode.DICE_GOLF).values
+
+
+def test_course_cache_keeps_the_only_copy():
+    solver.clear_cache()
+    cache = CourseCache()
+    key = CourseKey(CourseType.SHORT_COURSE, 6, 8, 3, generator_id())
+    cache.getOrGenerate(CourseType.SHORT_COURSE, 6, 8, 3)
+    table = cache.solverTable(key, GameMode.SPEED_GOLF)
+    field = cache.distanceField(key, GameMode.SPEED_GOLF)
+    assert cache.solverTable(key, GameMode.SPEED_GOLF) is table
+    assert cache.distanceField(key, GameMode.SPEED_GOLF) is field
+    assert not solver._cache and not solver._fieldCache
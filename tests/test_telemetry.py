@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from enums import ClubType, GameMode, HazardType
+from models.cell import TERRAIN_CODES
+from models.telemetry import FIELDS, TelemetryReader, TelemetryWriter, segment_paths
+
+HEADER_BYTES = 16
+RECORD_BYTES = 4 * len(FIELDS)
+
+
+def _write(directory, count, **options):
+    rows = []
+    with TelemetryWriter(str(directory), **options) as writer:
+        for i in range(count):
+            hazard = HazardType.WATER if i % 3 == 0 else None
+            writer.write(i % 4, -i, GameMode.SPEED_GOLF, ClubType.IRON, (i, i + 1), (i + 2, -1), i * 7, hazard, i)
+            rows.append((i % 4, -i, list(GameMode).index(GameMode.SPEED_GOLF), list(ClubType).index(ClubType.IRON),
+                         i, i + 1, i + 2, -1, i * 7, TERRAIN_CODES[HazardType.WATER] if hazard else -1, i))
+    return rows
+
+
+def test_round_trip_across_segments(tmp_path):
+    rows = _write(tmp_path, 50, segmentBytes=HEADER_BYTES + 8 * RECORD_BYTES, bufferRecords=3)
+    assert len(segment_paths(str(tmp_path))) == 7
+    with TelemetryReader(str(tmp_path)) as reader:
+        assert len(reader) == 50
+        assert list(reader.rows()) == rows
+        assert [value for view in reader.columns("course") for value in view] == [row[1] for row in rows]
+        assert reader.total("distance") == sum(row[8] for row in rows)
+        assert reader.array("hazard").tolist() == [row[9] for row in rows]
+
+
+def test_new_writers_append_segments(tmp_path):
+    rows = _write(tmp_path, 5) + _write(tmp_path, 4)
+    with TelemetryReader(str(tmp_path)) as reader:
+        assert len(reader.segments) == 2
+        assert list(reader.rows()) == rows
+
+
+def test_truncated_segments_end_at_the_last_whole_record(tmp_path):
+    rows = _write(tmp_path, 6)
+    (path,) = segment_paths(str(tmp_path))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - RECORD_BYTES // 2)
+    with open(os.path.join(tmp_path, "shots-000001.bin"), "wb") as f:
+        f.write(b"RLTM\x01")  # Cut off inside the header
+    with TelemetryReader(str(tmp_path)) as reader:
+        assert [len(segment) for segment in reader.segments] == [5, 0]
+        assert list(reader.rows()) == rows[:5]
+        assert reader.total("strokes") == sum(row[10] for row in rows[:5])
+
+
+@pytest.mark.parametrize("patch", [(0, b"RLRP"), (4, b"\x02\x00"), (8, b"\x08\x00\x00\x00"), (12, b"\x03\x00")])
+def test_other_files_and_versions_are_rejected(tmp_path, patch):
+    _write(tmp_path, 2)
+    (path,) = segment_paths(str(tmp_path))
+    offset, value = patch
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(value)
+    with pytest.raises(ValueError, match="unsupported version"):
+        TelemetryReader(str(tmp_path))